@@ -0,0 +1,180 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Writes synthetic RenderDoc/PIX CSV vertex dumps for benchmarking the importer.
+#
+#     python generate_csv.py out.csv --rows 1000000 --attributes normal,uv,tangent --indices soup --sections 4
+#
+# The mesh is a wavy grid of quads (two triangles each), so the output welds, indexes and renders like a real capture.
+
+import argparse
+import numpy as np
+
+# Attributes a generated file can have on top of the position, as (header name, component letters)
+ATTRIBUTES = {
+              "normal": ("in_NORMAL0", "xyz"),
+              "uv": ("in_TEXCOORD0", "xy"),
+              "tangent": ("in_TANGENT0", "xyzw"),
+              "uv1": ("in_TEXCOORD1", "xy"),
+              "color": ("in_COLOR0", "rgba"),
+              "skin": None,    # in_BLENDINDICES0.xyzw and in_BLENDWEIGHT0.xyzw
+              }
+
+# How IDX relates to the rows: a shared vertex buffer, one vertex per row (what the weld has to clean up) or a shared
+# vertex buffer with unreferenced slots in between
+INDEX_MODES = ("indexed", "soup", "sparse")
+
+# Rows written per call to np.savetxt, so 10M row files don't need all their text in memory at once
+WRITE_BLOCK = 200000
+
+
+# ~~~~~~~~~~~~~~~~~~~~Geometry Functions~~~~~~~~~~~~~~~~~~~~
+def grid_size(row_count):
+
+    # Side length (in quads) of the smallest square grid with at least row_count corners (6 per quad)
+    return max(1, int(np.ceil(np.sqrt(row_count / 6.0))))
+
+def grid_vertices(side, seed = 0):
+
+    # Per-vertex attributes of a (side + 1)^2 vertex grid; the height is a gentle wave so normals vary
+    rng = np.random.RandomState(seed)
+    u, v = np.meshgrid(np.linspace(0.0, 1.0, side + 1), np.linspace(0.0, 1.0, side + 1), indexing = "ij")
+    u, v = u.ravel(), v.ravel()
+    height = 0.05 * np.sin(u * 12.0) * np.cos(v * 12.0)
+
+    count = len(u)
+    vertices = {
+                "position": np.stack((u * 10.0, height, v * 10.0, np.ones(count)), axis = 1),
+                "normal": np.tile([0.0, 1.0, 0.0], (count, 1)),
+                "uv": np.stack((u, v), axis = 1),
+                "tangent": np.tile([1.0, 0.0, 0.0, 1.0], (count, 1)),
+                "uv1": np.stack((u * 0.5, v * 0.5), axis = 1),
+                "color": np.concatenate((rng.rand(count, 3), np.ones((count, 1))), axis = 1),
+                "blend_indices": rng.randint(0, 64, (count, 4)).astype(np.float64),
+                "blend_weights": np.tile([0.5, 0.25, 0.25, 0.0], (count, 1)),
+                }
+    return vertices
+
+def grid_indices(side):
+
+    # Triangle list over the grid, two triangles per quad
+    rows, cols = np.meshgrid(np.arange(side), np.arange(side), indexing = "ij")
+    a = (rows * (side + 1) + cols).ravel()
+    b, c, d = a + 1, a + side + 1, a + side + 2
+    return np.stack((a, c, b, b, c, d), axis = 1).ravel()
+
+
+# ~~~~~~~~~~~~~~~~~~~~CSV Functions~~~~~~~~~~~~~~~~~~~~
+def header_columns(attributes, directx_layout = False):
+
+    # The original DirectX PIX layout is positional: VTX, IDX, position xyzw, normal xyz, uv xy
+    if directx_layout:
+        return ["VTX", "IDX", "SV_Position.x", "SV_Position.y", "SV_Position.z", "SV_Position.w",
+                "NORMAL.x", "NORMAL.y", "NORMAL.z", "TEXCOORD.x", "TEXCOORD.y"]
+
+    columns = ["VTX", "IDX"] + ["in_POSITION0." + letter for letter in "xyzw"]
+    for attribute in attributes:
+        if attribute == "skin":
+            columns += ["in_BLENDINDICES0." + letter for letter in "xyzw"]
+            columns += ["in_BLENDWEIGHT0." + letter for letter in "xyzw"]
+            continue
+        name, letters = ATTRIBUTES[attribute]
+        columns += [name + "." + letter for letter in letters]
+    return columns
+
+def vertex_columns(vertices, attributes, directx_layout = False):
+
+    # (V, k) table of everything after VTX/IDX, in header order
+    if directx_layout: attributes = ("normal", "uv")
+    columns = [vertices["position"]]
+    for attribute in attributes:
+        if attribute == "skin": columns += [vertices["blend_indices"], vertices["blend_weights"]]
+        else: columns.append(vertices[attribute])
+    return np.concatenate(columns, axis = 1)
+
+def section_rows(row_count, attributes, index_mode = "indexed", directx_layout = False, seed = 0):
+
+    # (row_count, columns) table of one section: VTX counts up from 0, IDX depends on the index mode
+    side = grid_size(row_count)
+    table = vertex_columns(grid_vertices(side, seed), attributes, directx_layout)
+    idx = grid_indices(side)[:row_count // 3 * 3]
+
+    values = table[idx]
+    if index_mode == "soup":
+        idx = np.arange(len(idx))
+    elif index_mode == "sparse":
+        # Every other vertex slot is never referenced
+        idx = idx * 2
+    elif index_mode != "indexed":
+        raise ValueError("Unknown index mode " + str(index_mode))
+
+    vtx = np.arange(len(idx))
+    return np.concatenate((vtx[:, None], idx[:, None], values), axis = 1)
+
+def write_csv(filepath, row_count, attributes = ("normal", "uv"), index_mode = "indexed", section_count = 1,
+              directx_layout = False, repeat_headers = False, seed = 0):
+
+    # Writes about row_count rows split evenly over section_count sections (VTX starts over in every section).
+    # With repeat_headers every section also gets its own header row, like concatenated per-draw dumps.
+    # Returns the number of rows written.
+    header = ", ".join(header_columns(attributes, directx_layout))
+    per_section = max(3, row_count // section_count)
+    written = 0
+
+    with open(filepath, "w", newline = "\n") as f:
+        f.write(header + "\n")
+
+        for section in range(section_count):
+            if section and repeat_headers: f.write(header + "\n")
+            rows = section_rows(per_section, attributes, index_mode, directx_layout, seed + section)
+
+            # VTX and IDX are integers; everything else gets enough digits to survive the weld threshold
+            formats = ["%d", "%d"] + ["%.6g"] * (rows.shape[1] - 2)
+            for start in range(0, len(rows), WRITE_BLOCK):
+                np.savetxt(f, rows[start:start + WRITE_BLOCK], fmt = formats, delimiter = ", ")
+            written += len(rows)
+
+    return written
+
+
+# ~~~~~~~~~~~~~~~~~~~~Main Function~~~~~~~~~~~~~~~~~~~~
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Write a synthetic RenderDoc/PIX CSV vertex dump")
+    parser.add_argument("filepath")
+    parser.add_argument("--rows", type = int, default = 100000, help = "Approximate number of rows to write")
+    parser.add_argument("--attributes", default = "normal,uv",
+                        help = "Comma separated attributes besides the position: " + ", ".join(ATTRIBUTES))
+    parser.add_argument("--indices", choices = INDEX_MODES, default = "indexed")
+    parser.add_argument("--sections", type = int, default = 1, help = "Number of draws in the file")
+    parser.add_argument("--repeat-headers", action = "store_true", help = "Start every section with its own header row")
+    parser.add_argument("--directx", action = "store_true", help = "Use the fixed DirectX PIX column layout")
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args(argv)
+
+    attributes = tuple(attribute for attribute in args.attributes.split(",") if attribute)
+    for attribute in attributes:
+        if attribute not in ATTRIBUTES: parser.error("unknown attribute " + attribute)
+
+    written = write_csv(args.filepath, args.rows, attributes, args.indices, args.sections, args.directx, args.repeat_headers,
+                        args.seed)
+    print("Wrote", written, "rows to", args.filepath)
+
+if __name__ == "__main__":
+    main()
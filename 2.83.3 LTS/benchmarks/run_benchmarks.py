@@ -0,0 +1,178 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Times every phase of an import on synthetic CSVs of growing size and saves the timings as JSON.
+#
+#     python run_benchmarks.py --sizes 10000,100000,1000000 --output results.json
+#     python run_benchmarks.py --output new.json --compare results.json
+#
+# Runs inside Blender ("blender -b -P run_benchmarks.py -- ...") or, with the stand-ins in stubs/, in plain Python.
+# The building phases only mean something inside Blender; with the stand-ins they just measure the buffer preparation.
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+try:
+    import bpy
+    HEADLESS = False
+except ImportError:
+    sys.path.insert(0, os.path.join(HERE, "stubs"))
+    import bpy
+    HEADLESS = True
+
+import numpy as np
+import generate_csv
+from import_pix_csv import importer, pipeline, profiling
+
+DEFAULT_SIZES = (10000, 100000, 1000000, 10000000)
+
+# Relative slowdown of a phase (against the --compare file) that counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+# ~~~~~~~~~~~~~~~~~~~~Benchmark Functions~~~~~~~~~~~~~~~~~~~~
+def run_import(filepath, options):
+
+    # The pipeline an import runs (pipeline.build_sections), then the Blender meshes built from it
+    # (importer.make_section_meshes), with the phase timer the operator reports: parse, index, transform, faces, gather,
+    # weld, cleanup and decimate for the arrays, and the building phases of importer.py after them
+    timer = profiling.PhaseTimer()
+    sections = pipeline.build_sections(filepath, timer = timer, **options)
+    importer.make_section_meshes(sections, importer.mathutils.Matrix(), timer = timer)
+
+    if HEADLESS: bpy.reset()
+    return dict(timer.seconds)
+
+def benchmark(sizes, repeat = 3, work_dir = None, index_mode = "soup", attributes = ("normal", "uv"), section_count = 1,
+              directx_layout = False, target_faces = 0):
+
+    # Best-of-"repeat" timings per phase for every size; generated files are kept in work_dir and reused
+    work_dir = work_dir or os.path.join(tempfile.gettempdir(), "pix_csv_benchmarks")
+    os.makedirs(work_dir, exist_ok = True)
+
+    options = {
+               "assume_DirectX_PIX_layout": directx_layout,
+               "mirror_x": False,
+               "vertex_order": False,
+               "split_sections": True,
+               "primitive_topology": "TRIANGLE_LIST",
+               "target_faces": target_faces,
+               }
+
+    results = []
+    for size in sizes:
+        name = "_".join([str(size), index_mode, str(section_count), "dx" if directx_layout else "-".join(attributes) or "position"])
+        filepath = os.path.join(work_dir, name + ".csv")
+        if not os.path.exists(filepath):
+            print("Generating", filepath)
+            generate_csv.write_csv(filepath, size, attributes, index_mode, section_count, directx_layout)
+
+        best = {}
+        for _ in range(repeat):
+            gc.collect()
+            for phase, seconds in run_import(filepath, options).items():
+                best[phase] = min(seconds, best.get(phase, seconds))
+        best["total"] = sum(best.values())
+
+        print("{:>10} rows: ".format(size) + ", ".join("{} {:.3f}s".format(phase, seconds) for phase, seconds in best.items()))
+        results.append({"rows": size, "file_size": os.path.getsize(filepath), "timings": best})
+
+    return results
+
+def compare(results, baseline, tolerance = DEFAULT_TOLERANCE):
+
+    # Returns a list of (rows, phase, baseline seconds, new seconds) for every phase that got slower than the tolerance
+    # allows. Phases under a millisecond are too noisy to judge.
+    previous = {entry["rows"]: entry["timings"] for entry in baseline["results"]}
+
+    regressions = []
+    for entry in results:
+        if entry["rows"] not in previous: continue
+        for phase, seconds in entry["timings"].items():
+            before = previous[entry["rows"]].get(phase)
+            if before is None or max(before, seconds) < 0.001: continue
+            if seconds > before * (1.0 + tolerance): regressions.append((entry["rows"], phase, before, seconds))
+
+    return regressions
+
+
+# ~~~~~~~~~~~~~~~~~~~~Main Function~~~~~~~~~~~~~~~~~~~~
+def main(argv = None):
+
+    # Blender passes its own arguments through; ours come after "--"
+    if argv is None: argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description = "Time the phases of a PIX CSV import")
+    parser.add_argument("--sizes", default = ",".join(str(size) for size in DEFAULT_SIZES), help = "Comma separated row counts")
+    parser.add_argument("--repeat", type = int, default = 3, help = "Runs per size; the fastest run of every phase counts")
+    parser.add_argument("--indices", choices = generate_csv.INDEX_MODES, default = "soup")
+    parser.add_argument("--attributes", default = "normal,uv")
+    parser.add_argument("--sections", type = int, default = 1)
+    parser.add_argument("--directx", action = "store_true", help = "Benchmark the fixed DirectX PIX column layout")
+    parser.add_argument("--target-faces", type = int, default = 0, help = "Decimate every mesh to about this many faces")
+    parser.add_argument("--work-dir", help = "Where generated CSVs are kept between runs")
+    parser.add_argument("--output", help = "JSON file to write the results to")
+    parser.add_argument("--compare", help = "JSON file of an earlier run to check for regressions against")
+    parser.add_argument("--tolerance", type = float, default = DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    attributes = tuple(attribute for attribute in args.attributes.split(",") if attribute)
+    results = benchmark(sizes, args.repeat, args.work_dir, args.indices, attributes, args.sections, args.directx,
+                        args.target_faces)
+
+    report = {
+              "meta": {
+                       "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "python": platform.python_version(),
+                       "numpy": np.__version__,
+                       "platform": platform.platform(),
+                       "blender": None if HEADLESS else ".".join(str(part) for part in bpy.app.version),
+                       "index_mode": args.indices,
+                       "attributes": list(attributes),
+                       "sections": args.sections,
+                       "directx_layout": args.directx,
+                       "target_faces": args.target_faces,
+                       "repeat": args.repeat,
+                       },
+              "results": results,
+              }
+
+    if args.output:
+        with open(args.output, "w") as f: json.dump(report, f, indent = 2)
+
+    if args.compare:
+        with open(args.compare) as f: baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for rows, phase, before, seconds in regressions:
+            print("REGRESSION {} rows, {}: {:.3f}s -> {:.3f}s".format(rows, phase, before, seconds))
+        if regressions: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
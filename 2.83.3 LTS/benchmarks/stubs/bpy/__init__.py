@@ -0,0 +1,234 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Minimal stand-in for Blender's "bpy" module so the importer can run (and be timed) in a plain Python interpreter.
+# It only models what importer.py touches; data passed to foreach_set is copied like Blender would.
+
+import sys
+import numpy as np
+from . import props, types
+
+
+# ~~~~~~~~~~~~~~~~~~~~Data Stand-ins~~~~~~~~~~~~~~~~~~~~
+class Collection:
+
+    # Vertices, loops and polygons: only their size and the arrays written to them are tracked
+    def __init__(self):
+        self.size = 0
+        self.arrays = {}
+
+    def __len__(self):
+        return self.size
+
+    def add(self, count):
+        self.size += count
+
+    def foreach_set(self, attribute, values):
+        self.arrays[attribute] = np.array(values, copy = True)
+
+    def foreach_get(self, attribute, values):
+        values[:] = self.arrays[attribute]
+
+class Layer:
+
+    def __init__(self, name):
+        self.name = name
+        self.data = Collection()
+
+class LayerCollection(list):
+
+    # UV layers and vertex colors; Blender refuses more than 8 of each
+    def new(self, name = ""):
+        if len(self) >= 8: return None
+        layer = Layer(name)
+        self.append(layer)
+        return layer
+
+    def get(self, name, default = None):
+        for layer in self:
+            if layer.name == name: return layer
+        return default
+
+class Key:
+
+    # Shape keys of a mesh; the first one is the basis the others are relative to
+    def __init__(self):
+        self.key_blocks = LayerCollection()
+
+    @property
+    def reference_key(self):
+        return self.key_blocks[0]
+
+class ID(dict):
+
+    # Datablocks hold custom properties by key (mesh["prop"] = value)
+    def __init__(self, name):
+        dict.__init__(self)
+        self.name = name
+
+    __hash__ = object.__hash__
+    __eq__ = object.__eq__
+
+class Mesh(ID):
+
+    def __init__(self, name):
+        ID.__init__(self, name)
+        self.vertices = Collection()
+        self.loops = Collection()
+        self.polygons = Collection()
+        self.uv_layers = LayerCollection()
+        self.vertex_colors = LayerCollection()
+        self.materials = []
+        self.shape_keys = None
+        self.deform_weights = {}    # {(vertex, group index): weight}, like Blender's deform verts
+        self.use_auto_smooth = False
+        self.custom_normals = None
+
+    @property
+    def users(self):
+        return sum(obj.data is self for obj in data.objects)
+
+    def update(self, calc_edges = False):
+        pass
+
+    def normals_split_custom_set(self, normals):
+        self.custom_normals = np.array(normals, copy = True)
+
+class VertexGroup:
+
+    # The group (its name and index) belongs to the object, the weights to the object's mesh
+    def __init__(self, obj, name, index):
+        self.obj = obj
+        self.name = name
+        self.index = index
+
+    def add(self, index, weight, type):
+        weights = self.obj.data.deform_weights
+        for vertex in index:
+            key = (vertex, self.index)
+            if type == "ADD": weights[key] = min(weights.get(key, 0.0) + weight, 1.0)
+            elif type == "SUBTRACT": weights[key] = max(weights.get(key, 0.0) - weight, 0.0)
+            else: weights[key] = weight
+
+    def remove(self, index):
+        for vertex in index: self.obj.data.deform_weights.pop((vertex, self.index), None)
+
+    def weight(self, index):
+        return self.obj.data.deform_weights[(index, self.index)]
+
+class VertexGroups(dict):
+
+    # Looked up by name, but iterated like Blender's collection: over the groups themselves
+    def __init__(self, obj):
+        dict.__init__(self)
+        self.obj = obj
+
+    def __iter__(self):
+        return iter(self.values())
+
+    def new(self, name = "Group"):
+        self[name] = VertexGroup(self.obj, name, len(self))
+        return self[name]
+
+class Object(ID):
+
+    def __init__(self, name, data):
+        ID.__init__(self, name)
+        self.data = data
+        self.matrix_world = None
+        self.vertex_groups = VertexGroups(self)
+
+    def select_set(self, state):
+        pass
+
+    def shape_key_add(self, name = "Key", from_mix = True):
+        if self.data.shape_keys is None: self.data.shape_keys = Key()
+        return self.data.shape_keys.key_blocks.new(name)
+
+    def shape_key_clear(self):
+        self.data.shape_keys = None
+
+class DataCollection(list):
+
+    def __init__(self, datablock_type):
+        list.__init__(self)
+        self.datablock_type = datablock_type
+
+    def new(self, name, *args):
+        datablock = self.datablock_type(name, *args)
+        self.append(datablock)
+        return datablock
+
+class Timers:
+
+    # bpy.app.timers: registered functions are only remembered, tests call them by hand
+    def __init__(self):
+        self.functions = []
+
+    def register(self, function, first_interval = 0.0, persistent = False):
+        self.functions.append(function)
+
+    def unregister(self, function):
+        self.functions.remove(function)
+
+    def is_registered(self, function):
+        return function in self.functions
+
+class SceneObjects(list):
+
+    def link(self, obj):
+        self.append(obj)
+
+class Namespace:
+
+    # Anything goes: attribute access returns another namespace, calls do nothing (bpy.ops.*, bpy.utils.*)
+    def __getattr__(self, name):
+        value = Namespace()
+        setattr(self, name, value)
+        return value
+
+    def __call__(self, *args, **kwargs):
+        return {"FINISHED"}
+
+
+# ~~~~~~~~~~~~~~~~~~~~Module Attributes~~~~~~~~~~~~~~~~~~~~
+class data:
+    meshes = DataCollection(Mesh)
+    objects = DataCollection(Object)
+
+class context:
+    collection = Namespace()
+    view_layer = Namespace()
+
+context.collection.objects = SceneObjects()
+
+ops = Namespace()
+utils = Namespace()
+app = Namespace()
+app.version = (2, 83, 3)
+app.binary_path_python = sys.executable
+app.timers = Timers()
+
+def reset():
+
+    # Forget every datablock created so far, so repeated benchmark runs don't accumulate memory
+    del data.meshes[:]
+    del data.objects[:]
+    del context.collection.objects[:]
@@ -0,0 +1,43 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Stand-ins for bpy.props: a property declared on an operator class just evaluates to its default value.
+
+
+def Property(default = None, **kwargs):
+    return default
+
+def BoolProperty(default = False, **kwargs):
+    return default
+
+def IntProperty(default = 0, **kwargs):
+    return default
+
+def FloatProperty(default = 0.0, **kwargs):
+    return default
+
+def StringProperty(default = "", **kwargs):
+    return default
+
+def EnumProperty(default = None, **kwargs):
+    return default
+
+def CollectionProperty(**kwargs):
+    return ()
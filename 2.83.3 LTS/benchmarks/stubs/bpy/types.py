@@ -0,0 +1,53 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Stand-ins for the bpy.types the importer subclasses or references.
+
+
+class Operator:
+
+    def as_keywords(self, ignore = ()):
+
+        # Properties are plain class attributes here (see props.py), overridden per instance by assignments
+        keywords = {}
+        for name in dir(self):
+            value = getattr(self, name)
+            if name.startswith(("_", "bl_")) or callable(value) or name in ignore: continue
+            keywords[name] = value
+        return keywords
+
+    def report(self, type, message):
+        print(type, message)
+
+class OperatorFileListElement:
+    pass
+
+class Menu:
+
+    @classmethod
+    def append(cls, function):
+        pass
+
+    @classmethod
+    def remove(cls, function):
+        pass
+
+TOPBAR_MT_file_import = Menu
+VIEW3D_MT_object = Menu
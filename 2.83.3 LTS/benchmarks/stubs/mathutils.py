@@ -0,0 +1,40 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Stand-in for Blender's "mathutils" module, see bpy/__init__.py.
+
+import numpy as np
+
+
+class Matrix:
+
+    def __init__(self, rows = None):
+        self.rows = np.identity(4) if rows is None else np.array(rows, dtype = np.float64)
+
+    def __iter__(self):
+        return iter(self.rows.tolist())
+
+    def to_4x4(self):
+        matrix = np.identity(4)
+        matrix[:len(self.rows), :len(self.rows)] = self.rows
+        return Matrix(matrix)
+
+    def __matmul__(self, other):
+        return Matrix(self.rows @ other.rows)
@@ -0,0 +1,56 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# NOTE: This file must stay free of any "bpy" imports so that the parsing modules of this package
+# can be imported (and profiled, tested, etc.) from a plain Python interpreter outside of Blender.
+
+bl_info = {
+           "name": "BlenderDoc PIX CSV",
+           "author": "Medstar, Stanislav Bobovych",
+           "version": (1, 1, 0),
+           "blender": (2, 80, 0),
+           "location": "File > Import-Export",
+           "description": "Import PIX CSV data from RenderDoc. Imports meshes, normals, UV's, colors and skinning.",
+           "category": "Import",
+           }
+
+# Support reloading the add-on's modules through "Reload Scripts" (F3 > Reload Scripts)
+if "importer" in locals():
+    import importlib
+    importlib.reload(profiling)
+    importlib.reload(parsing)
+    importlib.reload(parallel)
+    importlib.reload(binary)
+    importlib.reload(geometry)
+    importlib.reload(cache)
+    importlib.reload(pipeline)
+    importlib.reload(batch)
+    importlib.reload(worker)
+    importlib.reload(importer)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Registration Functions~~~~~~~~~~~~~~~~~~~~
+def register():
+    from . import importer
+    importer.register()
+
+def unregister():
+    from . import importer
+    importer.unregister()
@@ -0,0 +1,107 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Command line converter: PIX/RenderDoc CSV dumps to PLY, OBJ or glTF, without Blender.
+#
+#     python -m import_pix_csv captures/*.csv --format gltf --output-dir meshes --workers 8
+#
+# Run it from the folder that contains "import_pix_csv". Takes the same options as the import operator.
+
+import argparse
+import glob
+import os
+import sys
+from . import batch, exporting, geometry, parsing
+
+
+# ~~~~~~~~~~~~~~~~~~~~Main Function~~~~~~~~~~~~~~~~~~~~
+def input_files(paths):
+
+    # Directories stand for every CSV in them, so thousands of captures don't have to fit on one command line
+    filepaths = []
+    for path in paths:
+        if os.path.isdir(path): filepaths += sorted(glob.glob(os.path.join(path, "*.csv")))
+        else: filepaths.append(path)
+    return filepaths
+
+def main(argv = None):
+    axes = ("X", "Y", "Z", "-X", "-Y", "-Z")
+
+    parser = argparse.ArgumentParser(prog = "python -m import_pix_csv", description = "Convert PIX/RenderDoc CSV vertex dumps to PLY, OBJ or glTF")
+    parser.add_argument("inputs", nargs = "+", help = "CSV files, JSON buffer layouts, raw vertex buffers (with --layout), or folders of CSV files")
+    parser.add_argument("-f", "--format", choices = [file_format.lower() for file_format in exporting.FORMATS], default = "ply")
+    parser.add_argument("-o", "--output-dir", help = "Where to write the converted files (default: next to every CSV)")
+    parser.add_argument("-j", "--workers", type = int, default = 0, help = "Number of worker processes (0 = one per CPU core)")
+    parser.add_argument("--directx", action = "store_true", help = "Assume the fixed DirectX PIX column layout")
+    parser.add_argument("--mirror-x", action = "store_true", help = "Mirror all the vertices across the X axis")
+    parser.add_argument("--vertex-order", action = "store_true", help = "Reverse the winding of every face")
+    parser.add_argument("--no-split-sections", action = "store_true", help = "Keep every draw of a file in one mesh")
+    parser.add_argument("--topology", choices = geometry.PRIMITIVE_TOPOLOGIES, default = "TRIANGLE_LIST")
+    parser.add_argument("--output-csv", help = "Output CSV to join in on VTX; \"{name}\" stands for the input's name, e.g. \"{name}_out.csv\"")
+    parser.add_argument("--output-mapping", default = parsing.DEFAULT_OUTPUT_MAPPING,
+                        help = "Output CSV columns to import, e.g. \"v_Varying0.xy=UVMap; v_Varying1.xy=Lightmap\" (default: %(default)s)")
+    parser.add_argument("--layout", help = "JSON layout descriptor or CSV of the same draw, to read the inputs as raw vertex buffers")
+    parser.add_argument("--target-faces", type = int, default = 0, help = "Decimate every mesh to about this many triangles (0 = full detail)")
+    parser.add_argument("--cell-size", type = float, default = 0.0, help = "Decimate by merging the vertices in every grid cell of this size")
+    parser.add_argument("--stream", action = "store_true", help = "Read the CSVs in blocks of rows to keep memory usage down")
+    parser.add_argument("--chunk-size", type = int, default = parsing.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--precision", choices = geometry.PRECISIONS, default = "FULL", help = "How normals and UVs are stored while converting")
+    parser.add_argument("--cache", action = "store_true", help = "Use the import cache shared with the add-on")
+    parser.add_argument("--forward", choices = axes, default = "Z", help = "Forward axis of the CSV data")
+    parser.add_argument("--up", choices = axes, default = "Y", help = "Up axis of the CSV data")
+    args = parser.parse_args(argv)
+
+    filepaths = input_files(args.inputs)
+    if args.output_dir: os.makedirs(args.output_dir, exist_ok = True)
+
+    options = {
+               "output_dir": args.output_dir,
+               "file_format": args.format,
+               "axis_forward": args.forward,
+               "axis_up": args.up,
+               "assume_DirectX_PIX_layout": args.directx,
+               "mirror_x": args.mirror_x,
+               "vertex_order": args.vertex_order,
+               "use_streaming": args.stream,
+               "chunk_size": args.chunk_size,
+               "precision": args.precision,
+               "split_sections": not args.no_split_sections,
+               "primitive_topology": args.topology,
+               "use_cache": args.cache,
+               "output_filepath": args.output_csv,
+               "output_mapping": args.output_mapping,
+               "layout_filepath": args.layout,
+               "target_faces": args.target_faces,
+               "cell_size": args.cell_size,
+               }
+
+    failure_count = 0
+    options = batch.file_options(filepaths, args.workers, **options)
+    for filepath, paths, error in batch.iter_results(exporting.convert_file, filepaths, args.workers, **options):
+        if error is not None:
+            failure_count += 1
+            print("FAILED", filepath + ":", error, file = sys.stderr)
+        else:
+            print(filepath, "->", ", ".join(paths))
+
+    return 1 if failure_count else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Runs the pipeline for many files at once on a process pool. Nothing in here may import bpy: the worker processes
+# are plain Python interpreters that import this package without Blender.
+
+import os
+from . import parallel, pipeline, profiling
+
+
+# ~~~~~~~~~~~~~~~~~~~~Batch Functions~~~~~~~~~~~~~~~~~~~~
+def file_options(filepaths, worker_count = 0, python_executable = None, **options):
+
+    # A batch of one file can't be spread over processes file by file, so its worker processes parse that file in
+    # byte ranges instead (see parallel.parse_csv_sections). Bigger batches parse every file in a single process.
+    if len(filepaths) == 1: options = dict(options, parse_workers = worker_count, parse_executable = python_executable)
+    return options
+
+def load_timed(filepath, trace_memory = False, **options):
+
+    # pipeline.load_mesh_data with a timer of its own; the timer is sent back along with the result
+    timer = profiling.PhaseTimer(trace_memory)
+    try:
+        return pipeline.load_mesh_data(filepath, timer = timer, **options), timer
+    finally:
+        timer.stop_tracing()
+
+def iter_results(function, filepaths, worker_count = 0, python_executable = None, checkpoint = None, **kwargs):
+
+    # Yields (filepath, function(filepath, **kwargs), error) for every file, in the order given, as soon as that file
+    # is done. function must be importable by the workers (a module-level function of this package).
+    # A file that fails only reports its error; the rest of the batch carries on. checkpoint() is called before every
+    # file and while waiting for the workers; if it raises, the batch stops and the workers with it.
+    if worker_count == 1 or len(filepaths) <= 1:
+        for filepath in filepaths:
+            if checkpoint is not None: checkpoint()
+            try:
+                yield filepath, function(filepath, **kwargs), None
+            except Exception as error:
+                yield filepath, None, error
+        return
+
+    with parallel.worker_pool(min(worker_count or os.cpu_count(), len(filepaths)), python_executable) as executor:
+        futures = [executor.submit(function, filepath, **kwargs) for filepath in filepaths]
+
+        try:
+            for filepath, future in zip(filepaths, futures):
+                # If a worker dies (out of memory, ...) the pool breaks and the files still queued on it report that error.
+                # An exception from checkpoint isn't the file's error; it ends the batch.
+                parallel.wait_done(future, checkpoint)
+                try:
+                    yield filepath, future.result(), None
+                except Exception as error:
+                    yield filepath, None, error
+        finally:
+            # When the caller stops early (a cancelled import closes this generator), drop the files that haven't
+            # started yet; worker_pool stops the ones that are running
+            for future in futures: future.cancel()
+
+def iter_mesh_data(filepaths, worker_count = 0, python_executable = None, trace_memory = False, checkpoint = None, **options):
+
+    # Yields (filepath, sections, timer, error) for every file, see iter_results
+    options = file_options(filepaths, worker_count, python_executable, **options)
+    results = iter_results(load_timed, filepaths, worker_count, python_executable, checkpoint, trace_memory = trace_memory, **options)
+    try:
+        for filepath, result, error in results:
+            if error is not None: yield filepath, None, None, error
+            else: yield filepath, result[0], result[1], None
+    finally:
+        results.close()
@@ -0,0 +1,197 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Raw vertex/index buffer import: RenderDoc can save the buffers of a draw as they are in GPU memory, which skips text
+# parsing entirely. A layout descriptor says how to read them, either a small JSON file:
+#
+#     {
+#      "vertex_buffer": "draw_vb.bin", "stride": 32, "offset": 0,
+#      "attributes": [
+#                     {"name": "in_POSITION0", "offset": 0, "format": "float32x3"},
+#                     {"name": "in_NORMAL0", "offset": 12, "format": "snorm16x4"},
+#                     {"name": "in_TEXCOORD0", "offset": 20, "format": "float32x2"}
+#                     ],
+#      "index_buffer": "draw_ib.bin", "index_format": "uint16", "index_offset": 0, "index_count": 3600, "base_vertex": 0
+#     }
+#
+# or the CSV export of the same draw, whose header is read as float32 attributes packed in column order.
+# Buffer paths are relative to the descriptor. Nothing in here may import bpy.
+
+import json
+import os
+import numpy as np
+from . import geometry, parsing
+
+# Attribute formats ("<format>x<components>", e.g. "float32x3") and what they are stored as; normalized formats are
+# divided by the given value (and clamped to -1 for snorm)
+FORMATS = {
+           "float32": (np.float32, None),
+           "float16": (np.float16, None),
+           "uint32": (np.uint32, None),
+           "sint32": (np.int32, None),
+           "uint16": (np.uint16, None),
+           "sint16": (np.int16, None),
+           "uint8": (np.uint8, None),
+           "sint8": (np.int8, None),
+           "unorm16": (np.uint16, 65535.0),
+           "snorm16": (np.int16, 32767.0),
+           "unorm8": (np.uint8, 255.0),
+           "snorm8": (np.int8, 127.0),
+           }
+
+INDEX_FORMATS = {"uint16": np.uint16, "uint32": np.uint32}
+
+# Names of the components, used to give every attribute CSV style columns ("in_POSITION0.x", ...)
+COMPONENT_NAMES = "xyzw"
+
+
+# ~~~~~~~~~~~~~~~~~~~~Layout Functions~~~~~~~~~~~~~~~~~~~~
+def is_binary(filepath, layout_filepath = None):
+
+    # A JSON descriptor is imported directly; any other file is a raw vertex buffer as soon as it has a layout
+    return os.path.splitext(filepath)[1].lower() == ".json" or bool(layout_filepath)
+
+def parse_format(attribute_format):
+
+    # "snorm16x4" -> (np.int16, 32767.0, 4)
+    name, _, components = attribute_format.lower().partition("x")
+    if name not in FORMATS: raise ValueError("Unknown attribute format " + attribute_format)
+    base, scale = FORMATS[name]
+    return base, scale, int(components or 1)
+
+def csv_layout(csv_filepath):
+
+    # Layout of a buffer that holds the attributes of a CSV header as float32, tightly packed in column order
+    with open(csv_filepath, "rb") as f: csv_header = parsing.read_header(f.readline())
+
+    attributes = []
+    offset = 0
+    for name, components in parsing.column_groups(csv_header).items():
+        attributes.append({"name": name, "offset": offset, "format": "float32x" + str(len(components))})
+        offset += 4 * len(components)
+    return {"stride": offset, "attributes": attributes}
+
+def read_layout(filepath, layout_filepath = None):
+
+    # Returns the layout of a raw buffer import, with the buffer paths made absolute: either the JSON descriptor that
+    # is "filepath", or the layout in layout_filepath (JSON or CSV) for the raw vertex buffer "filepath"
+    descriptor_filepath = filepath if os.path.splitext(filepath)[1].lower() == ".json" else layout_filepath
+    if os.path.splitext(descriptor_filepath)[1].lower() == ".csv":
+        layout = csv_layout(descriptor_filepath)
+    else:
+        with open(descriptor_filepath, "r") as f: layout = json.load(f)
+
+    folder = os.path.dirname(os.path.abspath(descriptor_filepath))
+    if descriptor_filepath != filepath: layout["vertex_buffer"] = os.path.abspath(filepath)
+    elif "vertex_buffer" not in layout: raise ValueError("Layout " + filepath + " has no vertex_buffer")
+    for key in ("vertex_buffer", "index_buffer"):
+        if layout.get(key): layout[key] = os.path.join(folder, layout[key])
+
+    if not layout.get("attributes") or int(layout.get("stride", 0)) <= 0:
+        raise ValueError("Layout " + descriptor_filepath + " needs a stride and at least one attribute")
+    return layout
+
+def buffer_filepaths(filepath, layout_filepath = None):
+
+    # Every file a raw buffer import reads, so the cache and hot reload notice when any of them changes
+    layout = read_layout(filepath, layout_filepath)
+    filepaths = [path for path in (layout_filepath, layout["vertex_buffer"], layout.get("index_buffer")) if path]
+    return [path for path in filepaths if os.path.abspath(path) != os.path.abspath(filepath)]
+
+
+# ~~~~~~~~~~~~~~~~~~~~Buffer Functions~~~~~~~~~~~~~~~~~~~~
+def attribute_views(layout):
+
+    # Strided views straight into the memory-mapped vertex buffer, one (vertex count, components) array per attribute.
+    # The last vertex may stop at its last attribute instead of a full stride, so the count is taken from there.
+    stride = int(layout["stride"])
+    start = int(layout.get("offset", 0))
+    data = np.memmap(layout["vertex_buffer"], dtype = np.uint8, mode = "r")
+
+    formats = [(attribute["name"], int(attribute["offset"])) + parse_format(attribute["format"]) for attribute in layout["attributes"]]
+    vertex_size = max(offset + np.dtype(base).itemsize * components for _, offset, base, _, components in formats)
+    count = max((len(data) - start - vertex_size) // stride + 1, 0)
+    if "count" in layout: count = min(count, int(layout["count"]))
+
+    views = []
+    for name, offset, base, scale, components in formats:
+        view = np.ndarray((count, components), dtype = base, buffer = data, offset = start + offset, strides = (stride, np.dtype(base).itemsize))
+        views.append((name, view, scale))
+    return views, count
+
+def decode_view(view, scale):
+
+    # float32 views are used as they are; everything else is converted (and normalized formats scaled)
+    if scale is None: return view if view.dtype == np.float32 else view.astype(np.float32)
+    return np.maximum(view.astype(np.float32) / np.float32(scale), -1.0)
+
+def read_indices(layout, vertex_count, primitive_topology = "TRIANGLE_LIST"):
+
+    # Index buffer of the draw as int64, with base_vertex added; a draw without one reads every vertex in order.
+    # Strip and fan restarts come back as -1 already (see geometry.mark_restarts).
+    if not layout.get("index_buffer"): return np.arange(vertex_count, dtype = np.int64)
+
+    index_format = layout.get("index_format", "uint32").lower()
+    if index_format not in INDEX_FORMATS: raise ValueError("Unknown index format " + index_format)
+    indices = np.memmap(layout["index_buffer"], dtype = INDEX_FORMATS[index_format], mode = "r", offset = int(layout.get("index_offset", 0)))
+    if "index_count" in layout: indices = indices[:int(layout["index_count"])]
+
+    # The index format says which value is the restart of a strip or fan (all bits set), so it is marked here, before
+    # base_vertex could move a real vertex onto it. A triangle list has no restarts, there the largest index is a real
+    # vertex and gets base_vertex like any other.
+    indices = indices.astype(np.int64)
+    base_vertex = int(layout.get("base_vertex", 0))
+    if primitive_topology in geometry.RESTART_TOPOLOGIES:
+        restarts = indices == np.iinfo(INDEX_FORMATS[index_format]).max
+        indices += base_vertex
+        indices[restarts] = -1
+    else:
+        indices += base_vertex
+    return indices
+
+def read_buffers(filepath, layout_filepath = None, primitive_topology = "TRIANGLE_LIST"):
+
+    # Returns the per vertex attributes (keyed like the CSV parser's, see parsing.compile_plan) and the index buffer
+    # of a draw with the given primitive topology
+    layout = read_layout(filepath, layout_filepath)
+    views, vertex_count = attribute_views(layout)
+
+    # Name every component like a CSV column would be, so the attributes get the same keys as a CSV import
+    csv_header = ["VTX", "IDX"]
+    sources = [None, None]
+    for attribute, (name, view, _) in enumerate(views):
+        for component in range(view.shape[1]):
+            csv_header.append(name + "." + COMPONENT_NAMES[component] if view.shape[1] <= len(COMPONENT_NAMES) else name + "." + str(component))
+            sources.append((attribute, component))
+
+    decoded = [decode_view(view, scale) for _, view, scale in views]
+    attributes = {}
+    for key, columns in parsing.compile_plan(csv_header).attributes:
+        columns = [sources[column] for column in columns]
+        attribute = columns[0][0]
+        components = [component for _, component in columns]
+
+        # Consecutive components of one attribute stay a view into the buffer
+        if all(other == attribute for other, _ in columns) and components == list(range(components[0], components[0] + len(components))):
+            attributes[key] = decoded[attribute][:, components[0]:components[0] + len(components)]
+        else:
+            attributes[key] = np.stack([decoded[other][:, component] for other, component in columns], axis = 1)
+
+    return attributes, read_indices(layout, vertex_count, primitive_topology)
@@ -0,0 +1,127 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# On-disk cache of pipeline results. Every entry is a directory of .npy files (one per array) so that a cache hit
+# can be memory-mapped instead of read. Nothing in here may import bpy.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+
+# Bump this whenever the arrays written by the pipeline change meaning, so stale entries stop matching
+CACHE_VERSION = 7
+
+# Where entries live and how big the directory may get before the least recently used entries are evicted
+DEFAULT_CACHE_DIR = os.environ.get("PIX_CSV_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "blenderdoc_pix_csv_cache")
+DEFAULT_MAX_SIZE = int(os.environ.get("PIX_CSV_CACHE_SIZE_MB", 2048)) * 1024 * 1024
+
+
+# ~~~~~~~~~~~~~~~~~~~~Key Functions~~~~~~~~~~~~~~~~~~~~
+def file_fingerprint(filepath):
+
+    # File contents, approximated by path, size and mtime
+    stat = os.stat(filepath)
+    return {"path": os.path.abspath(filepath), "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+def cache_key(filepath, options, extra_filepaths = ()):
+
+    # An entry is only valid for the exact same file contents imported with the exact same options, and for the same
+    # contents of any other file the import reads (a paired output CSV)
+    fingerprint = file_fingerprint(filepath)
+    fingerprint["version"] = CACHE_VERSION
+    fingerprint["options"] = options
+    if extra_filepaths: fingerprint["extra_files"] = [file_fingerprint(extra_filepath) for extra_filepath in extra_filepaths]
+
+    return hashlib.sha1(json.dumps(fingerprint, sort_keys = True).encode("utf-8")).hexdigest()
+
+def section_key(key, section):
+    return key + "-" + str(section)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Entry Functions~~~~~~~~~~~~~~~~~~~~
+def load(key, cache_dir = DEFAULT_CACHE_DIR):
+
+    # Returns a dictionary of read-only memory-mapped arrays, or None on a cache miss
+    entry = os.path.join(cache_dir, key)
+    if not os.path.isdir(entry): return None
+
+    try:
+        arrays = {}
+        for filename in os.listdir(entry):
+            name, extension = os.path.splitext(filename)
+            if extension == ".npy": arrays[name] = np.load(os.path.join(entry, filename), mmap_mode = "r")
+    except (OSError, ValueError):
+        # Half-deleted or corrupt entry; treat it as a miss and let store() replace it
+        return None
+
+    # Mark the entry as recently used for the LRU eviction
+    os.utime(entry, None)
+    return arrays
+
+def store(key, arrays, cache_dir = DEFAULT_CACHE_DIR, max_size = DEFAULT_MAX_SIZE):
+
+    os.makedirs(cache_dir, exist_ok = True)
+    entry = os.path.join(cache_dir, key)
+
+    # Write into a temporary directory first and rename it into place, so a reader never sees a partial entry
+    staging = tempfile.mkdtemp(prefix = key + ".", suffix = ".tmp", dir = cache_dir)
+    try:
+        for name, values in arrays.items(): np.save(os.path.join(staging, name + ".npy"), np.ascontiguousarray(values))
+        if os.path.isdir(entry): shutil.rmtree(entry, ignore_errors = True)
+        os.rename(staging, entry)
+    except OSError:
+        # Another import stored the same entry at the same time, or the disk is full; either way the import itself
+        # doesn't need the cache to succeed
+        shutil.rmtree(staging, ignore_errors = True)
+        return
+
+    evict(cache_dir, max_size)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Maintenance Functions~~~~~~~~~~~~~~~~~~~~
+def entry_size(entry):
+
+    size = 0
+    for filename in os.listdir(entry): size += os.path.getsize(os.path.join(entry, filename))
+    return size
+
+def evict(cache_dir = DEFAULT_CACHE_DIR, max_size = DEFAULT_MAX_SIZE):
+
+    # Delete the least recently used entries until the cache fits into max_size bytes
+    if not os.path.isdir(cache_dir): return
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, name)
+        if name.endswith(".tmp") or not os.path.isdir(entry): continue
+        try: entries.append((os.path.getmtime(entry), entry_size(entry), entry))
+        except OSError: continue
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry in sorted(entries):
+        if total <= max_size: break
+        shutil.rmtree(entry, ignore_errors = True)
+        total -= size
+
+def clear(cache_dir = DEFAULT_CACHE_DIR):
+    evict(cache_dir, 0)
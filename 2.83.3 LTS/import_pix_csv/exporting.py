@@ -0,0 +1,283 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Writes pipeline results straight to PLY, OBJ or glTF files, for converting captures without Blender (see __main__.py).
+# Nothing in here may import bpy.
+
+import json
+import os
+import numpy as np
+from . import geometry, pipeline
+
+FORMATS = ("PLY", "OBJ", "GLTF")
+
+# Axes every format is written in, as (forward, up), matching what Blender's own exporters write by default.
+# PLY has no convention, so it stays in Blender's space.
+FORMAT_AXES = {"PLY": ("Y", "Z"), "OBJ": ("-Z", "Y"), "GLTF": ("Z", "Y")}
+
+# Rows formatted per string operation when writing OBJ text
+TEXT_BLOCK = 100000
+
+# glTF constants
+GLTF_FLOAT = 5126
+GLTF_UNSIGNED_SHORT = 5123
+GLTF_UNSIGNED_INT = 5125
+GLTF_ARRAY_BUFFER = 34962
+GLTF_ELEMENT_ARRAY_BUFFER = 34963
+
+
+# ~~~~~~~~~~~~~~~~~~~~Axis Functions~~~~~~~~~~~~~~~~~~~~
+def axis_vector(axis):
+    vector = np.zeros(3)
+    vector["XYZ".index(axis[-1])] = -1.0 if axis.startswith("-") else 1.0
+    return vector
+
+def axis_conversion(from_forward = "Y", from_up = "Z", to_forward = "Y", to_up = "Z"):
+
+    # Same (3, 3) rotation as bpy_extras.io_utils.axis_conversion: maps the "from" forward and up axes onto the "to"
+    # ones (and their cross products onto each other, so it never mirrors)
+    def basis(forward, up):
+        forward, up = axis_vector(forward), axis_vector(up)
+        if abs(np.dot(forward, up)) > 0.5: raise ValueError("Forward and up axes must be different")
+        return np.stack((forward, up, np.cross(forward, up)), axis = 1)
+
+    return basis(to_forward, to_up) @ basis(from_forward, from_up).T
+
+
+# ~~~~~~~~~~~~~~~~~~~~Vertex Functions~~~~~~~~~~~~~~~~~~~~
+def first_attribute(mesh_data, semantic):
+    for name, values in mesh_data.items():
+        if name.startswith(semantic + "."): return values
+    return None
+
+def corner_vertices(mesh_data, corner_names):
+
+    # PLY and glTF only know per vertex attributes, so a vertex is split wherever its corners disagree on one of the
+    # per corner attributes (a UV seam, a hard edge, ...). Returns the vertex index of every output vertex, the per
+    # corner attributes per output vertex and the faces pointing at the output vertices.
+    faces = np.asarray(mesh_data["faces"], dtype = np.int64)
+    corner_count = faces.size
+
+    # One row of raw bytes per corner: its vertex and the bits of every per corner attribute
+    columns = [faces.reshape(-1, 1).astype(np.int32).view(np.float32)]
+    for name in corner_names: columns.append(geometry.decode_attribute(mesh_data[name]).reshape(corner_count, -1))
+    rows = np.ascontiguousarray(np.concatenate(columns, axis = 1))
+
+    keys = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(keys, return_index = True, return_inverse = True)
+
+    # Keep the output vertices in the order they are first used
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    first = first[order]
+
+    attributes = {name: geometry.decode_attribute(mesh_data[name]).reshape(corner_count, -1)[first] for name in corner_names}
+    return faces.ravel()[first], attributes, rank[inverse.ravel()].reshape(-1, 3)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Writer Functions~~~~~~~~~~~~~~~~~~~~
+def write_ply(filepath, mesh_data):
+
+    # Binary little endian PLY with positions, normals, UVs (s, t) and the first vertex color set
+    corner_names = [key for key in ("normals", "uvs") if key in mesh_data]
+    colors = first_attribute(mesh_data, "color")
+    if colors is not None:
+        mesh_data = dict(mesh_data, colors = np.asarray(colors, dtype = np.float32).reshape(-1, colors.shape[-1])[:, :4])
+        corner_names.append("colors")
+
+    vertices, attributes, faces = corner_vertices(mesh_data, corner_names)
+
+    fields = [("x", "<f4"), ("y", "<f4"), ("z", "<f4")]
+    if "normals" in attributes: fields += [("nx", "<f4"), ("ny", "<f4"), ("nz", "<f4")]
+    if "uvs" in attributes: fields += [("s", "<f4"), ("t", "<f4")]
+    if "colors" in attributes: fields += [(channel, "u1") for channel in ("red", "green", "blue", "alpha")[:attributes["colors"].shape[1]]]
+
+    table = np.empty(len(vertices), dtype = fields)
+    for axis, name in enumerate("xyz"): table[name] = mesh_data["positions"][vertices, axis]
+    if "normals" in attributes:
+        for axis, name in enumerate(("nx", "ny", "nz")): table[name] = attributes["normals"][:, axis]
+    if "uvs" in attributes:
+        table["s"], table["t"] = attributes["uvs"][:, 0], attributes["uvs"][:, 1]
+    if "colors" in attributes:
+        channels = np.clip(np.rint(attributes["colors"] * 255.0), 0, 255).astype(np.uint8)
+        for channel, name in enumerate(("red", "green", "blue", "alpha")[:channels.shape[1]]): table[name] = channels[:, channel]
+
+    face_table = np.empty(len(faces), dtype = [("count", "u1"), ("vertices", "<i4", 3)])
+    face_table["count"] = 3
+    face_table["vertices"] = faces
+
+    header = ["ply", "format binary_little_endian 1.0", "element vertex " + str(len(table))]
+    type_names = {"<f4": "float", "u1": "uchar"}
+    header += ["property " + type_names[dtype] + " " + name for name, dtype in fields]
+    header += ["element face " + str(len(face_table)), "property list uchar int vertex_indices", "end_header"]
+
+    with open(filepath, "wb") as f:
+        f.write(("\n".join(header) + "\n").encode("ascii"))
+        table.tofile(f)
+        face_table.tofile(f)
+
+def write_text_rows(f, row_format, values):
+
+    # Format a whole block of rows with one string operation instead of one call per row
+    values = np.asarray(values)
+    values = values.reshape(len(values), -1)
+    for start in range(0, len(values), TEXT_BLOCK):
+        block = values[start:start + TEXT_BLOCK]
+        f.write((row_format * len(block)) % tuple(block.ravel().tolist()))
+
+def write_obj(filepath, sections, names):
+
+    # Every section becomes an "o" object; normals and UVs are written per face corner, as they are stored
+    with open(filepath, "w", newline = "\n") as f:
+        vertex_offset = 1
+        corner_offset = 1
+
+        for name, mesh_data in zip(names, sections):
+            faces = np.asarray(mesh_data["faces"], dtype = np.int64)
+            corners = np.arange(faces.size, dtype = np.int64).reshape(-1, 3) + corner_offset
+
+            f.write("o " + name + "\n")
+            write_text_rows(f, "v %.6f %.6f %.6f\n", mesh_data["positions"])
+
+            # "f v/vt/vn" with whichever of vt and vn exist
+            columns = [faces + vertex_offset]
+            corner_format = "%d"
+            if "uvs" in mesh_data:
+                write_text_rows(f, "vt %.6f %.6f\n", geometry.decode_attribute(mesh_data["uvs"]).reshape(-1, 2))
+                columns.append(corners)
+                corner_format += "/%d"
+            if "normals" in mesh_data:
+                write_text_rows(f, "vn %.6f %.6f %.6f\n", geometry.decode_attribute(mesh_data["normals"]).reshape(-1, 3))
+                if "uvs" not in mesh_data: corner_format += "/"
+                columns.append(corners)
+                corner_format += "/%d"
+
+            write_text_rows(f, "f " + " ".join([corner_format] * 3) + "\n", np.stack(columns, axis = 2))
+
+            vertex_offset += len(mesh_data["positions"])
+            corner_offset += faces.size
+
+def write_gltf(filepath, sections, names):
+
+    # A .gltf (JSON) plus a .bin next to it; every section becomes a mesh with a node of its own
+    bin_path = os.path.splitext(filepath)[0] + ".bin"
+    gltf = {
+            "asset": {"version": "2.0", "generator": "BlenderDoc PIX CSV"},
+            "scene": 0,
+            "scenes": [{"nodes": list(range(len(sections)))}],
+            "nodes": [],
+            "meshes": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+            }
+
+    with open(bin_path, "wb") as f:
+        def add_view(values, target, component_type, accessor_type):
+            # Append one array to the .bin (4 byte aligned) and describe it with a buffer view and an accessor
+            padding = (-f.tell()) % 4
+            if padding: f.write(b"\0" * padding)
+            values = np.ascontiguousarray(values)
+            gltf["bufferViews"].append({"buffer": 0, "byteOffset": f.tell(), "byteLength": values.nbytes, "target": target})
+            f.write(values.tobytes())
+
+            accessor = {"bufferView": len(gltf["bufferViews"]) - 1, "componentType": component_type, "count": len(values), "type": accessor_type}
+            gltf["accessors"].append(accessor)
+            return len(gltf["accessors"]) - 1, accessor
+
+        for name, mesh_data in zip(names, sections):
+            corner_names = [key for key in ("normals", "uvs") if key in mesh_data]
+            colors = first_attribute(mesh_data, "color")
+            if colors is not None:
+                mesh_data = dict(mesh_data, colors = np.asarray(colors, dtype = np.float32).reshape(-1, colors.shape[-1]))
+                corner_names.append("colors")
+            vertices, attributes, faces = corner_vertices(mesh_data, corner_names)
+
+            positions = np.asarray(mesh_data["positions"], dtype = np.float32)[vertices]
+            index, accessor = add_view(positions, GLTF_ARRAY_BUFFER, GLTF_FLOAT, "VEC3")
+            accessor["min"] = positions.min(axis = 0).tolist() if len(positions) else [0.0] * 3
+            accessor["max"] = positions.max(axis = 0).tolist() if len(positions) else [0.0] * 3
+            primitive = {"attributes": {"POSITION": index}, "mode": 4}
+
+            if "normals" in attributes:
+                normals = attributes["normals"]
+                lengths = np.linalg.norm(normals, axis = 1, keepdims = True)
+                normals = np.where(lengths > 0, normals / np.where(lengths > 0, lengths, 1.0), [0.0, 0.0, 1.0]).astype(np.float32)
+                primitive["attributes"]["NORMAL"] = add_view(normals, GLTF_ARRAY_BUFFER, GLTF_FLOAT, "VEC3")[0]
+
+            # glTF puts the UV origin at the top left, Blender at the bottom left
+            if "uvs" in attributes:
+                uvs = attributes["uvs"].copy()
+                uvs[:, 1] = 1.0 - uvs[:, 1]
+                primitive["attributes"]["TEXCOORD_0"] = add_view(uvs, GLTF_ARRAY_BUFFER, GLTF_FLOAT, "VEC2")[0]
+
+            if "colors" in attributes:
+                rgba = np.ones((len(vertices), 4), dtype = np.float32)
+                rgba[:, :min(4, attributes["colors"].shape[1])] = attributes["colors"][:, :4]
+                primitive["attributes"]["COLOR_0"] = add_view(rgba, GLTF_ARRAY_BUFFER, GLTF_FLOAT, "VEC4")[0]
+
+            # 16 bit indices when they fit
+            if len(vertices) <= 0xFFFF: indices, component_type = faces.astype(np.uint16).ravel(), GLTF_UNSIGNED_SHORT
+            else: indices, component_type = faces.astype(np.uint32).ravel(), GLTF_UNSIGNED_INT
+            primitive["indices"] = add_view(indices, GLTF_ELEMENT_ARRAY_BUFFER, component_type, "SCALAR")[0]
+
+            gltf["meshes"].append({"name": name, "primitives": [primitive]})
+            gltf["nodes"].append({"name": name, "mesh": len(gltf["meshes"]) - 1})
+
+        gltf["buffers"].append({"uri": os.path.basename(bin_path), "byteLength": f.tell()})
+
+    with open(filepath, "w") as f: json.dump(gltf, f, indent = 1)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Conversion Functions~~~~~~~~~~~~~~~~~~~~
+def section_names(name, section_count):
+
+    # Same names the importer gives the objects
+    if section_count == 1: return [name]
+    return [name + " Section " + str(section) for section in range(section_count)]
+
+def convert_file(filepath, output_dir = None, file_format = "PLY", axis_forward = "Z", axis_up = "Y", **options):
+
+    # Import one CSV with pipeline.load_mesh_data and write it out. A PLY file holds one mesh, so every section of a
+    # file with several gets its own PLY; OBJ and glTF keep them together. Returns the paths written.
+    file_format = file_format.upper()
+    if file_format not in FORMATS: raise ValueError("Unknown output format " + str(file_format))
+
+    to_forward, to_up = FORMAT_AXES[file_format]
+    # The axis conversion is baked into the vertex data by the pipeline's transform stage
+    matrix = axis_conversion(axis_forward, axis_up, to_forward, to_up)
+    sections = pipeline.load_mesh_data(filepath, transform = matrix.tolist(), **options)
+
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    base = os.path.join(output_dir or os.path.dirname(os.path.abspath(filepath)), name)
+    names = section_names(name, len(sections))
+
+    if file_format == "PLY":
+        paths = [base + ".ply"] if len(sections) == 1 else [base + "_section" + str(section) + ".ply" for section in range(len(sections))]
+        for path, mesh_data in zip(paths, sections): write_ply(path, mesh_data)
+        return paths
+
+    if file_format == "OBJ":
+        write_obj(base + ".obj", sections, names)
+        return [base + ".obj"]
+
+    write_gltf(base + ".gltf", sections, names)
+    return [base + ".gltf", base + ".bin"]
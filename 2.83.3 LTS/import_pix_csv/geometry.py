@@ -0,0 +1,631 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Array stages that run between parsing and mesh creation. Nothing in here may import bpy.
+
+import numpy as np
+
+# Distance under which two vertices are considered the same one (same as the old remove_doubles threshold)
+MERGE_THRESHOLD = 0.0001
+
+# Height of a triangle, relative to its longest edge, under which it counts as degenerate (a sliver or a line)
+DEGENERATE_RATIO = 1e-6
+
+# Primitive topologies faces can be assembled from, and the ones that support primitive restart
+PRIMITIVE_TOPOLOGIES = ("TRIANGLE_LIST", "TRIANGLE_STRIP", "TRIANGLE_FAN")
+RESTART_TOPOLOGIES = ("TRIANGLE_STRIP", "TRIANGLE_FAN")
+
+# Primitive restart index (all bits set) of a 16-bit and of a 32-bit index buffer
+RESTART_INDEX_16 = 0xFFFF
+RESTART_INDEX_32 = 0xFFFFFFFF
+
+# How compactly normals and UVs are kept between parsing and Blender: 32-bit floats, 16-bit floats, or 16-bit
+# normalized integers for the unit length normals, tangents and binormals (and 16-bit floats for UVs)
+PRECISIONS = ("FULL", "HALF", "QUANTIZED")
+DIRECTION_SEMANTICS = ("normal", "tangent", "binormal")
+SNORM16_SCALE = 32767.0
+
+
+# ~~~~~~~~~~~~~~~~~~~~Storage Functions~~~~~~~~~~~~~~~~~~~~
+def index_dtype(count, signed = False):
+
+    # Smallest integer type that can index "count" vertices; signed types leave room for the -1 restart marker
+    if signed: return np.int16 if count <= 0x7FFF else np.int32 if count <= 0x7FFFFFFF else np.int64
+    return np.uint16 if count <= 0xFFFF else np.uint32 if count <= 0xFFFFFFFF else np.uint64
+
+def compact_attribute(semantic, values, precision = "FULL"):
+
+    # Store an attribute in the given precision (see PRECISIONS); decode_attribute turns it back into float32
+    if precision == "FULL" or semantic not in DIRECTION_SEMANTICS + ("texcoord",): return values
+    if precision == "QUANTIZED" and semantic in DIRECTION_SEMANTICS:
+        return np.rint(np.clip(values, -1.0, 1.0) * SNORM16_SCALE).astype(np.int16)
+    return np.asarray(values, dtype = np.float16)
+
+def decode_attribute(values):
+
+    # float32 view of an attribute in any precision; 16-bit integers are the normalized directions of compact_attribute
+    values = np.asarray(values)
+    if values.dtype == np.int16: return values.astype(np.float32) / np.float32(SNORM16_SCALE)
+    return values.astype(np.float32, copy = False)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Vertex Table Functions~~~~~~~~~~~~~~~~~~~~
+def vertex_table(vtx, idx, attributes):
+
+    # Build the vertex buffer and index buffer of a draw from its CSV rows. Every row is one corner of a primitive:
+    # VTX is the corner's position in the draw and IDX the vertex it references. Rows referencing the same vertex
+    # carry the same data, so the per-row attributes are scattered into one slot per referenced IDX.
+    # Returns the per-vertex attribute arrays, the index buffer (in VTX order) pointing into them, and the mask of
+    # IDX values in range(max(IDX) + 1) that are actually referenced; unreferenced slots ("holes") are left out.
+    # Negative IDX values are primitive restarts (see mark_restarts) and stay -1 in the index buffer.
+    vtx = np.asarray(vtx, dtype = np.int64)
+    idx = np.asarray(idx, dtype = np.int64)
+
+    # Corners have to be in VTX order for the faces to come out right
+    order = None
+    if len(vtx) > 1 and np.any(vtx[1:] < vtx[:-1]):
+        order = np.argsort(vtx, kind = "stable")
+        idx = idx[order]
+
+    valid = idx >= 0
+    used = np.zeros(int(idx.max()) + 1 if len(idx) else 0, dtype = bool)
+    used[idx[valid]] = True
+    remap = np.cumsum(used) - 1
+    vertex_count = int(remap[-1]) + 1 if len(remap) else 0
+    indices = np.full(len(idx), -1, dtype = index_dtype(vertex_count, signed = True))
+    indices[valid] = remap[idx[valid]]
+
+    table = {}
+    for name, values in attributes.items():
+        values = np.asarray(values)
+        if order is not None: values = values[order]
+        column = np.zeros((vertex_count,) + values.shape[1:], dtype = values.dtype)
+        column[indices[valid]] = values[valid]
+        table[name] = column
+
+    return table, indices, used
+
+
+def indexed_table(attributes, idx):
+
+    # vertex_table for data that already is a vertex buffer with an index buffer (a raw buffer import): "attributes"
+    # are per vertex and "idx" points into them. Unreferenced vertices are dropped the same way.
+    idx = np.asarray(idx, dtype = np.int64)
+    vertex_count = len(next(iter(attributes.values())))
+    valid = idx >= 0
+    if np.any(idx[valid] >= vertex_count): raise ValueError("The index buffer points past the end of the vertex buffer")
+
+    used = np.zeros(vertex_count, dtype = bool)
+    used[idx[valid]] = True
+    remap = np.cumsum(used) - 1
+    indices = np.full(len(idx), -1, dtype = index_dtype(int(remap[-1]) + 1 if len(remap) else 0, signed = True))
+    indices[valid] = remap[idx[valid]]
+
+    # When every vertex is used the attributes stay what they were (possibly views into a mapped file)
+    if used.all(): return dict(attributes), indices, used
+    return {name: np.asarray(values)[used] for name, values in attributes.items()}, indices, used
+
+
+class GrowableArray:
+
+    # Typed array with amortized O(1) appends, used to collect blocks of rows when the total count isn't known upfront
+    def __init__(self, dtype, shape = (), capacity = 1024):
+        self.data = np.zeros((capacity,) + tuple(shape), dtype = dtype)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def reserve(self, capacity):
+        if capacity <= len(self.data): return
+
+        # Grow by 1.5x rather than 2x to keep the slack (and so the peak memory) close to the final size
+        grown = np.zeros((max(capacity, len(self.data) * 3 // 2),) + self.data.shape[1:], dtype = self.data.dtype)
+        grown[:self.size] = self.data[:self.size]
+        self.data = grown
+
+    def extend(self, values):
+        self.reserve(self.size + len(values))
+        self.data[self.size:self.size + len(values)] = values
+        self.size += len(values)
+
+    def resize(self, size):
+        # New elements are zero
+        self.reserve(size)
+        self.size = max(self.size, size)
+
+    def array(self):
+        return self.data[:self.size]
+
+class VertexTableBuilder:
+
+    # Incremental version of vertex_table for streamed blocks of rows: attributes are scattered into tables that grow
+    # to max(IDX) + 1 as blocks come in, and the rows' IDX values are appended to the index buffer
+    def __init__(self):
+        self.vtx = GrowableArray(np.int64)
+        self.idx = GrowableArray(np.int64)
+        self.used = GrowableArray(bool)
+        self.columns = {}
+
+    def add(self, vtx, idx, attributes):
+        idx = np.asarray(idx, dtype = np.int64)
+        if len(idx) == 0: return
+
+        self.vtx.extend(vtx)
+        self.idx.extend(idx)
+
+        # Restarts only go into the index buffer
+        valid = idx >= 0
+        idx = idx[valid]
+        if len(idx) == 0: return
+
+        size = int(idx.max()) + 1
+        self.used.resize(size)
+        self.used.array()[idx] = True
+
+        for name, values in attributes.items():
+            values = np.asarray(values)[valid]
+            if name not in self.columns: self.columns[name] = GrowableArray(values.dtype, values.shape[1:])
+            column = self.columns[name]
+            column.resize(size)
+            column.array()[idx] = values
+
+    def finish(self):
+        vtx = self.vtx.array()
+        idx = self.idx.array()
+        used = self.used.array()
+
+        # Same as vertex_table: corners in VTX order, unreferenced slots dropped
+        if len(vtx) > 1 and np.any(vtx[1:] < vtx[:-1]): idx = idx[np.argsort(vtx, kind = "stable")]
+        remap = np.cumsum(used) - 1
+        indices = np.full(len(idx), -1, dtype = index_dtype(int(remap[-1]) + 1 if len(remap) else 0, signed = True))
+        indices[idx >= 0] = remap[idx[idx >= 0]]
+
+        table = {}
+        for name, column in self.columns.items(): table[name] = column.array()[used]
+
+        return table, indices, used
+
+
+# ~~~~~~~~~~~~~~~~~~~~Topology Functions~~~~~~~~~~~~~~~~~~~~
+def mark_restarts(idx, primitive_topology):
+
+    # Strips and fans are cut with a primitive restart index (all bits set for the index size). Mark those rows as -1
+    # so they don't end up as vertices; a triangle list has no restarts, there 0xFFFF can be a real vertex.
+    # The CSV doesn't say how wide the indices were: a draw whose indices all fit in 16 bits restarts at 0xFFFF, any
+    # other at 0xFFFFFFFF, so a 32-bit strip keeps its vertex 65535.
+    if primitive_topology not in RESTART_TOPOLOGIES or len(idx) == 0: return idx
+    restart = RESTART_INDEX_16 if idx.max() <= RESTART_INDEX_16 else RESTART_INDEX_32
+    return np.where((idx == restart) | (idx < 0), -1, idx)
+
+def segment_starts(indices):
+
+    # For every position in the index buffer, the position where its strip/fan started (just after the last restart)
+    positions = np.arange(len(indices))
+    return np.maximum.accumulate(np.where(indices < 0, positions + 1, 0))
+
+def assemble_faces(indices, primitive_topology = "TRIANGLE_LIST", vertex_order = False):
+
+    # Turn an index buffer into (F, 3) triangles for the given topology. Restarts (-1) cut strips and fans, and
+    # degenerate triangles (repeated indices, used to stitch strips together) are dropped.
+    indices = np.asarray(indices)
+    if indices.dtype.kind not in "iu": indices = indices.astype(np.int64)
+
+    if primitive_topology == "TRIANGLE_LIST" or len(indices) < 3:
+        # Every three consecutive indices make a face; a trailing incomplete face is ignored
+        faces = indices[:len(indices) // 3 * 3].reshape(-1, 3)
+
+    elif primitive_topology == "TRIANGLE_STRIP":
+        # Triangle i is (i, i + 1, i + 2); every other triangle swaps its first two corners to keep the winding
+        starts = segment_starts(indices)[:-2]
+        faces = np.stack((indices[:-2], indices[1:-1], indices[2:]), axis = 1)
+        odd = (np.arange(len(faces)) - starts) % 2 == 1
+        faces[odd] = faces[odd][:, [1, 0, 2]]
+
+    elif primitive_topology == "TRIANGLE_FAN":
+        # Triangle i is (first, i + 1, i + 2), where "first" is the first index after the last restart
+        starts = segment_starts(indices)
+        corners = np.arange(1, len(indices) - 1)
+        faces = np.stack((indices[starts[corners]], indices[corners], indices[corners + 1]), axis = 1)
+        faces = faces[corners > starts[corners]]
+
+    else:
+        raise ValueError("Unknown primitive topology " + str(primitive_topology))
+
+    # Drop triangles touching a restart and degenerate ones
+    kept = (faces >= 0).all(axis = 1)
+    kept &= (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+    faces = faces[kept]
+
+    # Flipping the winding is just reversing the corners
+    if vertex_order: faces = faces[:, ::-1]
+    return np.ascontiguousarray(faces)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Transform Functions~~~~~~~~~~~~~~~~~~~~
+def transform_matrix(matrix = None, mirror_x = False):
+
+    # One 4x4 matrix for the whole transform stage: the X mirror first, then "matrix" (3x3 or 4x4, nested lists are
+    # fine, e.g. the axis conversion of the import)
+    result = np.identity(4)
+    if matrix is not None:
+        matrix = np.asarray(matrix, dtype = np.float64)
+        result[:matrix.shape[0], :matrix.shape[1]] = matrix
+    if mirror_x: result = result @ np.diag([-1.0, 1.0, 1.0, 1.0])
+    return result
+
+def is_identity(matrix):
+    return np.array_equal(matrix, np.identity(4))
+
+def flips_winding(matrix):
+
+    # A transform with a negative determinant (a mirror) turns every face inside out unless its winding is reversed
+    return np.linalg.det(matrix[:3, :3]) < 0
+
+def transform_points(points, matrix):
+    points = np.asarray(points, dtype = np.float32)
+    if is_identity(matrix): return points
+    return points @ matrix[:3, :3].T.astype(np.float32) + matrix[:3, 3].astype(np.float32)
+
+def transform_directions(vectors, matrix):
+
+    # Tangents and binormals follow the surface, so they take the plain linear part of the matrix. A fourth component
+    # is the handedness of the tangent frame, which a mirror flips.
+    vectors = np.asarray(vectors, dtype = np.float32)
+    if is_identity(matrix): return vectors
+
+    result = vectors.copy()
+    result[:, :3] = vectors[:, :3] @ matrix[:3, :3].T.astype(np.float32)
+    if vectors.shape[1] > 3 and flips_winding(matrix): result[:, 3] *= -1
+    return result
+
+def transform_normals(normals, matrix):
+
+    # Normals have to stay perpendicular to the surface, so they take the inverse transpose of the linear part;
+    # they are renormalized in case the matrix scales
+    normals = np.asarray(normals, dtype = np.float32)
+    if is_identity(matrix): return normals
+
+    normal_matrix = np.linalg.inv(matrix[:3, :3]).T
+    directions = normals[:, :3] @ normal_matrix.T.astype(np.float32)
+    lengths = np.linalg.norm(directions, axis = 1, keepdims = True)
+
+    result = normals.copy()
+    result[:, :3] = np.where(lengths > 0, directions / np.where(lengths > 0, lengths, 1.0), directions)
+    return result
+
+
+# ~~~~~~~~~~~~~~~~~~~~Mesh Buffer Functions~~~~~~~~~~~~~~~~~~~~
+def mesh_buffers(positions, faces, loop_uvs = None, loop_normals = None):
+
+    # Convert (V, 3) positions, (F, 3) triangle indices and optional per-corner ("loop") UVs/normals into the
+    # flat layouts that Mesh.vertices/loops/polygons/uv_layers expect from foreach_set
+    positions = np.asarray(positions, dtype = np.float32).reshape(-1, 3)
+    faces = np.asarray(faces, dtype = np.int32).reshape(-1, 3)
+
+    face_count = len(faces)
+    loop_count = face_count * 3
+
+    buffers = {
+               "vertex_count": len(positions),
+               "face_count": face_count,
+               "loop_count": loop_count,
+               "co": np.ascontiguousarray(positions).ravel(),
+               "vertex_index": np.ascontiguousarray(faces).ravel(),
+               "loop_start": np.arange(0, loop_count, 3, dtype = np.int32),
+               "loop_total": np.full(face_count, 3, dtype = np.int32),
+               "uv": None,
+               "normals": None,
+               }
+
+    # Per-loop data has to follow the corner order of the faces, so it is accepted as (F, 3, k) or (F * 3, k)
+    if loop_uvs is not None:
+        buffers["uv"] = np.ascontiguousarray(decode_attribute(loop_uvs)).reshape(loop_count * 2)
+    if loop_normals is not None:
+        buffers["normals"] = np.ascontiguousarray(decode_attribute(loop_normals)).reshape(loop_count, 3)
+
+    return buffers
+
+
+# ~~~~~~~~~~~~~~~~~~~~Welding Functions~~~~~~~~~~~~~~~~~~~~
+def grid_clusters(points):
+
+    # Group points (already scaled so that one grid cell is 1.0 wide) by the grid cell they fall into.
+    # Returns the index of the first point of every cell and the cell index of every point.
+    cells = np.floor(points).astype(np.int64)
+    if len(cells) == 0: return np.empty(0, dtype = np.int64), np.empty(0, dtype = np.int64)
+
+    # Pack the three cell coordinates into one integer key when the grid is small enough; sorting a flat
+    # int64 array is several times faster than np.unique over rows
+    cells -= cells.min(axis = 0)
+    spans = cells.max(axis = 0) + 1
+    if float(spans[0]) * float(spans[1]) * float(spans[2]) < 2.0 ** 62:
+        keys = (cells[:, 0] * spans[1] + cells[:, 1]) * spans[2] + cells[:, 2]
+        _, first, inverse = np.unique(keys, return_index = True, return_inverse = True)
+    else:
+        _, first, inverse = np.unique(cells, axis = 0, return_index = True, return_inverse = True)
+
+    return first, inverse.ravel()
+
+def cell_keys(cells, spans = None):
+
+    # One sortable key per (N, 3) integer grid cell: packed into an int64 with the grid's spans (see grid_clusters),
+    # or an (x, y, z) record when the grid is too big for that
+    if spans is not None: return (cells[:, 0] * spans[1] + cells[:, 1]) * spans[2] + cells[:, 2]
+    keys = np.empty(len(cells), dtype = [("x", np.int64), ("y", np.int64), ("z", np.int64)])
+    keys["x"], keys["y"], keys["z"] = cells[:, 0], cells[:, 1], cells[:, 2]
+    return keys
+
+def neighbour_pairs(positions, threshold):
+
+    # Every pair (a, b), a < b, of points that are at most "threshold" apart. Points are hashed into cells "threshold"
+    # wide, so a point's partners are all in its own cell or one of the 26 around it; the cells are sorted by key and
+    # each cell looks up its neighbours with a binary search. Every pair of cells is visited once (the cell itself and
+    # the 13 neighbours after it), and the candidates in them are checked against the real distance.
+    cells = np.empty(positions.shape, dtype = np.int64)
+    for axis in range(3): cells[:, axis] = np.floor(positions[:, axis] / np.float64(threshold))
+
+    # A margin of one cell on every side keeps the neighbours of the outermost cells inside the packed key range
+    cells -= cells.min(axis = 0) - 1
+    spans = cells.max(axis = 0) + 2
+    if float(spans[0]) * float(spans[1]) * float(spans[2]) >= 2.0 ** 62: spans = None
+
+    order = np.argsort(cell_keys(cells, spans), kind = "stable")
+    cells = cells[order]
+    sorted_keys = cell_keys(cells, spans)
+    starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+    counts = np.diff(np.append(starts, len(order)))
+    occupied = sorted_keys[starts]
+
+    offsets = [(0, 0, 0)] + [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1) if (x, y, z) > (0, 0, 0)]
+    pairs = []
+    for offset in offsets:
+        if offset == (0, 0, 0):
+            cell, other = np.arange(len(starts)), np.arange(len(starts))
+        else:
+            targets = cell_keys(cells[starts] + np.array(offset, dtype = np.int64), spans)
+            other = np.minimum(np.searchsorted(occupied, targets), len(occupied) - 1)
+            cell = np.flatnonzero(occupied[other] == targets)
+            other = other[cell]
+
+        # Every point of "cell" against every point of "other"
+        sizes = counts[cell] * counts[other]
+        if not sizes.any(): continue
+        local = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        width = np.repeat(counts[other], sizes)
+        a = np.repeat(starts[cell], sizes) + local // width
+        b = np.repeat(starts[other], sizes) + local % width
+        if offset == (0, 0, 0): a, b = a[a < b], b[a < b]
+
+        a, b = order[a], order[b]
+        close = ((positions[a].astype(np.float64) - positions[b]) ** 2).sum(axis = 1) <= np.float64(threshold) ** 2
+        pairs.append(np.stack((np.minimum(a, b), np.maximum(a, b)), axis = 1)[close])
+
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype = np.int64)
+
+def merge_targets(count, pairs):
+
+    # For every one of "count" points (numbered in input order), the point it merges into, given the (a, b), a < b,
+    # pairs within the threshold. Same as going through the points in order, where a point that hasn't been merged
+    # yet is kept and takes every later unmerged point within the threshold; chains are not followed, so a point
+    # only merges into a kept point it is close to itself.
+    # Done in rounds: a point with no undecided point before it is kept, and its undecided neighbours after it are
+    # merged. A merged point then goes to the first kept point within the threshold.
+    a, b = pairs[:, 0], pairs[:, 1]
+    kept = np.zeros(count, dtype = bool)
+    undecided = np.ones(count, dtype = bool)
+    live = np.ones(len(a), dtype = bool)
+    while undecided.any():
+        blocked = np.zeros(count, dtype = bool)
+        blocked[b[live]] = True
+        keep = undecided & ~blocked
+        kept |= keep
+        undecided &= ~keep
+        undecided[b[live & keep[a]]] = False
+        live &= undecided[a] & undecided[b]
+
+    targets = np.where(kept, np.arange(count), count)
+    close = kept[a] & ~kept[b]
+    np.minimum.at(targets, b[close], a[close])
+    return targets
+
+def weld_vertices(positions, faces, threshold = MERGE_THRESHOLD):
+
+    # Array replacement for bpy.ops.mesh.remove_doubles: merges every vertex into the first kept vertex within
+    # "threshold" of it (see merge_targets). Returns the indices of the vertices that are kept (in input order), the
+    # faces remapped onto them and a mask of the faces that survived (faces that collapse are dropped).
+    positions = np.asarray(positions, dtype = np.float32).reshape(-1, 3)
+    faces = np.asarray(faces, dtype = np.int64).reshape(-1, 3)
+
+    if threshold <= 0 or len(positions) == 0:
+        return np.arange(len(positions)), faces.astype(index_dtype(len(positions))), np.ones(len(faces), dtype = bool)
+
+    # Corners of unindexed meshes repeat the same position many times; fold exact copies first, so a cell holds
+    # a handful of distinct points and the candidate pairs stay few. Distinct points are numbered in the order they
+    # first appear in.
+    rows = np.ascontiguousarray(positions).view(np.dtype((np.void, positions.dtype.itemsize * 3))).ravel()
+    _, first, inverse = np.unique(rows, return_index = True, return_inverse = True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    first = first[order]
+
+    # Merge the distinct points that are close enough into the first kept one, like remove_doubles does
+    targets = merge_targets(len(first), neighbour_pairs(positions[first], threshold))
+    groups, vertex_map = np.unique(targets, return_inverse = True)
+    representatives = first[groups]
+    vertex_map = vertex_map.ravel()[rank[inverse.ravel()]]
+
+    # Remap the index buffer and drop triangles that collapsed into a line or point
+    faces = vertex_map[faces]
+    kept_faces = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])
+
+    return representatives, faces[kept_faces].astype(index_dtype(len(representatives))), kept_faces
+
+
+# ~~~~~~~~~~~~~~~~~~~~Face Cleanup Functions~~~~~~~~~~~~~~~~~~~~
+def degenerate_faces(positions, faces, ratio = DEGENERATE_RATIO):
+
+    # Mask of the triangles with (next to) no area: repeated vertices, or corners on one line. Twice the area is the
+    # longest edge times the height, so the test doesn't depend on the scale of the mesh.
+    faces = np.asarray(faces).reshape(-1, 3)
+    corners = np.asarray(positions, dtype = np.float64)[faces]
+    edges = np.roll(corners, -1, axis = 1) - corners
+    doubled_area = np.linalg.norm(np.cross(edges[:, 0], edges[:, 1]), axis = 1)
+    longest = (edges ** 2).sum(axis = 2).max(axis = 1)
+    return doubled_area <= ratio * longest
+
+def duplicate_faces(faces):
+
+    # Mask of the triangles that use the same three vertices as an earlier one, in any order. That covers both
+    # duplicates and back-to-back (coincident, opposite winding) pairs, which are what select_interior_faces found.
+    faces = np.asarray(faces).reshape(-1, 3)
+    if len(faces) == 0: return np.zeros(0, dtype = bool)
+
+    # Sort the corners of every triangle so the key doesn't depend on the winding, then pack it into one integer
+    # when the indices are small enough (see grid_clusters)
+    corners = np.sort(faces.astype(np.int64), axis = 1)
+    span = int(corners.max()) + 1
+    if float(span) ** 3 < 2.0 ** 62:
+        _, first = np.unique((corners[:, 0] * span + corners[:, 1]) * span + corners[:, 2], return_index = True)
+    else:
+        _, first = np.unique(corners, axis = 0, return_index = True)
+
+    duplicates = np.ones(len(faces), dtype = bool)
+    duplicates[first] = False
+    return duplicates
+
+def clean_faces(positions, faces, ratio = DEGENERATE_RATIO):
+
+    # Array replacement for select_interior_faces + delete: returns the mask of the faces to keep, dropping degenerate
+    # triangles and keeping only the first of every set of triangles over the same three vertices
+    kept = ~degenerate_faces(positions, faces, ratio)
+    kept[kept] = ~duplicate_faces(np.asarray(faces).reshape(-1, 3)[kept])
+    return kept
+
+
+# ~~~~~~~~~~~~~~~~~~~~Decimation Functions~~~~~~~~~~~~~~~~~~~~
+def cluster_vertices(positions, cell_size):
+
+    # Vertex clustering on a uniform grid: returns the first vertex of every occupied cell and the cell of every vertex
+    return grid_clusters(np.asarray(positions, dtype = np.float64).reshape(-1, 3) / cell_size)
+
+def cluster_means(values, clusters, count):
+
+    # Average of the (N, k) values over every cluster, one bincount per component
+    values = np.asarray(values, dtype = np.float64).reshape(len(clusters), -1)
+    sizes = np.maximum(np.bincount(clusters, minlength = count), 1)
+    sums = [np.bincount(clusters, weights = values[:, component], minlength = count) for component in range(values.shape[1])]
+    return (np.stack(sums, axis = 1) / sizes[:, None]).astype(np.float32)
+
+def collapsed_faces(faces):
+    return (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 2] == faces[:, 0])
+
+def decimation_cell_size(positions, faces, target_faces, iterations = 4):
+
+    # Cell size at which vertex clustering leaves about target_faces triangles (0.0 if there are fewer already).
+    # A surface covered by cells of size c keeps about two triangles per cell, so the first guess comes from the total
+    # area; a few clustering passes then correct it, since the count goes roughly with 1 / c^2.
+    faces = np.asarray(faces).reshape(-1, 3)
+    if target_faces <= 0 or len(faces) <= target_faces: return 0.0
+
+    corners = np.asarray(positions, dtype = np.float64)[faces]
+    area = 0.5 * np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis = 1).sum()
+    if area <= 0: return 0.0
+
+    cell_size = np.sqrt(2.0 * area / target_faces)
+    for _ in range(iterations):
+        _, clusters = cluster_vertices(positions, cell_size)
+        face_count = len(faces) - np.count_nonzero(collapsed_faces(clusters[faces]))
+        if abs(face_count - target_faces) <= 0.1 * target_faces: break
+        cell_size *= np.sqrt(face_count / target_faces) if face_count else 0.5
+    return float(cell_size)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Attribute Buffer Functions~~~~~~~~~~~~~~~~~~~~
+def uv_layer_buffers(name, loop_values):
+
+    # Blender only stores 2D floats per face corner losslessly (UV layers), so wider attributes such as tangents are
+    # split into ".xy"/".zw" layers. Returns a list of (layer name, flat uv buffer).
+    loop_values = decode_attribute(loop_values)
+    loop_values = loop_values.reshape(-1, loop_values.shape[-1])
+    component_count = loop_values.shape[1]
+
+    if component_count <= 2:
+        pairs = [(name, 0)]
+    else:
+        pairs = [(name + ".xy", 0), (name + ".zw", 2)]
+
+    layers = []
+    for layer_name, start in pairs:
+        uv = np.zeros((len(loop_values), 2), dtype = np.float32)
+        stop = min(start + 2, component_count)
+        uv[:, :stop - start] = loop_values[:, start:stop]
+        layers.append((layer_name, uv.ravel()))
+
+    return layers
+
+def color_buffer(loop_colors):
+
+    # Vertex colors are always RGBA; missing channels are black, a missing alpha is opaque
+    loop_colors = decode_attribute(loop_colors)
+    loop_colors = loop_colors.reshape(-1, loop_colors.shape[-1])[:, :4]
+
+    rgba = np.zeros((len(loop_colors), 4), dtype = np.float32)
+    rgba[:, 3] = 1.0
+    rgba[:, :loop_colors.shape[1]] = loop_colors
+    return rgba.ravel()
+
+def vertex_group_assignments(blend_indices, blend_weights = None):
+
+    # Turn per-vertex bone indices (V, k) and weights (V, k) into (group index, weight, vertex indices) triples.
+    # VertexGroup.add takes one weight for a list of vertices, so vertices are bucketed by (group, weight); weights
+    # are usually 8-bit quantized, which keeps the number of buckets small.
+    blend_indices = np.asarray(blend_indices)
+    blend_indices = np.rint(blend_indices.reshape(len(blend_indices), -1)).astype(np.int64)
+
+    # Without weights every vertex is rigidly bound to its first bone
+    if blend_weights is None:
+        blend_weights = np.zeros(blend_indices.shape, dtype = np.float32)
+        blend_weights[:, 0] = 1.0
+    else:
+        blend_weights = np.asarray(blend_weights, dtype = np.float32).reshape(len(blend_indices), -1)
+
+    # Formats with one weight fewer than indices store the last weight implicitly (1 - sum of the others)
+    component_count = blend_indices.shape[1]
+    if blend_weights.shape[1] == component_count - 1:
+        implicit = 1.0 - blend_weights.sum(axis = 1, keepdims = True)
+        blend_weights = np.concatenate((blend_weights, implicit), axis = 1)
+    blend_weights = blend_weights[:, :component_count]
+    blend_indices = blend_indices[:, :blend_weights.shape[1]]
+
+    vertices = np.repeat(np.arange(len(blend_indices)), blend_indices.shape[1])
+    groups = blend_indices.ravel()
+    weights = blend_weights.ravel()
+
+    used = (weights > 0) & (groups >= 0)
+    vertices, groups, weights = vertices[used], groups[used], weights[used]
+
+    order = np.lexsort((weights, groups))
+    vertices, groups, weights = vertices[order], groups[order], weights[order]
+    starts = np.flatnonzero(np.concatenate(([True], (groups[1:] != groups[:-1]) | (weights[1:] != weights[:-1]))))
+    stops = np.append(starts[1:], len(groups))
+
+    return [(int(groups[start]), float(weights[start]), vertices[start:stop]) for start, stop in zip(starts, stops)]
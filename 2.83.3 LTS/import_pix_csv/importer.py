@@ -0,0 +1,849 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+import bpy
+import json
+import mathutils
+import os
+import queue
+import numpy as np
+from bpy_extras.io_utils import axis_conversion
+from bpy.props import BoolProperty, CollectionProperty, FloatProperty, IntProperty, StringProperty, EnumProperty
+from . import batch, cache, geometry, parsing, pipeline, profiling, worker
+
+# Custom property every imported mesh keeps the content hash of its arrays in (see pipeline.mesh_hash)
+MESH_HASH_PROPERTY = "pix_csv_hash"
+
+# Custom properties every imported object remembers its source in, so it can be reloaded when the file changes: the
+# file, the section of the file, the pipeline options (JSON) and the pipeline.source_key of the last (re)load
+SOURCE_PROPERTY = "pix_csv_source"
+SECTION_PROPERTY = "pix_csv_section"
+OPTIONS_PROPERTY = "pix_csv_options"
+SOURCE_KEY_PROPERTY = "pix_csv_source_key"
+
+# Seconds between two checks of the watched files
+WATCH_INTERVAL = 1.0
+
+class PIX_CSV_Operator(bpy.types.Operator):
+
+    # Plugin definitions, such as ID, name, and file extension filters
+    bl_idname = "object.pix_csv_importer"
+    bl_label = "Import PIX CSV"
+    filepath = StringProperty(subtype = "FILE_PATH")
+    filter_glob = StringProperty(default = "*.csv;*.json;*.bin;*.raw", options = {"HIDDEN"})
+
+    # Multi-selection in the file browser; every selected CSV becomes its own object
+    files = CollectionProperty(type = bpy.types.OperatorFileListElement, options = {"HIDDEN", "SKIP_SAVE"})
+    directory = StringProperty(subtype = "DIR_PATH", options = {"HIDDEN", "SKIP_SAVE"})
+
+    # Options for generation of vertices
+    assume_DirectX_PIX_layout = BoolProperty(
+                                             name = "Assume DirectX PIX Layout",
+                                             description = "Assume that the layout of a given CSV is from DirectX PIX instead of RenderDoc. Acts like original script.",
+                                             default = False,
+                                             )
+
+    mirror_x = BoolProperty(
+                            name = "Mirror X",
+                            description = "Mirror all the vertices across X axis",
+                            default = False,
+                            )
+
+    vertex_order = BoolProperty(
+                                name = "Change vertex order",
+                                description = "Reorder vertices in counter-clockwise order",
+                                default = False,
+                                )
+
+    split_sections = BoolProperty(
+                                  name = "Split Sections",
+                                  description = "Import every draw in the CSV (detected by repeated headers or VTX starting over) as its own object",
+                                  default = True,
+                                  )
+
+    primitive_topology = EnumProperty(
+                                      name = "Topology",
+                                      description = "How the rows (in VTX order) form triangles",
+                                      items = (
+                                               ("TRIANGLE_LIST", "Triangle List", "Every three rows make a triangle"),
+                                               ("TRIANGLE_STRIP", "Triangle Strip", "Every row makes a triangle with the two before it"),
+                                               ("TRIANGLE_FAN", "Triangle Fan", "Every row makes a triangle with the one before it and the first row"),
+                                               ),
+                                      default = "TRIANGLE_LIST",
+                                      )
+
+    # Options for merging in the output (vertex shader out) CSV of the same draw
+    output_filepath = StringProperty(
+                                     name = "Output CSV",
+                                     description = "Output CSV of the same draw to join in on VTX; \"{name}\" stands for the imported file's name (e.g. \"{name}_out.csv\") and relative paths start at its folder",
+                                     default = "",
+                                     )
+
+    output_mapping = StringProperty(
+                                    name = "Output Mapping",
+                                    description = "Output CSV columns to import and what they become, e.g. \"v_Varying0.xy=UVMap; v_Varying1.xy=Lightmap; gl_Position.xyz=shape.Clip Space\"",
+                                    default = parsing.DEFAULT_OUTPUT_MAPPING,
+                                    )
+
+    # Options for importing a lightweight proxy of very dense captures
+    target_faces = IntProperty(
+                               name = "Target Triangles",
+                               description = "Decimate every imported mesh to about this many triangles by merging nearby vertices (0 = full detail)",
+                               default = 0,
+                               min = 0,
+                               )
+
+    cell_size = FloatProperty(
+                              name = "Cluster Size",
+                              description = "Decimate by merging all the vertices within every grid cell of this size, instead of aiming for a triangle count (0 = use Target Triangles)",
+                              default = 0.0,
+                              min = 0.0,
+                              precision = 4,
+                              )
+
+    # Options for importing raw buffers instead of CSV
+    layout_filepath = StringProperty(
+                                     name = "Buffer Layout",
+                                     description = "JSON layout descriptor, or a CSV export of the same draw whose header gives the layout, to import the selected files as raw vertex buffers; \"{name}\" stands for the imported file's name. Leave empty for CSV files and JSON descriptors",
+                                     default = "",
+                                     )
+
+    # Options for reading very large files
+    use_streaming = BoolProperty(
+                                 name = "Stream File",
+                                 description = "Read the CSV in blocks of rows to keep memory usage down on very large captures",
+                                 default = False,
+                                 )
+
+    chunk_size = IntProperty(
+                             name = "Chunk Size",
+                             description = "Number of rows read per block when streaming; lower values use less memory",
+                             default = parsing.DEFAULT_CHUNK_SIZE,
+                             min = 1000,
+                             )
+
+    precision = EnumProperty(
+                             name = "Precision",
+                             description = "How normals, tangents and UVs are stored between reading the file and building the mesh",
+                             items = (
+                                      ("FULL", "Full", "32-bit floats, exactly as in the CSV"),
+                                      ("HALF", "Half", "16-bit floats; halves the memory of normals and UVs"),
+                                      ("QUANTIZED", "Quantized", "16-bit normalized integers for normals, tangents and binormals, 16-bit floats for UVs"),
+                                      ),
+                             default = "FULL",
+                             )
+
+    use_cache = BoolProperty(
+                             name = "Use Import Cache",
+                             description = "Store the imported arrays on disk and load them from there on the next import of the same, unchanged file",
+                             default = True,
+                             )
+
+    worker_count = IntProperty(
+                               name = "Worker Processes",
+                               description = "Number of processes that parse the selected files in parallel (0 = one per CPU core)",
+                               default = 0,
+                               min = 0,
+                               )
+
+    unique_meshes = BoolProperty(
+                                 name = "Unique Meshes",
+                                 description = "Give every imported object its own copy of its mesh, even if an identical mesh was imported before",
+                                 default = False,
+                                 )
+
+    use_background = BoolProperty(
+                                  name = "Import in Background",
+                                  description = "Keep Blender responsive while the files are read, with a progress bar; press Esc to cancel",
+                                  default = True,
+                                  )
+
+    # Options for finding out where the time of an import goes
+    trace_memory = BoolProperty(
+                                name = "Measure Memory",
+                                description = "Record the peak memory use of every import phase (makes the import slower)",
+                                default = False,
+                                )
+
+    write_log = BoolProperty(
+                             name = "Write Import Log",
+                             description = "Write the timings of the import as JSON next to every imported file",
+                             default = False,
+                             )
+
+    # Options for axis alignment
+    bake_transform = BoolProperty(
+                                  name = "Apply Transform",
+                                  description = "Bake the axis conversion into the vertex data instead of setting it as the object's transform",
+                                  default = False,
+                                  )
+
+    axis_forward = EnumProperty(
+                                name = "Forward",
+                                items = (
+                                         ('X', "X Forward", ""),
+                                         ('Y', "Y Forward", ""),
+                                         ('Z', "Z Forward", ""),
+                                         ('-X', "-X Forward", ""),
+                                         ('-Y', "-Y Forward", ""),
+                                         ('-Z', "-Z Forward", ""),
+                                         ),
+                                default = 'Z',
+                                )
+
+    axis_up = EnumProperty(
+                           name = "Up",
+                           items = (
+                                    ('X', "X Up", ""),
+                                    ('Y', "Y Up", ""),
+                                    ('Z', "Z Up", ""),
+                                    ('-X', "-X Up", ""),
+                                    ('-Y', "-Y Up", ""),
+                                    ('-Z', "-Z Up", ""),
+                                    ),
+                           default = 'Y',
+                           )
+
+
+# ~~~~~~~~~~~~~~~~~~~~Operator Functions~~~~~~~~~~~~~~~~~~~~
+    def execute(self, context):
+        keywords = self.as_keywords(ignore = ("axis_forward", "axis_up", "filter_glob", "filepath", "files", "directory"))
+        global_matrix = axis_conversion(from_forward = self.axis_forward, from_up = self.axis_up).to_4x4()
+
+        # Import every selected file, or just "filepath" when the operator is called from a script
+        filepaths = [os.path.join(self.directory, file.name) for file in self.files if file.name]
+        if not filepaths: filepaths = [self.filepath]
+
+        keywords["global_matrix"] = global_matrix
+        use_background = keywords.pop("use_background")
+
+        # Baking hands the axis conversion to the pipeline's transform stage and leaves the objects untransformed
+        if keywords.pop("bake_transform"):
+            keywords["transform"] = [list(row) for row in global_matrix]
+            keywords["global_matrix"] = mathutils.Matrix()
+
+        # With PIX_CSV_PROFILE set, the whole import runs under cProfile; in this process, so parsing shows up too
+        profile_path = profiling.profile_path(filepaths[0])
+        if profile_path:
+            keywords["worker_count"] = 1
+            failures, timers = profiling.run_profiled(profile_path, importCSVFiles, filepaths, **keywords)
+            self.report({"INFO"}, "Wrote profile to " + profile_path)
+
+        # Without a window (blender -b, or called from a script) there is no UI to keep responsive
+        elif use_background and context.window is not None:
+            return self.start_background(context, filepaths, keywords)
+
+        else:
+            failures, timers = importCSVFiles(filepaths, **keywords)
+
+        return self.report_results(filepaths, failures, timers)
+
+    def report_results(self, filepaths, failures, timers):
+
+        # One bad CSV doesn't abort the batch; report it and move on
+        for filepath, error in failures:
+            self.report({"WARNING"}, "Failed to import " + os.path.basename(filepath) + ": " + str(error))
+        if len(failures) == len(filepaths): return {"CANCELLED"}
+
+        # Where the time went, summed over all files
+        total = profiling.PhaseTimer()
+        for _, timer in timers: total.merge(timer)
+        self.report({"INFO"}, "Imported " + str(len(timers)) + " file(s) in " + total.summary())
+        if total.sizes: self.report({"INFO"}, "Mesh arrays: " + total.size_summary())
+
+        return {"FINISHED"}
+
+    def start_background(self, context, filepaths, keywords):
+
+        # Files are read by a worker thread (and process pool); modal() polls it on a timer and builds every mesh
+        # here on the main thread as soon as its arrays are ready
+        self._filepaths = filepaths
+        self._global_matrix = keywords.pop("global_matrix")
+        self._write_log = keywords.pop("write_log")
+        self._registry = None if keywords.pop("unique_meshes") else mesh_registry()
+        worker_count = keywords.pop("worker_count")
+        trace_memory = keywords.pop("trace_memory")
+        self._options = dict(keywords)
+        self._failures = []
+        self._timers = []
+
+        python_executable = getattr(bpy.app, "binary_path_python", None)
+        self._worker = worker.ImportWorker(filepaths, worker_count, python_executable, trace_memory, **keywords)
+        self._worker.start()
+
+        window_manager = context.window_manager
+        self._timer = window_manager.event_timer_add(0.1, window = context.window)
+        window_manager.modal_handler_add(self)
+        window_manager.progress_begin(0.0, 1.0)
+        return {"RUNNING_MODAL"}
+
+    def finish_background(self, context):
+        if self._timer is None: return
+        window_manager = context.window_manager
+        window_manager.event_timer_remove(self._timer)
+        window_manager.progress_end()
+        self._timer = None
+
+    def modal(self, context, event):
+
+        # Whatever goes wrong, the worker stops and the timer and progress bar don't outlive the import
+        try:
+            return self.step(context, event)
+        except BaseException:
+            self._worker.cancel()
+            self.finish_background(context)
+            raise
+
+    def step(self, context, event):
+        if event.type == "ESC":
+            self._worker.cancel()
+            self.finish_background(context)
+            self.report({"WARNING"}, "Import cancelled after " + str(len(self._timers)) + " of " + str(len(self._filepaths)) + " file(s)")
+            return {"CANCELLED"}
+
+        if event.type != "TIMER": return {"PASS_THROUGH"}
+        context.window_manager.progress_update(self._worker.progress())
+
+        # At most one file per tick, so the UI gets to redraw (and see Esc) in between
+        try:
+            result = self._worker.next_result(timeout = 0)
+        except queue.Empty:
+            return {"RUNNING_MODAL"}
+
+        if result is None:
+            self.finish_background(context)
+            return self.report_results(self._filepaths, self._failures, self._timers)
+
+        filepath, sections, timer, error = result
+        if error is None: error = try_file_meshes(filepath, sections, timer, self._global_matrix, self._write_log, self._options,
+                                                  self._registry)
+        if error is not None: self._failures.append((filepath, error))
+        else: self._timers.append((filepath, timer))
+
+        return {"RUNNING_MODAL"}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    def draw(self, context):
+        layout = self.layout
+        col = layout.column()
+        col.label(text = "Import Options")
+
+        row = col.row()
+        row.prop(self, "assume_DirectX_PIX_layout")
+        row = col.row()
+        row.prop(self, "mirror_x")
+        row = col.row()
+        row.prop(self, "vertex_order")
+        row = col.row()
+        row.prop(self, "split_sections")
+        row = col.row()
+        row.prop(self, "primitive_topology")
+        row = col.row()
+        row.prop(self, "output_filepath")
+        row = col.row()
+        row.active = bool(self.output_filepath)
+        row.prop(self, "output_mapping")
+        row = col.row()
+        row.prop(self, "layout_filepath")
+        row = col.row()
+        row.prop(self, "target_faces")
+        row = col.row()
+        row.prop(self, "cell_size")
+        row = col.row()
+        row.prop(self, "use_streaming")
+        row = col.row()
+        row.active = self.use_streaming
+        row.prop(self, "chunk_size")
+        row = col.row()
+        row.prop(self, "precision")
+        row = col.row()
+        row.prop(self, "use_cache")
+        row.operator(PIX_CSV_Clear_Cache_Operator.bl_idname, text = "", icon = "TRASH")
+        row = col.row()
+        row.prop(self, "worker_count")
+        row = col.row()
+        row.prop(self, "unique_meshes")
+        row = col.row()
+        row.prop(self, "use_background")
+        row = col.row()
+        row.prop(self, "trace_memory")
+        row = col.row()
+        row.prop(self, "write_log")
+        layout.prop(self, "bake_transform")
+        layout.prop(self, "axis_forward")
+        layout.prop(self, "axis_up")
+
+class PIX_CSV_Clear_Cache_Operator(bpy.types.Operator):
+
+    bl_idname = "object.pix_csv_clear_cache"
+    bl_label = "Clear PIX CSV Import Cache"
+    bl_description = "Delete every cached import from the PIX CSV import cache directory"
+
+    def execute(self, context):
+        cache.clear()
+        self.report({"INFO"}, "Cleared " + cache.DEFAULT_CACHE_DIR)
+        return {"FINISHED"}
+
+class PIX_CSV_Reload_Operator(bpy.types.Operator):
+
+    bl_idname = "object.pix_csv_reload"
+    bl_label = "Reload PIX CSV"
+    bl_description = "Import the selected objects again from the CSV files they were imported from, keeping the objects"
+    bl_options = {"REGISTER", "UNDO"}
+
+    only_changed = BoolProperty(
+                                name = "Only Changed Files",
+                                description = "Skip objects whose CSV (and output CSV) hasn't changed since it was imported",
+                                default = True,
+                                )
+
+    def execute(self, context):
+        objects = [obj for obj in context.selected_objects if SOURCE_PROPERTY in obj]
+        if not objects:
+            self.report({"WARNING"}, "None of the selected objects was imported from a PIX CSV file")
+            return {"CANCELLED"}
+
+        timer = profiling.PhaseTimer()
+        reloaded, failures = reload_objects(objects, self.only_changed, timer)
+        for name, error in failures: self.report({"WARNING"}, "Failed to reload " + name + ": " + str(error))
+        self.report({"INFO"}, "Reloaded " + str(reloaded) + " of " + str(len(objects)) + " object(s) in " + timer.summary())
+        return {"FINISHED"}
+
+class PIX_CSV_Watch_Operator(bpy.types.Operator):
+
+    bl_idname = "object.pix_csv_watch"
+    bl_label = "Watch PIX CSV Files"
+    bl_description = "Start or stop reloading imported objects automatically whenever their CSV file changes"
+
+    def execute(self, context):
+        if bpy.app.timers.is_registered(watch_sources):
+            bpy.app.timers.unregister(watch_sources)
+            self.report({"INFO"}, "Stopped watching imported PIX CSV files")
+        else:
+            bpy.app.timers.register(watch_sources, first_interval = WATCH_INTERVAL, persistent = True)
+            self.report({"INFO"}, "Watching imported PIX CSV files for changes")
+        return {"FINISHED"}
+
+
+# ~~~~~~~~~~~~~~~~~~~~Mesh-Related Functions~~~~~~~~~~~~~~~~~~~~
+def add_corner_attributes(mesh, mesh_data):
+
+    # Extra texture coordinate sets and anything else without a better home (tangents, binormals, extra positions)
+    # become UV layers, colors become vertex colors. Blender caps both at 8 layers; anything past that is skipped.
+    # Layers that already exist (on a reload) are overwritten.
+    for name, values in mesh_data.items():
+        if "." not in name: continue
+        semantic, attribute = name.split(".", 1)
+        if semantic in parsing.POINT_SEMANTICS: continue
+
+        if semantic == "color":
+            color_layer = mesh.vertex_colors.get(attribute) or mesh.vertex_colors.new(name = attribute)
+            if color_layer is not None: color_layer.data.foreach_set("color", geometry.color_buffer(values))
+            continue
+
+        for layer_name, uv in geometry.uv_layer_buffers(attribute, values):
+            uv_layer = mesh.uv_layers.get(layer_name) or mesh.uv_layers.new(name = layer_name)
+            if uv_layer is not None: uv_layer.data.foreach_set("uv", uv)
+
+def add_vertex_groups(obj, mesh_data, assign_weights = True):
+
+    # Skinning data becomes one vertex group per bone index ("Bone 12"); the n-th BLENDINDICES set pairs up with the
+    # n-th BLENDWEIGHT set. Only the group names belong to the object, the weights are stored in its mesh: an object
+    # linking a mesh that already has them only gets the names, in the same order, without assign_weights.
+    blend_indices = [values for name, values in mesh_data.items() if name.startswith("blend_indices.")]
+    blend_weights = [values for name, values in mesh_data.items() if name.startswith("blend_weights.")]
+
+    for set_index, indices in enumerate(blend_indices):
+        weights = blend_weights[set_index] if set_index < len(blend_weights) else None
+
+        for group, weight, vertices in geometry.vertex_group_assignments(indices, weights):
+            group_name = "Bone " + str(group)
+            vertex_group = obj.vertex_groups.get(group_name) or obj.vertex_groups.new(name = group_name)
+            if assign_weights: vertex_group.add(vertices.tolist(), weight, "ADD")
+
+def clear_vertex_groups(obj, vertex_count):
+
+    # Take every vertex out of the bone groups add_vertex_groups made, so a reload can fill them in again
+    vertices = list(range(vertex_count))
+    for vertex_group in obj.vertex_groups:
+        if vertex_group.name.startswith("Bone "): vertex_group.remove(vertices)
+
+def mesh_registry():
+
+    # Every mesh imported so far (in this file, or in earlier sessions) by the hash of the arrays it was built from.
+    # The hash is only a hint: the mesh may have been edited since, see registered_mesh.
+    return {mesh[MESH_HASH_PROPERTY]: mesh for mesh in bpy.data.meshes if MESH_HASH_PROPERTY in mesh}
+
+def same_faces(mesh, buffers):
+
+    # Whether a mesh has the vertex count and faces of the given mesh_buffers
+    if (len(mesh.vertices), len(mesh.polygons), len(mesh.loops)) != (buffers["vertex_count"], buffers["face_count"], buffers["loop_count"]):
+        return False
+
+    vertex_index = np.empty(buffers["loop_count"], dtype = np.int32)
+    mesh.loops.foreach_get("vertex_index", vertex_index)
+    return np.array_equal(vertex_index, buffers["vertex_index"])
+
+def registered_mesh(registry, digest, mesh_data):
+
+    # The registry's mesh for these arrays, if it still has their vertices and faces. A mesh that was edited after
+    # it was imported keeps its hash property, so it is checked here, and forgotten if it no longer matches.
+    mesh = registry.get(digest)
+    if mesh is None: return None
+
+    buffers = geometry.mesh_buffers(mesh_data["positions"], mesh_data["faces"])
+    if same_faces(mesh, buffers):
+        co = np.empty(buffers["vertex_count"] * 3, dtype = np.float32)
+        mesh.vertices.foreach_get("co", co)
+        if np.array_equal(co, buffers["co"]): return mesh
+
+    del registry[digest]
+    if MESH_HASH_PROPERTY in mesh: del mesh[MESH_HASH_PROPERTY]
+    return None
+
+def build_mesh(mesh_data, name = "Imported Mesh", timer = None):
+
+    timer = timer or profiling.PhaseTimer()
+
+    with timer.phase("mesh"):
+        # Flatten the arrays into the layouts foreach_set expects; "normals" and "uvs" are per face corner
+        buffers = geometry.mesh_buffers(mesh_data["positions"], mesh_data["faces"], mesh_data.get("uvs"), mesh_data.get("normals"))
+        timer.count("vertices", buffers["vertex_count"])
+        timer.count("faces", buffers["face_count"])
+
+        # Create a new mesh and fill vertices, loops and polygons with bulk copies
+        mesh = bpy.data.meshes.new(name)
+        mesh.vertices.add(buffers["vertex_count"])
+        mesh.vertices.foreach_set("co", buffers["co"])
+        mesh.loops.add(buffers["loop_count"])
+        mesh.loops.foreach_set("vertex_index", buffers["vertex_index"])
+        mesh.polygons.add(buffers["face_count"])
+        mesh.polygons.foreach_set("loop_start", buffers["loop_start"])
+        mesh.polygons.foreach_set("loop_total", buffers["loop_total"])
+        mesh.polygons.foreach_set("use_smooth", np.ones(buffers["face_count"], dtype = bool))
+
+    fill_mesh(mesh, mesh_data, buffers, timer)
+    return mesh
+
+def fill_mesh(mesh, mesh_data, buffers, timer):
+
+    # Everything on top of the vertices and faces: UVs, the other corner attributes and the custom normals
+    with timer.phase("attributes"):
+        # Generate UV data
+        if buffers["uv"] is not None:
+            uv_layer = mesh.uv_layers.get("UVMap") or mesh.uv_layers.new(name = "UVMap")
+            uv_layer.data.foreach_set("uv", buffers["uv"])
+        add_corner_attributes(mesh, mesh_data)
+
+    with timer.phase("normals"):
+        # Update the mesh
+        mesh.update(calc_edges = True)
+
+        # Vertex normals get recalculated on every update, so store the imported ones as custom split normals instead
+        if buffers["normals"] is not None:
+            mesh.use_auto_smooth = True
+            mesh.normals_split_custom_set(buffers["normals"])
+
+def update_mesh(mesh, mesh_data, timer = None):
+
+    # Overwrite the vertex positions and attributes of a mesh in place, keeping everything else about it. Only works
+    # when the mesh still has the exact same faces; returns False (and changes nothing) otherwise.
+    timer = timer or profiling.PhaseTimer()
+
+    with timer.phase("mesh"):
+        buffers = geometry.mesh_buffers(mesh_data["positions"], mesh_data["faces"], mesh_data.get("uvs"), mesh_data.get("normals"))
+        if not same_faces(mesh, buffers): return False
+
+        mesh.vertices.foreach_set("co", buffers["co"])
+        timer.count("vertices", buffers["vertex_count"])
+        timer.count("faces", buffers["face_count"])
+
+    fill_mesh(mesh, mesh_data, buffers, timer)
+    return True
+
+def add_shape_keys(obj, mesh_data):
+
+    # Positions mapped from an output CSV ("shape.<name>", e.g. gl_Position) become shape keys on top of a basis.
+    # On a reload, existing keys are overwritten and the basis takes the new positions.
+    shapes = [(name.split(".", 1)[1], values) for name, values in mesh_data.items() if name.startswith("shape.")]
+    if not shapes:
+        if obj.data.shape_keys is not None: obj.shape_key_clear()
+        return
+
+    if obj.data.shape_keys is None: obj.shape_key_add(name = "Basis", from_mix = False)
+    key_blocks = obj.data.shape_keys.key_blocks
+    key_blocks[0].data.foreach_set("co", np.ascontiguousarray(mesh_data["positions"], dtype = np.float32).ravel())
+    for name, values in shapes:
+        shape_key = key_blocks.get(name) or obj.shape_key_add(name = name, from_mix = False)
+        shape_key.data.foreach_set("co", np.ascontiguousarray(np.asarray(values)[:, :3], dtype = np.float32).ravel())
+
+def make_mesh(mesh_data, global_matrix, name = "Imported Mesh", timer = None, registry = None):
+
+    # With a registry (see mesh_registry), an object whose arrays match an already imported mesh links that mesh
+    # instead of getting a copy of its own; a capture usually draws the same mesh many times. Returns the object.
+    timer = timer or profiling.PhaseTimer()
+    mesh = None
+    if registry is not None:
+        with timer.phase("hash"):
+            digest = pipeline.mesh_hash(mesh_data)
+            mesh = registered_mesh(registry, digest, mesh_data)
+
+    shared = mesh is not None
+    if shared:
+        timer.count("shared_meshes", 1)
+    else:
+        mesh = build_mesh(mesh_data, name, timer)
+        if registry is not None:
+            mesh[MESH_HASH_PROPERTY] = digest
+            registry[digest] = mesh
+
+    with timer.phase("attributes"):
+        obj = bpy.data.objects.new(name, mesh)               # Create the mesh object for the imported mesh
+        obj.matrix_world = global_matrix                     # Apply transformation matrix
+        bpy.context.collection.objects.link(obj)             # Link object to scene
+        add_vertex_groups(obj, mesh_data, assign_weights = not shared)
+
+    # Shape keys live on the mesh, so a shared mesh already has them, just like the vertex weights. Vertices were merged and interior faces removed
+    # before the mesh was built (see pipeline.build_mesh_data), so there is no edit mode cleanup to do here.
+    if shared: return obj
+    with timer.phase("attributes"):
+        add_shape_keys(obj, mesh_data)
+
+    return obj
+
+def make_section_meshes(sections, global_matrix, name = "Imported Mesh", timer = None, registry = None, filepath = None,
+                        options = None):
+
+    # One object per section (draw) of a file; a file with a single section keeps the plain name. With a filepath,
+    # every object remembers it and the pipeline options (see remember_source), so it can be reloaded later.
+    options = options or {}
+    source_key = pipeline.source_key(filepath, options) if filepath else None
+    for section, mesh_data in enumerate(sections):
+        section_name = name if len(sections) == 1 else name + " Section " + str(section)
+        obj = make_mesh(mesh_data, global_matrix, section_name, timer, registry)
+        if filepath: remember_source(obj, filepath, section, options, source_key)
+
+def importCSV(filepath = None, assume_DirectX_PIX_layout = False, mirror_x = False, vertex_order = True,
+              use_streaming = False, chunk_size = parsing.DEFAULT_CHUNK_SIZE, split_sections = True,
+              primitive_topology = "TRIANGLE_LIST", use_cache = True, global_matrix = None, timer = None, unique_meshes = False,
+              bake_transform = False, output_filepath = None, output_mapping = parsing.DEFAULT_OUTPUT_MAPPING, precision = "FULL",
+              layout_filepath = None, target_faces = 0, cell_size = 0.0):
+
+    # Translates coordinates of things to the global space by ensuring that there's a global matrix to use
+    if global_matrix is None: global_matrix = mathutils.Matrix()
+
+    # Either bake global_matrix into the vertex data or set it as the object transform
+    transform = None
+    if bake_transform:
+        transform = [list(row) for row in global_matrix]
+        global_matrix = mathutils.Matrix()
+
+    # Check if a valid filepath was given; if nothing was given, cancel the import
+    if filepath == None: return
+
+    # Returns the timer, with the time of every phase of the import
+    timer = timer or profiling.PhaseTimer()
+    options = {
+               "assume_DirectX_PIX_layout": assume_DirectX_PIX_layout,
+               "mirror_x": mirror_x,
+               "vertex_order": vertex_order,
+               "use_streaming": use_streaming,
+               "chunk_size": chunk_size,
+               "split_sections": split_sections,
+               "primitive_topology": primitive_topology,
+               "use_cache": use_cache,
+               "transform": transform,
+               "output_filepath": output_filepath,
+               "output_mapping": output_mapping,
+               "precision": precision,
+               "layout_filepath": layout_filepath,
+               "target_faces": target_faces,
+               "cell_size": cell_size,
+               }
+    sections = pipeline.load_mesh_data(filepath, timer = timer, **options)
+    make_section_meshes(sections, global_matrix, timer = timer, registry = None if unique_meshes else mesh_registry(), filepath = filepath,
+                        options = options)
+    return timer
+
+def make_file_meshes(filepath, sections, timer, global_matrix, write_log = False, options = None, registry = None):
+
+    # Keep adding to the timer that came back from the worker, so the building phases end up in the same report.
+    # "options" are the keywords the file was loaded with (see pipeline.load_mesh_data).
+    try:
+        make_section_meshes(sections, global_matrix, os.path.splitext(os.path.basename(filepath))[0], timer, registry, filepath, options)
+    finally:
+        timer.stop_tracing()
+
+    # The log is only a diagnostic; a read-only capture directory shouldn't fail the import
+    if write_log:
+        try: profiling.write_log(filepath, timer, options)
+        except OSError as error: print("Could not write the import log for", filepath + ":", error)
+
+def try_file_meshes(filepath, sections, timer, global_matrix, write_log = False, options = None, registry = None):
+
+    # make_file_meshes, but a file whose meshes can't be built returns its error instead of ending the batch
+    try:
+        make_file_meshes(filepath, sections, timer, global_matrix, write_log, options, registry)
+    except Exception as error:
+        return error
+    return None
+
+def importCSVFiles(filepaths, worker_count = 0, global_matrix = None, trace_memory = False, write_log = False, unique_meshes = False,
+                   **options):
+
+    # Parse all files on a process pool and build the meshes here, on Blender's main thread, as results come in.
+    # Returns a list of (filepath, error) for the files that failed and a list of (filepath, timer) for the ones
+    # that didn't; with write_log, every timer is also written as JSON next to its file.
+    if global_matrix is None: global_matrix = mathutils.Matrix()
+
+    # Blender 2.8x/2.90 run with sys.executable pointing at Blender itself; the pool needs the bundled Python
+    python_executable = getattr(bpy.app, "binary_path_python", None)
+
+    # Identical meshes, within this batch and with earlier imports, share one datablock unless asked not to
+    registry = None if unique_meshes else mesh_registry()
+
+    failures = []
+    timers = []
+    for filepath, sections, timer, error in batch.iter_mesh_data(filepaths, worker_count, python_executable, trace_memory, **options):
+        if error is None: error = try_file_meshes(filepath, sections, timer, global_matrix, write_log, options, registry)
+        if error is not None: failures.append((filepath, error))
+        else: timers.append((filepath, timer))
+
+    return failures, timers
+
+
+# ~~~~~~~~~~~~~~~~~~~~Reload Functions~~~~~~~~~~~~~~~~~~~~
+def remember_source(obj, filepath, section, options, source_key = None):
+    obj[SOURCE_PROPERTY] = os.path.abspath(filepath)
+    obj[SECTION_PROPERTY] = section
+    obj[OPTIONS_PROPERTY] = json.dumps(options, sort_keys = True)
+    obj[SOURCE_KEY_PROPERTY] = source_key or pipeline.source_key(filepath, options)
+
+def reload_object(obj, mesh_data, timer = None):
+
+    # Put new arrays into an imported object. The mesh is updated in place when its faces are unchanged and nothing
+    # else uses it; otherwise the object gets a freshly built mesh with the same name and materials. Either way the
+    # object itself (transform, modifiers, material slots linked to the object) is left alone.
+    # Vertex weights are stored in the mesh: one updated in place has no other users, so its weights can be cleared and
+    # assigned again, and a rebuilt mesh starts without any
+    timer = timer or profiling.PhaseTimer()
+    mesh = obj.data
+
+    if mesh.users == 1 and update_mesh(mesh, mesh_data, timer):
+        with timer.phase("attributes"):
+            clear_vertex_groups(obj, len(mesh.vertices))
+            add_vertex_groups(obj, mesh_data)
+            add_shape_keys(obj, mesh_data)
+    else:
+        timer.count("rebuilt_meshes", 1)
+        name = mesh.name
+        new_mesh = build_mesh(mesh_data, name, timer)
+        for material in mesh.materials: new_mesh.materials.append(material)
+        obj.data = new_mesh
+        if mesh.users == 0: bpy.data.meshes.remove(mesh)
+        new_mesh.name = name
+        mesh = new_mesh
+
+        with timer.phase("attributes"):
+            add_vertex_groups(obj, mesh_data)
+            add_shape_keys(obj, mesh_data)
+
+    # The arrays changed, so a mesh that was shareable is now shareable under a different hash
+    if MESH_HASH_PROPERTY in mesh: mesh[MESH_HASH_PROPERTY] = pipeline.mesh_hash(mesh_data)
+
+def reload_objects(objects, only_changed = True, timer = None):
+
+    # Reload imported objects (see remember_source) from their files, reading every file once for all the sections
+    # imported from it. With only_changed, files whose pipeline.source_key still matches are skipped.
+    # Returns the number of reloaded objects and a list of (object name, error) for the ones that failed.
+    timer = timer or profiling.PhaseTimer()
+    sources = {}
+    for obj in objects:
+        if SOURCE_PROPERTY not in obj: continue
+        sources.setdefault((obj[SOURCE_PROPERTY], obj[OPTIONS_PROPERTY]), []).append(obj)
+
+    reloaded = 0
+    failures = []
+    for (filepath, options), source_objects in sources.items():
+        options = json.loads(options)
+
+        # A file that can't be read as it is now (still being written, deleted, ...) isn't retried until it changes
+        # again; one that is gone gets the error as its key, so it is reported once and not on every check after
+        key_error = None
+        try:
+            source_key = pipeline.source_key(filepath, options)
+        except Exception as error:
+            key_error = error
+            source_key = "error: " + type(error).__name__ + ": " + str(error)
+
+        if only_changed and all(obj[SOURCE_KEY_PROPERTY] == source_key for obj in source_objects): continue
+        for obj in source_objects: obj[SOURCE_KEY_PROPERTY] = source_key
+        try:
+            if key_error is not None: raise key_error
+            sections = pipeline.load_mesh_data(filepath, timer = timer, **options)
+        except Exception as error:
+            failures += [(obj.name, error) for obj in source_objects]
+            continue
+
+        for obj in source_objects:
+            section = obj[SECTION_PROPERTY]
+            if section >= len(sections):
+                failures.append((obj.name, ValueError("the file has no section " + str(section) + " anymore")))
+                continue
+            try:
+                reload_object(obj, sections[section], timer)
+            except Exception as error:
+                failures.append((obj.name, error))
+                continue
+            reloaded += 1
+
+    return reloaded, failures
+
+def watch_sources():
+
+    # App timer behind PIX_CSV_Watch_Operator: reload every imported object whose file changed since the last check
+    _, failures = reload_objects(bpy.data.objects)
+    for name, error in failures: print("Could not reload", name + ":", error)
+    return WATCH_INTERVAL
+
+
+# ~~~~~~~~~~~~~~~~~~~~Registration Functions~~~~~~~~~~~~~~~~~~~~
+classes = (PIX_CSV_Operator, PIX_CSV_Clear_Cache_Operator, PIX_CSV_Reload_Operator, PIX_CSV_Watch_Operator)
+
+def menu_func_import(self, context):
+    self.layout.operator(PIX_CSV_Operator.bl_idname, text = "RenderDoc PIX CSV (.csv)")
+
+def menu_func_object(self, context):
+    self.layout.operator(PIX_CSV_Reload_Operator.bl_idname)
+    self.layout.operator(PIX_CSV_Watch_Operator.bl_idname)
+
+def register():
+    for cls in classes: bpy.utils.register_class(cls)
+    bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
+    bpy.types.VIEW3D_MT_object.append(menu_func_object)
+
+def unregister():
+    if bpy.app.timers.is_registered(watch_sources): bpy.app.timers.unregister(watch_sources)
+    for cls in reversed(classes): bpy.utils.unregister_class(cls)
+    bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
+    bpy.types.VIEW3D_MT_object.remove(menu_func_object)
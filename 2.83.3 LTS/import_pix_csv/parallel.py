@@ -0,0 +1,196 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Process pools, and parsing one large CSV on several processes at once. Nothing in here may import bpy: the worker
+# processes are plain Python interpreters that import this package without Blender.
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from . import parsing
+
+# Files smaller than this are parsed in one process; starting the pool would take longer than the parse
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+# Smallest byte range worth handing to a worker process
+MIN_RANGE_SIZE = 8 * 1024 * 1024
+
+# Seconds between two checkpoints while waiting for a worker process
+POLL_INTERVAL = 0.1
+
+
+# ~~~~~~~~~~~~~~~~~~~~Pool Functions~~~~~~~~~~~~~~~~~~~~
+@contextmanager
+def worker_pool(worker_count = 0, python_executable = None):
+
+    # Always "spawn" fresh interpreters: forking a running Blender (threads, GPU context, ...) isn't safe.
+    # Inside Blender, sys.executable may be Blender itself, so the caller passes the bundled Python binary.
+    # Leaving the block normally waits for the pool to finish; leaving it with an exception (a cancelled import, a
+    # generator closed early) stops it right away, see stop_pool.
+    context = multiprocessing.get_context("spawn")
+    if python_executable: context.set_executable(python_executable)
+
+    executor = ProcessPoolExecutor(max_workers = worker_count or os.cpu_count(), mp_context = context)
+    try:
+        yield executor
+    except BaseException:
+        stop_pool(executor)
+        raise
+    executor.shutdown()
+
+def stop_pool(executor):
+
+    # Shut a pool down without waiting for the calls still running on it: their worker processes are terminated.
+    # ProcessPoolExecutor has no public way to do that (cancel_futures only drops calls that haven't started).
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    for process in processes:
+        if process.is_alive(): process.terminate()
+    executor.shutdown(wait = False)
+
+def wait_done(future, checkpoint = None):
+
+    # Wait for a call on the pool to finish, calling checkpoint() every POLL_INTERVAL until it has; checkpoint may raise
+    # to stop waiting
+    if checkpoint is None: return
+    while not wait([future], timeout = POLL_INTERVAL).done: checkpoint()
+
+
+# ~~~~~~~~~~~~~~~~~~~~Range Functions~~~~~~~~~~~~~~~~~~~~
+def byte_ranges(filepath, body_start, count):
+
+    # Split the body of a file (everything from body_start on) into "count" (start, stop) byte ranges of about the
+    # same size. Every range but the first starts right after a newline, so no row is cut in two.
+    size = os.path.getsize(filepath)
+    bounds = [body_start]
+    with open(filepath, "rb") as f:
+        for index in range(1, count):
+            f.seek(max(body_start + (size - body_start) * index // count, bounds[-1]))
+            f.readline()
+            if f.tell() < size and f.tell() > bounds[-1]: bounds.append(f.tell())
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def parse_range(filepath, start, stop, csv_header, assume_DirectX_PIX_layout, scratch_path):
+
+    # Worker side: parse the rows in [start, stop) and save the columns of every header segment in them as .npy files,
+    # so they come back memory-mapped instead of pickled. Rows before the first header row in the range are parsed with
+    # the file's header; parse_csv_sections redoes them if another header was in effect there.
+    # Returns a list of (header row or None, [(column name, .npy path), ...] or None) and the size of the first segment.
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        body = f.read(stop - start)
+
+    splitter = parsing.SectionSplitter(csv_header, assume_DirectX_PIX_layout)
+    segments = []
+    segment_rows = parsing.split_header_rows(body)
+    del body
+
+    for index, (header_line, rows) in enumerate(segment_rows):
+        if header_line is not None: splitter.set_header(parsing.read_header(header_line))
+        try:
+            data = splitter.plan.parse(rows, splitter.column_count)
+        except ValueError:
+            # Only the first segment can have been parsed with the wrong header; let the caller sort it out
+            if index > 0: raise
+            segments.append((header_line, None))
+            continue
+
+        columns = []
+        for column, (name, values) in enumerate(data.items()):
+            path = scratch_path + "-" + str(index) + "-" + str(column) + ".npy"
+            np.save(path, values)
+            columns.append((name, path))
+        segments.append((header_line, columns))
+
+    return segments, len(segment_rows[0][1])
+
+def parse_csv_sections(filepath, assume_DirectX_PIX_layout = False, split_sections = True, worker_count = 0, python_executable = None,
+                       checkpoint = None, primitive_topology = "TRIANGLE_LIST"):
+
+    # parsing.parse_csv_sections, with the body of the file split into newline aligned byte ranges that are parsed on
+    # a process pool. The ranges are put back together in file order, so sections (and the faces assembled from
+    # them later) come out exactly as from a single process. Small files and a single worker skip the pool.
+    # checkpoint() is called while waiting for the workers; if it raises, the workers are stopped.
+    worker_count = worker_count or os.cpu_count()
+    with open(filepath, "rb") as f:
+        header_line = f.readline()
+        body_start = f.tell()
+
+    count = min(worker_count, (os.path.getsize(filepath) - body_start) // MIN_RANGE_SIZE)
+    if worker_count == 1 or os.path.getsize(filepath) < PARALLEL_THRESHOLD or count < 2:
+        return parsing.parse_csv_sections(filepath, assume_DirectX_PIX_layout, split_sections, checkpoint, primitive_topology)
+
+    csv_header = parsing.read_header(header_line)
+    ranges = byte_ranges(filepath, body_start, count)
+    scratch_dir = tempfile.mkdtemp(prefix = "pix_csv_ranges.")
+    try:
+        with worker_pool(len(ranges), python_executable) as executor:
+            futures = [executor.submit(parse_range, filepath, start, stop, csv_header, assume_DirectX_PIX_layout,
+                                       os.path.join(scratch_dir, str(index)))
+                       for index, (start, stop) in enumerate(ranges)]
+            try:
+                return join_ranges(filepath, ranges, futures, csv_header, assume_DirectX_PIX_layout, split_sections, checkpoint,
+                                   primitive_topology)
+            finally:
+                for future in futures: future.cancel()
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors = True)
+
+def join_ranges(filepath, ranges, futures, csv_header, assume_DirectX_PIX_layout = False, split_sections = True, checkpoint = None,
+                primitive_topology = "TRIANGLE_LIST"):
+
+    # Feed the segments of every range, in order, through one SectionSplitter, just like one long body would be
+    splitter = parsing.SectionSplitter(csv_header, assume_DirectX_PIX_layout, split_sections, None, primitive_topology)
+    current_header = csv_header
+    sections = []
+
+    for (start, _), future in zip(ranges, futures):
+        wait_done(future, checkpoint)
+        segments, first_size = future.result()
+        for index, (header_line, columns) in enumerate(segments):
+            if header_line is not None:
+                current_header = parsing.read_header(header_line)
+                splitter.set_header(current_header)
+                splitter.start_section()
+
+            # The worker guessed the header of its first segment; parse it again here if the guess was wrong
+            if index == 0 and (columns is None or current_header != csv_header):
+                with open(filepath, "rb") as f:
+                    f.seek(start)
+                    data = splitter.plan.parse(f.read(first_size), splitter.column_count)
+            else:
+                data = {name: np.load(path, mmap_mode = "r") for name, path in columns}
+
+            for section, piece in splitter.split(data):
+                if section == len(sections): sections.append([])
+                sections[section].append(piece)
+
+    # Concatenating copies everything out of the memory-mapped scratch files, which are deleted afterwards; a section
+    # made of a single piece is still a view of one, so it is copied explicitly
+    result = []
+    for pieces in sections:
+        columns = parsing.concatenate_columns(pieces)
+        if len(pieces) == 1: columns = {name: np.array(values) for name, values in columns.items()}
+        result.append(columns)
+    return result
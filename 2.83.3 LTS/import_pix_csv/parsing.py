@@ -0,0 +1,481 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Columnar CSV parser for PIX/RenderDoc vertex dumps. Nothing in here may import bpy.
+
+import csv
+import itertools
+import re
+import warnings
+import numpy as np
+from collections import OrderedDict
+from . import geometry
+
+# Number of rows parsed at a time when streaming a file
+DEFAULT_CHUNK_SIZE = 250000
+
+# Integers from this magnitude on aren't all exact in float32
+FLOAT32_EXACT_LIMIT = 2 ** 24
+
+# Bytes of CSV text parsed at a time when reading a whole file; the caller gets a checkpoint between blocks
+PARSE_BLOCK_SIZE = 64 * 1024 * 1024
+
+# A header row repeated in the middle of a file (optionally quoted, optionally with a BOM)
+HEADER_ROW = re.compile(rb"^(?:\xef\xbb\xbf)?[ \t\"]*VTX\b[^\n]*(?:\n|$)", re.MULTILINE)
+
+# Vertex shader input semantics we can map onto Blender data, with the spellings they commonly go by in
+# RenderDoc/PIX headers (shader variable names for GL/Vulkan, semantic names for D3D)
+SEMANTICS = (
+             ("position", ("POSITION", "POS", "VERTEX")),
+             ("normal", ("NORMAL", "NORM")),
+             ("tangent", ("TANGENT",)),
+             ("binormal", ("BINORMAL", "BITANGENT")),
+             ("texcoord", ("TEXCOORD", "TEXCOORDS", "UV", "TEX")),
+             ("color", ("COLOR", "COLOUR", "COL")),
+             ("blend_indices", ("BLENDINDICES", "BLENDINDEX", "BONEINDICES", "BONEIDS", "BONES", "JOINTS")),
+             ("blend_weights", ("BLENDWEIGHT", "BLENDWEIGHTS", "BONEWEIGHTS", "WEIGHTS")),
+             )
+
+# Prefixes shader authors put in front of attribute names ("a_Position0", "in_NORMAL0", "SV_Position", ...)
+NAME_PREFIXES = ("A_", "IN_", "I_", "ATTR_", "V_", "VS_", "SV_", "GL_")
+
+# Component suffixes, in the order they are stored in
+COMPONENTS = ("xyzw", "rgba", "stpq")
+
+# The first position, normal and texture coordinate set are the mesh itself and keep these names; every other
+# attribute is stored as "<semantic>.<name>"
+PRIMARY_ATTRIBUTES = {"position": ("positions", 3), "normal": ("normals", 3), "texcoord": ("uvs", 2)}
+
+# Attributes that belong to vertices rather than face corners (they survive welding through the kept vertex).
+# "shape" attributes only come from an output CSV mapping (e.g. gl_Position as a shape key).
+POINT_SEMANTICS = ("blend_indices", "blend_weights", "shape")
+
+# Default mapping of output (vertex shader out) CSV columns onto attributes; what the README used to ask users to
+# copy over by hand
+DEFAULT_OUTPUT_MAPPING = "v_Varying0.xy=UVMap"
+
+# Names a mapping target can have besides "<semantic>.<name>", and the attribute keys they stand for
+TARGET_ALIASES = {"UVMAP": "uvs", "UVS": "uvs", "NORMALS": "normals"}
+
+# Semantics a mapping may target with "<semantic>.<name>"
+TARGET_SEMANTICS = ("texcoord", "color", "tangent", "binormal", "normal", "shape")
+
+# Fixed column indices of the mesh attributes in the original DirectX PIX layout
+DIRECTX_PIX_COLUMNS = (
+                       ("positions", (2, 3, 4)),
+                       ("normals", (6, 7, 8)),
+                       ("uvs", (9, 10)),
+                       )
+
+
+# ~~~~~~~~~~~~~~~~~~~~Header Functions~~~~~~~~~~~~~~~~~~~~
+def read_header(header_line):
+
+    # RenderDoc may write a BOM in front of the first column name
+    if isinstance(header_line, bytes): header_line = header_line.decode("utf-8-sig")
+    return next(csv.reader([header_line]))
+
+def classify_attribute(name):
+
+    # Returns (semantic, set index) for an attribute name such as "a_TexCoord1" or "BLENDWEIGHT", or
+    # (None, 0) if it is nothing we know how to import
+    base = name.strip().upper()
+    for prefix in NAME_PREFIXES:
+        if base.startswith(prefix):
+            base = base[len(prefix):]
+            break
+
+    digits = len(base) - len(base.rstrip("0123456789"))
+    set_index = int(base[-digits:]) if digits else 0
+    base = base[:len(base) - digits].replace("_", "")
+
+    for semantic, spellings in SEMANTICS:
+        if base in spellings: return semantic, set_index
+
+    return None, 0
+
+def component_order(component):
+
+    component = component.strip().lower()
+    for letters in COMPONENTS:
+        if len(component) == 1 and component in letters: return letters.index(component)
+    return 0
+
+def attribute_semantic(key):
+
+    # Semantic of a key in the dictionaries returned by the parser ("uvs" -> "texcoord", "color.COLOR0" -> "color")
+    for semantic, (primary_key, _) in PRIMARY_ATTRIBUTES.items():
+        if key == primary_key: return semantic
+    return key.split(".", 1)[0]
+
+class ExtractionPlan:
+
+    # Compiled from a header once: which columns make up which attribute, as index arrays, so a parsed table is split
+    # into every attribute with one gather per attribute and no per-row (or per-cell) lookups.
+    # VTX and IDX will always appear at these positions in a row list.
+    def __init__(self, attributes, vtx_column = 0, idx_column = 1):
+        self.vtx_column = vtx_column
+        self.idx_column = idx_column
+        self.attributes = [(key, np.array(columns, dtype = np.intp)) for key, columns in attributes]
+
+    def keys(self):
+        return [key for key, _ in self.attributes]
+
+    def extract(self, table):
+        data = {
+                "VTX": table[:, self.vtx_column].astype(np.int64),
+                "IDX": table[:, self.idx_column].astype(np.int64),
+                }
+
+        for key, columns in self.attributes: data[key] = np.ascontiguousarray(table[:, columns], dtype = np.float32)
+        return data
+
+    def parse(self, body, column_count):
+
+        # parse_table and extract in one. The text is parsed straight to float32, the type every attribute ends up in;
+        # VTX and IDX are only exact in float32 up to FLOAT32_EXACT_LIMIT, so a block with bigger ones (or 32-bit
+        # restart indices) is parsed again as float64.
+        table = parse_table(body, column_count, np.float32)
+        if len(table) and np.abs(table[:, [self.vtx_column, self.idx_column]]).max() >= FLOAT32_EXACT_LIMIT:
+            table = parse_table(body, column_count)
+        return self.extract(table)
+
+def column_groups(csv_header):
+
+    # Group the "semantic.component" columns by attribute, in header order; also strips any spaces in the header.
+    # Returns {attribute name: [(component order, column index, component), ...]}.
+    groups = OrderedDict()
+    for index in range(2, len(csv_header)):
+        name, _, component = csv_header[index].strip().rpartition(".")
+        if not name: name, component = component, ""
+        groups.setdefault(name, []).append((component_order(component), index, component.strip().lower()))
+    return groups
+
+def compile_plan(csv_header, assume_DirectX_PIX_layout = False):
+
+    if assume_DirectX_PIX_layout: return ExtractionPlan(DIRECTX_PIX_COLUMNS)
+
+    groups = column_groups(csv_header)
+    attributes = []
+    taken = set()
+    for name, components in groups.items():
+        semantic, _ = classify_attribute(name)
+        if semantic is None: continue
+
+        columns = tuple(index for _, index, _ in sorted(components))
+
+        # The first attribute of a primary semantic is the mesh itself, trimmed to the components Blender uses
+        if semantic in PRIMARY_ATTRIBUTES and semantic not in taken:
+            taken.add(semantic)
+            key, component_count = PRIMARY_ATTRIBUTES[semantic]
+            if len(columns) < component_count: raise ValueError("Attribute " + name + " has too few components")
+            attributes.append((key, columns[:component_count]))
+        else:
+            attributes.append((semantic + "." + name, columns))
+
+    if "position" not in taken: raise ValueError("No position attribute found in the CSV header")
+    return ExtractionPlan(attributes)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Mapping Functions~~~~~~~~~~~~~~~~~~~~
+def mapping_target(target):
+
+    # "UVMap" -> "uvs", "shape.Clip Space" stays, and a bare name becomes an extra UV layer ("Lightmap" -> "texcoord.Lightmap")
+    target = target.strip()
+    if target.upper() in TARGET_ALIASES: return TARGET_ALIASES[target.upper()]
+
+    semantic, dot, name = target.partition(".")
+    if not dot: return "texcoord." + target
+    if semantic.lower() not in TARGET_SEMANTICS or not name: raise ValueError("Unknown mapping target " + target)
+    return semantic.lower() + "." + name
+
+def parse_mapping(mapping):
+
+    # Parse "v_Varying0.xy=UVMap; gl_Position.xyz=shape.Clip Space" into [(source, attribute key), ...]. Entries are
+    # separated by ";" or ",", and "->" works as well as "=".
+    pairs = []
+    for entry in re.split(r"[;,]", mapping or ""):
+        if not entry.strip(): continue
+        source, separator, target = entry.replace("->", "=").partition("=")
+        if not separator or not source.strip(): raise ValueError("Mapping entry \"" + entry.strip() + "\" isn't \"source=target\"")
+        pairs.append((source.strip(), mapping_target(target)))
+    return pairs
+
+def compile_mapping_plan(csv_header, mapping):
+
+    # Extraction plan for an output CSV that only takes the columns named by the mapping, under their target keys.
+    # A source is an attribute name, optionally with the components to take ("v_Varying0.xy"); without components
+    # every component of the attribute is taken in order.
+    groups = column_groups(csv_header)
+    attributes = []
+    for source, key in parse_mapping(mapping):
+        name, _, components = source.rpartition(".")
+        if not name or name not in groups: name, components = source, ""
+        if name not in groups: raise ValueError("Output CSV has no attribute " + name)
+
+        # Components go by position, so "xy" also finds ".r"/".g" columns
+        columns = {order: index for order, index, _ in groups[name]}
+        if components:
+            orders = [component_order(component) for component in components]
+            missing = [component for component, order in zip(components, orders)
+                       if order not in columns or not any(component.lower() in letters for letters in COMPONENTS)]
+            if missing: raise ValueError("Output CSV attribute " + name + " has no component " + missing[0])
+            attributes.append((key, tuple(columns[order] for order in orders)))
+        else:
+            attributes.append((key, tuple(index for _, index, _ in sorted(groups[name]))))
+
+    return ExtractionPlan(attributes)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Parsing Functions~~~~~~~~~~~~~~~~~~~~
+def uniform_rows(body, column_count):
+
+    # True if every line of a (stripped) CSV body has column_count cells, counted by the commas in front of every
+    # line end with a binary search, so no per-line Python work is done
+    raw = np.frombuffer(body, dtype = np.uint8)
+    commas = np.flatnonzero(raw == ord(","))
+    line_ends = np.append(np.flatnonzero(raw == ord("\n")), len(raw))
+    counts = np.diff(np.searchsorted(commas, line_ends), prepend = 0)
+    return bool(np.all(counts == column_count - 1))
+
+def parse_table(body, column_count, dtype = np.float64):
+
+    # Parse the (header-less) body of a CSV into a 2D table of "dtype" floats with one row per CSV row
+    body = body.strip()
+    if not body: return np.empty((0, column_count), dtype = dtype)
+
+    # Fast path: treat the whole body as one comma separated list of numbers and let NumPy's C parser at it.
+    # Newlines become separators; "\r" and the spaces RenderDoc puts after each comma count as whitespace.
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            values = np.fromstring(body.replace(b"\n", b","), dtype = dtype, sep = ",")
+    except (ValueError, DeprecationWarning):
+        values = None
+
+    # Only trust it if every line holds exactly one row's worth of numbers; ragged rows can add up to a multiple of the
+    # column count and would silently shift every row after them
+    if values is not None and values.size % column_count == 0 and uniform_rows(body, column_count):
+        return values.reshape(-1, column_count)
+
+    # Slow path for anything the fast path chokes on (blank lines, ragged rows, quoted cells, ...)
+    reader = csv.reader(body.decode("utf-8").splitlines(), skipinitialspace = True)
+    rows = [[float(cell) for cell in row[:column_count]] for row in reader if row]
+    for row in rows:
+        if len(row) < column_count: raise ValueError("CSV row has " + str(len(row)) + " columns, the header " + str(column_count))
+    return np.array(rows, dtype = dtype).reshape(-1, column_count)
+
+def read_blocks(f, block_size = PARSE_BLOCK_SIZE):
+
+    # Read the rest of a file in pieces of about block_size bytes that end on a newline, so no row is cut in two
+    while True:
+        block = f.read(block_size)
+        if not block: return
+        yield block + f.readline()
+
+def concatenate_columns(pieces):
+
+    # Join several dictionaries of arrays from ExtractionPlan.extract back into one
+    # (only attributes every piece has survive, in case a repeated header changed the layout)
+    if len(pieces) == 1: return pieces[0]
+    names = [name for name in pieces[0] if all(name in piece for piece in pieces)]
+    return {name: np.concatenate([piece[name] for piece in pieces]) for name in names}
+
+
+# ~~~~~~~~~~~~~~~~~~~~Section Functions~~~~~~~~~~~~~~~~~~~~
+def split_header_rows(body):
+
+    # Split a CSV body at header rows repeated inside it (one per draw when dumps get concatenated).
+    # Returns a list of (header row or None, rows after it) pairs.
+    segments = []
+    header_line = None
+    start = 0
+
+    for match in HEADER_ROW.finditer(body):
+        segments.append((header_line, body[start:match.start()]))
+        header_line = match.group(0)
+        start = match.end()
+
+    segments.append((header_line, body[start:]))
+    return segments
+
+class SectionSplitter:
+
+    # Turns the body of a CSV (all of it, or one block after the other) into (section number, columns) pieces.
+    # A new section starts at every repeated header row and wherever VTX stops increasing (the draw restarted).
+    # Primitive restarts are marked as -1 draw by draw, see geometry.mark_restarts.
+    # With split_sections disabled everything is section 0: VTX is replaced by the row number, so the rows keep their
+    # file order, and IDX is offset by the vertex count of the draws before, so their vertices don't overwrite each
+    # other. "mapping" switches to the columns of an output CSV mapping (see compile_mapping_plan).
+    def __init__(self, csv_header, assume_DirectX_PIX_layout = False, split_sections = True, mapping = None,
+                 primitive_topology = "TRIANGLE_LIST"):
+        self.assume_DirectX_PIX_layout = assume_DirectX_PIX_layout
+        self.split_sections = split_sections
+        self.mapping = mapping
+        self.primitive_topology = primitive_topology
+        self.set_header(csv_header)
+
+        self.section = 0
+        self.last_vtx = None    # VTX of the last row of the current section; None while the section is still empty
+        self.row_count = 0
+        self.vertex_offset = 0  # Without split_sections: vertices of the draws before the current one
+        self.vertex_count = 0   # and max(IDX) + 1 of the current one so far
+
+    def set_header(self, csv_header):
+        self.column_count = len(csv_header)
+        if self.mapping is not None: self.plan = compile_mapping_plan(csv_header, self.mapping)
+        else: self.plan = compile_plan(csv_header, self.assume_DirectX_PIX_layout)
+
+    def start_section(self):
+        if self.last_vtx is None: return
+        if self.split_sections:
+            self.section += 1
+        else:
+            self.vertex_offset += self.vertex_count
+            self.vertex_count = 0
+        self.last_vtx = None
+
+    def renumber(self, data):
+
+        # Without split_sections: VTX becomes the row number and IDX is moved past the vertices of earlier draws
+        vtx = np.arange(self.row_count, self.row_count + len(data["VTX"]), dtype = np.int64)
+        self.row_count += len(vtx)
+        idx = data["IDX"]
+        valid = idx >= 0
+        if valid.any(): self.vertex_count = max(self.vertex_count, int(idx[valid].max()) + 1)
+        return dict(data, VTX = vtx, IDX = np.where(valid, idx + self.vertex_offset, idx))
+
+    def feed(self, body):
+        for header_line, rows in split_header_rows(body):
+            if header_line is not None:
+                self.set_header(read_header(header_line))
+                self.start_section()
+
+            for section, data in self.split(self.plan.parse(rows, self.column_count)): yield section, data
+
+    def split(self, data):
+
+        # Cut columns that were already extracted (with the current header) at the section boundaries in them
+        vtx = data["VTX"]
+        if len(vtx) == 0: return
+
+        # Section boundaries inside these rows, plus one at the start if VTX fell back since the previous block
+        starts = list(np.flatnonzero(vtx[1:] <= vtx[:-1]) + 1)
+        if self.last_vtx is not None and vtx[0] <= self.last_vtx: starts.insert(0, 0)
+
+        bounds = [0] + starts + [len(vtx)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if start in starts: self.start_section()
+            if start == end: continue
+            piece = {name: values[start:end] for name, values in data.items()}
+            piece["IDX"] = geometry.mark_restarts(piece["IDX"], self.primitive_topology)
+            if not self.split_sections: piece = self.renumber(piece)
+            yield self.section, piece
+            self.last_vtx = int(vtx[end - 1])
+
+def parse_csv_sections(filepath, assume_DirectX_PIX_layout = False, split_sections = True, checkpoint = None,
+                       primitive_topology = "TRIANGLE_LIST"):
+
+    # Returns one dictionary of arrays per section: "VTX"/"IDX" (N,) int64, "positions" (N, 3) float32 and, if the
+    # CSV has them, "normals" (N, 3), "uvs" (N, 2) and "<semantic>.<name>" (N, components) float32 arrays.
+    # The text is read and parsed a block at a time, calling checkpoint() before every block; it may raise to abort
+    # the parse. Only the columns of the whole file are held, never all of its text.
+    sections = []
+    with open(filepath, "rb") as f:
+        splitter = SectionSplitter(read_header(f.readline()), assume_DirectX_PIX_layout, split_sections, None, primitive_topology)
+        for block in read_blocks(f):
+            if checkpoint is not None: checkpoint()
+            for section, data in splitter.feed(block):
+                if section == len(sections): sections.append([])
+                sections[section].append(data)
+
+    return [concatenate_columns(pieces) for pieces in sections]
+
+def iter_csv_blocks(filepath, assume_DirectX_PIX_layout = False, chunk_size = DEFAULT_CHUNK_SIZE, split_sections = True, mapping = None,
+                    primitive_topology = "TRIANGLE_LIST"):
+
+    # Streaming version of parse_csv_sections: yields (section number, dictionary of arrays) for "chunk_size" rows
+    # at a time, so only one block of text and floats is alive at any point. Sections come in order.
+    with open(filepath, "rb") as f:
+        splitter = SectionSplitter(read_header(f.readline()), assume_DirectX_PIX_layout, split_sections, mapping, primitive_topology)
+
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines: break
+
+            body = b"".join(lines)
+            del lines
+            for section, data in splitter.feed(body): yield section, data
+
+
+# ~~~~~~~~~~~~~~~~~~~~Join Functions~~~~~~~~~~~~~~~~~~~~
+def trim_block(section, data, last):
+
+    # The rows of a block that come after position "last" ((section, VTX)), or None if there are none
+    if section > last[0]: return section, data
+    if section < last[0]: return None
+    keep = data["VTX"] > last[1]
+    if not keep.any(): return None
+    return section, {name: values[keep] for name, values in data.items()}
+
+def join_blocks(blocks, other_blocks, component_counts):
+
+    # Merge-join two streams of (section, columns) blocks that are both ordered by (section, VTX), like the input and
+    # output CSV of a draw: every block of "blocks" comes out with the attributes of "other_blocks" added to its rows.
+    # Only the other blocks overlapping the current one are held, so memory stays bounded by the block size.
+    # Rows without a partner get zeros; component_counts ({key: components}) says what to fill in for them.
+    other_blocks = iter(other_blocks)
+    pending = []
+    exhausted = False
+
+    for section, data in blocks:
+        vtx = data["VTX"]
+        if len(vtx) == 0: continue
+        last = (section, int(vtx[-1]))
+
+        # Read ahead until the other stream has passed the last row of this block
+        while not exhausted and (not pending or (pending[-1][0], int(pending[-1][1]["VTX"][-1])) < last):
+            try: pending.append(next(other_blocks))
+            except StopIteration: exhausted = True
+
+        joined = dict(data)
+        for key, component_count in component_counts.items():
+            joined[key] = np.zeros((len(vtx), component_count), dtype = np.float32)
+
+        # Both sides are sorted by VTX within a section, so every row finds its partner with a binary search
+        for other_section, other in pending:
+            if other_section != section or len(other["VTX"]) == 0: continue
+            positions = np.minimum(np.searchsorted(other["VTX"], vtx), len(other["VTX"]) - 1)
+            found = other["VTX"][positions] == vtx
+            for key in component_counts: joined[key][found] = other[key][positions[found]]
+
+        pending = [block for block in (trim_block(other_section, other, last) for other_section, other in pending) if block is not None]
+        yield section, joined
+
+def iter_joined_blocks(filepath, output_filepath, mapping = DEFAULT_OUTPUT_MAPPING, assume_DirectX_PIX_layout = False,
+                       chunk_size = DEFAULT_CHUNK_SIZE, split_sections = True, primitive_topology = "TRIANGLE_LIST"):
+
+    # iter_csv_blocks of an input CSV with the mapped columns of its output CSV joined in on VTX, in one pass over both
+    with open(output_filepath, "rb") as f: output_header = read_header(f.readline())
+    component_counts = OrderedDict((key, len(columns)) for key, columns in compile_mapping_plan(output_header, mapping).attributes)
+
+    blocks = iter_csv_blocks(filepath, assume_DirectX_PIX_layout, chunk_size, split_sections, None, primitive_topology)
+    other_blocks = iter_csv_blocks(output_filepath, False, chunk_size, split_sections, mapping)
+    for section, data in join_blocks(blocks, other_blocks, component_counts): yield section, data
@@ -0,0 +1,298 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Everything an import does before Blender gets involved: CSV file in, mesh arrays out. Nothing in here may import bpy.
+
+import hashlib
+import os
+import numpy as np
+from . import binary, cache, geometry, parallel, parsing, profiling
+
+
+# ~~~~~~~~~~~~~~~~~~~~Pipeline Functions~~~~~~~~~~~~~~~~~~~~
+def vertex_attributes(data, precision = "FULL"):
+
+    # Everything the parser found except the VTX/IDX bookkeeping columns, stored in the given precision
+    return {name: geometry.compact_attribute(parsing.attribute_semantic(name), values, precision)
+            for name, values in data.items() if name not in ("VTX", "IDX")}
+
+def read_vertex_tables(filepath, assume_DirectX_PIX_layout = False, use_streaming = False, chunk_size = parsing.DEFAULT_CHUNK_SIZE,
+                       split_sections = True, primitive_topology = "TRIANGLE_LIST", timer = None, output_filepath = None,
+                       output_mapping = parsing.DEFAULT_OUTPUT_MAPPING, parse_workers = 1, parse_executable = None,
+                       layout_filepath = None, precision = "FULL"):
+
+    # Returns one (vertex table, index buffer, used mask) per section of the file, see geometry.vertex_table.
+    # One slot per referenced vertex (IDX); the rows themselves, in VTX order, are the index buffer.
+    # With an output CSV, its columns named by output_mapping are joined in on VTX (see parsing.join_blocks).
+    # Attributes are compacted to the given precision (see geometry.PRECISIONS) as they are parsed, so the tables and
+    # everything gathered from them stay that size.
+    timer = timer or profiling.PhaseTimer()
+
+    # Raw buffers (see binary) already are a vertex table and an index buffer with their restarts marked, and always
+    # one section
+    if binary.is_binary(filepath, layout_filepath):
+        if output_filepath: raise ValueError("An output CSV can only be joined into a CSV import")
+        with timer.phase("parse"):
+            attributes, idx = binary.read_buffers(filepath, layout_filepath, primitive_topology)
+        with timer.phase("index"):
+            timer.count("rows", len(idx))
+            return [geometry.indexed_table(vertex_attributes(attributes, precision), idx)]
+
+    # Streaming keeps only one block of rows in memory at a time and collects the vertex tables as it goes.
+    # Joining an output CSV always streams: both files are read side by side, a block at a time.
+    if use_streaming or output_filepath:
+        builders = []
+        if output_filepath:
+            blocks = parsing.iter_joined_blocks(filepath, output_filepath, output_mapping, assume_DirectX_PIX_layout, chunk_size, split_sections,
+                                                primitive_topology)
+        else:
+            blocks = parsing.iter_csv_blocks(filepath, assume_DirectX_PIX_layout, chunk_size, split_sections, None, primitive_topology)
+        for section, block in timer.iterate("parse", blocks):
+            with timer.phase("index"):
+                if section == len(builders): builders.append(geometry.VertexTableBuilder())
+                builders[section].add(block["VTX"], block["IDX"], vertex_attributes(block, precision))
+                timer.count("rows", len(block["IDX"]))
+
+        with timer.phase("index"):
+            return [builder.finish() for builder in builders]
+
+    # Otherwise parse the whole CSV into contiguous arrays in one pass; with parse_workers other than 1, a large file
+    # is parsed on that many processes (0 = one per CPU core)
+    with timer.phase("parse"):
+        if parse_workers == 1: sections = parsing.parse_csv_sections(filepath, assume_DirectX_PIX_layout, split_sections, timer.checkpoint,
+                                                                     primitive_topology)
+        else: sections = parallel.parse_csv_sections(filepath, assume_DirectX_PIX_layout, split_sections, parse_workers, parse_executable,
+                                                     timer.checkpoint, primitive_topology)
+
+    # Every section's rows are let go of as soon as its vertex table is built
+    tables = []
+    with timer.phase("index"):
+        sections.reverse()
+        while sections:
+            data = sections.pop()
+            tables.append(geometry.vertex_table(data["VTX"], data["IDX"], vertex_attributes(data, precision)))
+            timer.count("rows", len(data["IDX"]))
+            del data
+    return tables
+
+def transform_table(table, matrix, precision = "FULL"):
+
+    # Move positions, normals, tangents and binormals of a vertex table into the space of the transform stage.
+    # Compacted directions are decoded for it and stored in the given precision again.
+    if geometry.is_identity(matrix): return table
+    table = dict(table)
+    for name, values in table.items():
+        semantic = parsing.attribute_semantic(name)
+        if name == "positions" or semantic == "shape": table[name] = geometry.transform_points(values, matrix)
+        elif semantic == "normal": values = geometry.transform_normals(geometry.decode_attribute(values), matrix)
+        elif semantic in ("tangent", "binormal"): values = geometry.transform_directions(geometry.decode_attribute(values), matrix)
+        else: continue
+        if semantic in geometry.DIRECTION_SEMANTICS: table[name] = geometry.compact_attribute(semantic, values, precision)
+    return table
+
+def build_mesh_data(table, indices, mirror_x = False, vertex_order = True, primitive_topology = "TRIANGLE_LIST", timer = None,
+                    transform = None, precision = "FULL", target_faces = 0, cell_size = 0.0):
+
+    # Turns the vertex table and index buffer of one section into the arrays make_mesh needs: "positions" (V, 3),
+    # "faces" (F, 3), the per face corner "normals" (F, 3, 3), "uvs" (F, 3, 2) and other (F, 3, k) attributes, and the
+    # per vertex skinning attributes (V, k). Only "positions" and "faces" are always there.
+    # "transform" (3x3 or 4x4) is baked into the vertex data, after the X mirror. Faces use the smallest unsigned index
+    # type for the vertex count, and normals and UVs are stored in the given precision (see geometry.PRECISIONS), the
+    # one read_vertex_tables compacted the table to. target_faces or cell_size decimate the result (see
+    # decimate_mesh_data).
+    timer = timer or profiling.PhaseTimer()
+
+    # Mirror and transform the vertices with one matrix; a mirroring matrix also reverses the winding, so faces keep
+    # pointing outwards
+    matrix = geometry.transform_matrix(transform, mirror_x)
+    with timer.phase("transform"):
+        table = transform_table(table, matrix, precision)
+    positions = table["positions"]
+
+    # Assemble triangles from the index buffer (list, strip or fan), reversing the winding if asked to
+    with timer.phase("faces"):
+        corners = geometry.assemble_faces(indices, primitive_topology, vertex_order != geometry.flips_winding(matrix))
+
+    # Combine tri's to make a solid mesh and to remove unnecessary vertices; corner data is gathered from the faces
+    # before the merge, so UV seams and hard edges survive it
+    with timer.phase("weld"):
+        kept_vertices, faces, kept_faces = geometry.weld_vertices(positions, corners, geometry.MERGE_THRESHOLD)
+
+    # Drop slivers, duplicates and back-to-back faces; Blender would otherwise have to do it in edit mode
+    with timer.phase("cleanup"):
+        clean = geometry.clean_faces(positions[kept_vertices], faces)
+        faces = faces[clean]
+        kept_faces = np.flatnonzero(kept_faces)[clean]
+        timer.count("removed_faces", np.count_nonzero(~clean))
+
+    # Normals, UVs, colors etc. are set per face corner, so gather them in the (possibly reordered) face order, once,
+    # for the faces that are left. Skinning data stays per vertex.
+    # TODO: Add support for changing the origin of UV coords
+    with timer.phase("gather"):
+        corners = corners[kept_faces]
+        mesh_data = {"positions": positions[kept_vertices], "faces": faces}
+        for name, values in table.items():
+            if name == "positions": continue
+            if parsing.attribute_semantic(name) in parsing.POINT_SEMANTICS: mesh_data[name] = values[kept_vertices]
+            else: mesh_data[name] = values[corners]
+
+    if target_faces or cell_size:
+        with timer.phase("decimate"):
+            face_count = len(mesh_data["faces"])
+            mesh_data = decimate_mesh_data(mesh_data, target_faces, cell_size)
+            timer.count("decimated_faces", face_count - len(mesh_data["faces"]))
+
+    timer.record_sizes(mesh_data)
+
+    return mesh_data
+
+def decimate_mesh_data(mesh_data, target_faces = 0, cell_size = 0.0):
+
+    # Lightweight proxy of a mesh by vertex clustering: every grid cell of cell_size (or the size that leaves about
+    # target_faces triangles) becomes one vertex at the average of the vertices in it. Per vertex attributes are
+    # averaged too, except skinning, which comes from the cell's first vertex since indices and weights go in pairs.
+    # Faces that collapse or end up on top of each other are dropped; the rest keep their per corner attributes.
+    positions = mesh_data["positions"]
+    faces = np.asarray(mesh_data["faces"], dtype = np.int64)
+    if not cell_size: cell_size = geometry.decimation_cell_size(positions, faces, target_faces)
+    if cell_size <= 0: return mesh_data
+
+    first, clusters = geometry.cluster_vertices(positions, cell_size)
+    cluster_positions = geometry.cluster_means(positions, clusters, len(first))
+    faces = clusters[faces]
+    kept_faces = geometry.clean_faces(cluster_positions, faces)
+    faces = faces[kept_faces]
+
+    # Cells whose faces all collapsed would be loose vertices; leave them out
+    used = np.zeros(len(first), dtype = bool)
+    used[faces] = True
+    remap = np.cumsum(used) - 1
+
+    decimated = {"positions": cluster_positions[used], "faces": remap[faces].astype(geometry.index_dtype(int(np.count_nonzero(used))))}
+    for name, values in mesh_data.items():
+        if name in ("positions", "faces"): continue
+        semantic = parsing.attribute_semantic(name)
+        if semantic in ("blend_indices", "blend_weights"): decimated[name] = np.asarray(values)[first][used]
+        elif semantic in parsing.POINT_SEMANTICS: decimated[name] = geometry.cluster_means(values, clusters, len(first))[used]
+        else: decimated[name] = np.asarray(values)[kept_faces]
+    return decimated
+
+def mesh_hash(mesh_data):
+
+    # Digest of everything a mesh is built from (name, type, shape and bytes of every array), so two draws of the same
+    # mesh can share one datablock
+    digest = hashlib.sha1()
+    for name in sorted(mesh_data):
+        values = np.ascontiguousarray(mesh_data[name])
+        digest.update((name + ":" + values.dtype.str + ":" + str(values.shape) + ";").encode("utf-8"))
+        digest.update(values.reshape(-1).view(np.uint8))
+    return digest.hexdigest()
+
+def resolve_output_filepath(filepath, output_filepath):
+
+    # The output CSV (or buffer layout) paired with an input file: "{name}" stands for the input's file name without
+    # extension and relative paths start at the input's folder, so one setting ("{name}_out.csv") pairs a whole batch
+    # of files
+    if not output_filepath: return None
+    name = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(filepath)), output_filepath.replace("{name}", name))
+
+def paired_filepaths(filepath, output_filepath = None, layout_filepath = None):
+
+    # Every file besides "filepath" that an import reads (already resolved paths), for the cache key
+    if binary.is_binary(filepath, layout_filepath): return binary.buffer_filepaths(filepath, layout_filepath)
+    return [output_filepath] if output_filepath else []
+
+def source_key(filepath, options):
+
+    # Changes whenever the file, the files paired with it or the pipeline options (the keywords of load_mesh_data) do;
+    # hot reload compares it to find the imported objects that are out of date
+    output_filepath = resolve_output_filepath(filepath, options.get("output_filepath"))
+    layout_filepath = resolve_output_filepath(filepath, options.get("layout_filepath"))
+    return cache.cache_key(filepath, options, paired_filepaths(filepath, output_filepath, layout_filepath))
+
+def build_sections(filepath, assume_DirectX_PIX_layout = False, mirror_x = False, vertex_order = True,
+                   use_streaming = False, chunk_size = parsing.DEFAULT_CHUNK_SIZE, split_sections = True,
+                   primitive_topology = "TRIANGLE_LIST", timer = None, transform = None, output_filepath = None,
+                   output_mapping = parsing.DEFAULT_OUTPUT_MAPPING, precision = "FULL", parse_workers = 1, parse_executable = None,
+                   layout_filepath = None, target_faces = 0, cell_size = 0.0):
+
+    # Every section (draw) of the file becomes its own set of mesh arrays
+    sections = []
+    tables = read_vertex_tables(filepath, assume_DirectX_PIX_layout, use_streaming, chunk_size, split_sections, primitive_topology, timer,
+                                output_filepath, output_mapping, parse_workers, parse_executable, layout_filepath, precision)
+    for table, indices, _ in tables:
+        sections.append(build_mesh_data(table, indices, mirror_x, vertex_order, primitive_topology, timer, transform, precision,
+                                        target_faces, cell_size))
+    return sections
+
+def load_mesh_data(filepath, assume_DirectX_PIX_layout = False, mirror_x = False, vertex_order = True,
+                   use_streaming = False, chunk_size = parsing.DEFAULT_CHUNK_SIZE, split_sections = True,
+                   primitive_topology = "TRIANGLE_LIST", use_cache = False, timer = None, transform = None, output_filepath = None,
+                   output_mapping = parsing.DEFAULT_OUTPUT_MAPPING, precision = "FULL", parse_workers = 1, parse_executable = None,
+                   layout_filepath = None, target_faces = 0, cell_size = 0.0):
+
+    # build_sections with a persistent cache in front of it; returns a list with one mesh_data per section.
+    # Only options that change the result are part of the key; streaming and the chunk size don't.
+    # Pass a profiling.PhaseTimer to find out where the time went, and a 3x3 or 4x4 "transform" (nested lists) to bake
+    # it into the vertex data. output_filepath (see resolve_output_filepath) pairs the file with its output CSV.
+    # parse_workers spreads the parsing of a large file over processes, started with parse_executable (Blender's
+    # bundled Python inside Blender). A JSON layout descriptor, or a raw vertex buffer with a layout_filepath (JSON or
+    # CSV, see binary), is read as raw buffers instead of CSV. target_faces or cell_size import a decimated proxy.
+    timer = timer or profiling.PhaseTimer()
+    if transform is not None: transform = [[float(value) for value in row] for row in transform]
+    output_filepath = resolve_output_filepath(filepath, output_filepath)
+    layout_filepath = resolve_output_filepath(filepath, layout_filepath)
+    if not use_cache:
+        return build_sections(filepath, assume_DirectX_PIX_layout, mirror_x, vertex_order, use_streaming, chunk_size, split_sections,
+                              primitive_topology, timer, transform, output_filepath, output_mapping, precision, parse_workers,
+                              parse_executable, layout_filepath, target_faces, cell_size)
+
+    options = {
+               "assume_DirectX_PIX_layout": assume_DirectX_PIX_layout,
+               "mirror_x": mirror_x,
+               "vertex_order": vertex_order,
+               "split_sections": split_sections,
+               "primitive_topology": primitive_topology,
+               "transform": transform,
+               "output_mapping": output_mapping if output_filepath else None,
+               "precision": precision,
+               "target_faces": target_faces,
+               "cell_size": cell_size,
+               }
+    # Every section is an entry of its own; a small manifest entry records how many there are
+    with timer.phase("cache"):
+        key = cache.cache_key(filepath, options, paired_filepaths(filepath, output_filepath, layout_filepath))
+        manifest = cache.load(key)
+        if manifest is not None:
+            sections = [cache.load(cache.section_key(key, section)) for section in range(int(manifest["section_count"][0]))]
+            if all(mesh_data is not None for mesh_data in sections):
+                for mesh_data in sections: timer.record_sizes(mesh_data)
+                return sections
+
+    sections = build_sections(filepath, assume_DirectX_PIX_layout, mirror_x, vertex_order, use_streaming, chunk_size, split_sections,
+                              primitive_topology, timer, transform, output_filepath, output_mapping, precision, parse_workers,
+                              parse_executable, layout_filepath, target_faces, cell_size)
+
+    with timer.phase("cache"):
+        for section, mesh_data in enumerate(sections): cache.store(cache.section_key(key, section), mesh_data)
+        cache.store(key, {"section_count": np.array([len(sections)], dtype = np.int64)})
+
+    return sections
@@ -0,0 +1,193 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Phase timers, optional peak memory sampling and profiling for imports. Nothing in here may import bpy: the timers
+# also run in the batch worker processes and travel back to Blender with their results.
+
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Set to a file path (or to "1" for "<csv name>.prof" next to the imported file) to run imports under cProfile
+PROFILE_ENVIRONMENT_VARIABLE = "PIX_CSV_PROFILE"
+
+# Timers of this process that are tracing memory, and whether the first of them had to start tracemalloc (so the last
+# one stops it again); tracing that was already on, e.g. for a debugging session, is left alone
+tracing_lock = threading.Lock()
+tracing_timers = 0
+started_tracing = False
+
+
+# ~~~~~~~~~~~~~~~~~~~~Timer Classes~~~~~~~~~~~~~~~~~~~~
+class PhaseTimer:
+
+    # Accumulates wall time (and, with trace_memory, the tracemalloc peak) per named phase, plus a few counts and the
+    # size of the arrays an import ends up with. Phases are flat: a phase must not be started inside another one.
+    # Plain dictionaries only, so it pickles.
+    def __init__(self, trace_memory = False):
+        self.trace_memory = trace_memory
+        self.tracing = False
+        self.seconds = {}
+        self.peak_memory = {}
+        self.counts = {}
+        self.sizes = {}
+
+    @contextmanager
+    def phase(self, name):
+
+        # Tracing starts on first use, so a timer sent back from a worker process keeps tracing in this one.
+        # Python 3.9 can reset the peak per phase; before that the peak is the highest one since tracing started.
+        if self.trace_memory:
+            self.start_tracing()
+            if hasattr(tracemalloc, "reset_peak"): tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+            if self.trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_memory[name] = max(peak, self.peak_memory.get(name, 0))
+
+    def start_tracing(self):
+        global tracing_timers, started_tracing
+        with tracing_lock:
+            if self.tracing: return
+            if tracing_timers == 0:
+                started_tracing = not tracemalloc.is_tracing()
+                if started_tracing: tracemalloc.start()
+            tracing_timers += 1
+            self.tracing = True
+
+    def stop_tracing(self):
+
+        # Call once the timer's work in this process is done (before it is sent to another one)
+        global tracing_timers, started_tracing
+        with tracing_lock:
+            if not self.tracing: return
+            self.tracing = False
+            tracing_timers -= 1
+            if tracing_timers == 0 and started_tracing:
+                tracemalloc.stop()
+                started_tracing = False
+
+    def iterate(self, name, iterable):
+
+        # Yields from iterable, counting the time spent producing every item (not the caller's work) as phase "name"
+        iterator = iter(iterable)
+        while True:
+            with self.phase(name):
+                try: item = next(iterator)
+                except StopIteration: return
+            yield item
+
+    def checkpoint(self):
+
+        # Called between blocks of work inside a phase; a plain timer just carries on (see worker.CancellableTimer)
+        pass
+
+    def count(self, name, value):
+        self.counts[name] = self.counts.get(name, 0) + int(value)
+
+    def record_sizes(self, arrays):
+
+        # Bytes held per attribute, summed over every section and file
+        for name, values in arrays.items(): self.sizes[name] = self.sizes.get(name, 0) + int(values.nbytes)
+
+    def merge(self, other):
+
+        # Add the phases of another timer (of a worker process, or of another file) to this one
+        for name, seconds in other.seconds.items(): self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        for name, peak in other.peak_memory.items(): self.peak_memory[name] = max(peak, self.peak_memory.get(name, 0))
+        for name, value in other.counts.items(): self.count(name, value)
+        for name, size in other.sizes.items(): self.sizes[name] = self.sizes.get(name, 0) + size
+
+    def total(self):
+        return sum(self.seconds.values())
+
+    def summary(self):
+
+        # One line for the status bar, e.g. "0.84s: parse 0.51s, index 0.10s (12.3 MB), ..."
+        parts = []
+        for name, seconds in self.seconds.items():
+            part = "{} {:.2f}s".format(name, seconds)
+            if name in self.peak_memory: part += " ({:.1f} MB)".format(self.peak_memory[name] / (1024.0 * 1024.0))
+            parts.append(part)
+        return "{:.2f}s: ".format(self.total()) + ", ".join(parts)
+
+    def size_summary(self):
+
+        # One line with the memory every attribute takes, largest first, e.g. "24.0 MB: faces 12.0 MB, ..."
+        parts = [name + " " + format_size(size) for name, size in sorted(self.sizes.items(), key = lambda item: -item[1])]
+        return format_size(sum(self.sizes.values())) + ": " + ", ".join(parts)
+
+    def as_dict(self):
+        return {
+                "total_seconds": self.total(),
+                "phases": {name: {"seconds": seconds, "peak_memory": self.peak_memory.get(name)} for name, seconds in self.seconds.items()},
+                "counts": dict(self.counts),
+                "sizes": dict(self.sizes),
+                }
+
+
+# ~~~~~~~~~~~~~~~~~~~~Output Functions~~~~~~~~~~~~~~~~~~~~
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024: return "{:.1f} {}".format(size, unit)
+        size /= 1024.0
+    return "{:.1f} GB".format(size)
+
+def log_path(filepath):
+    return os.path.splitext(filepath)[0] + ".import_log.json"
+
+def write_log(filepath, timer, options = None):
+
+    # Structured record of one import, written next to the imported file. Returns the path of the log.
+    record = {
+              "file": os.path.abspath(filepath),
+              "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "options": {name: value for name, value in (options or {}).items() if isinstance(value, (bool, int, float, str))},
+              }
+    record.update(timer.as_dict())
+
+    path = log_path(filepath)
+    with open(path, "w") as f: json.dump(record, f, indent = 2)
+    return path
+
+def profile_path(filepath):
+
+    # Where cProfile stats go, or None if profiling isn't switched on
+    target = os.environ.get(PROFILE_ENVIRONMENT_VARIABLE, "")
+    if target in ("", "0"): return None
+    if target == "1": return os.path.splitext(filepath)[0] + ".prof"
+    return target
+
+def run_profiled(path, function, *args, **kwargs):
+
+    # Call function under cProfile and dump the stats to path (load them with pstats or snakeviz)
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
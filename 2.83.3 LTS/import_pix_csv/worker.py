@@ -0,0 +1,132 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Background side of the modal import: reads and pre-processes files on a thread (and, for several files, on the batch
+# process pool) while Blender's UI keeps running. Results are handed to the main thread through a queue, which builds
+# the datablocks. Nothing in here may import bpy.
+
+import queue
+import threading
+from contextlib import contextmanager
+from . import batch, pipeline, profiling
+
+# Share of a file's work that is done when a phase starts; only used to move the progress bar along
+PHASE_PROGRESS = {"cache": 0.0, "parse": 0.0, "index": 0.6, "faces": 0.7, "weld": 0.75, "cleanup": 0.85, "gather": 0.9, "decimate": 0.95}
+
+
+# ~~~~~~~~~~~~~~~~~~~~Worker Classes~~~~~~~~~~~~~~~~~~~~
+class Cancelled(Exception):
+    pass
+
+class CancellableTimer(profiling.PhaseTimer):
+
+    # A PhaseTimer that also tracks the phase the import is in, and aborts it (by raising Cancelled) at the next phase
+    # or checkpoint once the import got cancelled. Streamed imports start a phase per block, a whole file is parsed a
+    # block at a time and a parse on the process pool checks while it waits, so they all stop quickly.
+    def __init__(self, cancel_event, trace_memory = False):
+        profiling.PhaseTimer.__init__(self, trace_memory)
+        self.cancel_event = cancel_event
+        self.current_phase = None
+
+    @contextmanager
+    def phase(self, name):
+        self.checkpoint()
+        self.current_phase = name
+        with profiling.PhaseTimer.phase(self, name):
+            yield
+
+    def checkpoint(self):
+        if self.cancel_event.is_set(): raise Cancelled()
+
+class ImportWorker(threading.Thread):
+
+    # Runs pipeline.load_mesh_data for every file and queues (filepath, sections, timer, error) results in file order.
+    # Several files go to the process pool as in batch.iter_mesh_data; a single file is read on this thread, where
+    # it can report progress per phase. Either way a cancelled import stops its worker processes before this thread ends.
+    def __init__(self, filepaths, worker_count = 0, python_executable = None, trace_memory = False, **options):
+        threading.Thread.__init__(self, daemon = True)
+        self.filepaths = list(filepaths)
+        self.worker_count = worker_count
+        self.python_executable = python_executable
+        self.trace_memory = trace_memory
+        self.options = options
+
+        self.results = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.finished_count = 0
+        self.timer = None    # Timer of the file being read on this thread, if any
+
+    def run(self):
+        try:
+            if self.worker_count == 1 or len(self.filepaths) <= 1: self.run_serial()
+            else: self.run_pool()
+        finally:
+            # Wakes up the main thread even if something unexpected went wrong in here
+            self.results.put(None)
+
+    def run_serial(self):
+        options = batch.file_options(self.filepaths, self.worker_count, self.python_executable, **self.options)
+        for filepath in self.filepaths:
+            self.timer = CancellableTimer(self.cancel_event, self.trace_memory)
+            try:
+                sections = pipeline.load_mesh_data(filepath, timer = self.timer, **options)
+                result = (filepath, sections, self.timer, None)
+            except Cancelled:
+                return
+            except Exception as error:
+                result = (filepath, None, None, error)
+
+            self.finished_count += 1
+            self.results.put(result)
+
+    def run_pool(self):
+        results = batch.iter_mesh_data(self.filepaths, self.worker_count, self.python_executable, self.trace_memory,
+                                       self.checkpoint, **self.options)
+        try:
+            for result in results:
+                self.checkpoint()
+                self.finished_count += 1
+                self.results.put(result)
+        except Cancelled:
+            return
+        finally:
+            # Closing the generator cancels the files that haven't started yet and stops the pool
+            results.close()
+
+    def checkpoint(self):
+        if self.cancel_event.is_set(): raise Cancelled()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def progress(self):
+
+        # Fraction of the work done, between 0 and 1
+        done = float(self.finished_count)
+        timer = self.timer
+        if timer is not None and self.finished_count < len(self.filepaths):
+            done += PHASE_PROGRESS.get(timer.current_phase, 0.0)
+        return min(done / max(len(self.filepaths), 1), 1.0)
+
+    def next_result(self, timeout = None):
+
+        # The next (filepath, sections, timer, error) result, None once every file is done (or the worker stopped),
+        # or raises queue.Empty if nothing is ready yet
+        return self.results.get(timeout = timeout)
@@ -0,0 +1,38 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# The tests import the add-on package from the folder above and run in plain Python: outside Blender, the stand-ins in
+# benchmarks/stubs take the place of bpy, and the benchmark CSV generator writes the test files.
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# Keep the tests' import cache away from the real one; cache.py reads this when it is first imported
+os.environ["PIX_CSV_CACHE_DIR"] = tempfile.mkdtemp(prefix = "pix_csv_test_cache.")
+
+try:
+    import bpy
+except ImportError:
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks", "stubs"))
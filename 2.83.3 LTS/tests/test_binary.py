@@ -0,0 +1,72 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Tests of the raw vertex/index buffer import in binary.py, run in plain Python ("python -m pytest tests").
+
+import json
+import numpy as np
+from import_pix_csv import binary, pipeline
+
+
+# ~~~~~~~~~~~~~~~~~~~~Helper Functions~~~~~~~~~~~~~~~~~~~~
+def write_draw(tmp_path, indices, base_vertex = 0, index_format = "uint16"):
+
+    # 0x10002 vertices of float32x3 positions (x is the vertex number, y alternates so no three in a row line up), an
+    # index buffer and their descriptor
+    positions = np.zeros((0x10002, 3), dtype = np.float32)
+    positions[:, 0] = np.arange(len(positions))
+    positions[:, 1] = np.arange(len(positions)) % 2
+    positions.tofile(str(tmp_path / "vb.bin"))
+    np.array(indices, dtype = binary.INDEX_FORMATS[index_format]).tofile(str(tmp_path / "ib.bin"))
+
+    layout = {
+              "vertex_buffer": "vb.bin", "stride": 12,
+              "attributes": [{"name": "in_POSITION0", "offset": 0, "format": "float32x3"}],
+              "index_buffer": "ib.bin", "index_format": index_format, "base_vertex": base_vertex,
+              }
+    path = tmp_path / "draw.json"
+    path.write_text(json.dumps(layout))
+    return str(path)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Index Tests~~~~~~~~~~~~~~~~~~~~
+def test_base_vertex_applies_to_the_largest_index_of_a_list(tmp_path):
+    path = write_draw(tmp_path, [0, 1, 0xFFFF], base_vertex = 1)
+    attributes, indices = binary.read_buffers(path, primitive_topology = "TRIANGLE_LIST")
+    assert indices.tolist() == [1, 2, 0x10000]
+    assert attributes["positions"][indices[-1], 0] == 0x10000
+
+def test_restarts_of_a_strip_are_marked(tmp_path):
+    path = write_draw(tmp_path, [0, 1, 2, 0xFFFF, 3, 4, 5], base_vertex = 1)
+    _, indices = binary.read_buffers(path, primitive_topology = "TRIANGLE_STRIP")
+    assert indices.tolist() == [1, 2, 3, -1, 4, 5, 6]
+
+def test_base_vertex_onto_the_restart_value_is_a_vertex(tmp_path):
+    # base_vertex moves 0xFFFE onto 0xFFFF, which is a real vertex of this draw and not a restart
+    path = write_draw(tmp_path, [0xFFFC, 0xFFFD, 0xFFFE, 0xFFFB], base_vertex = 1)
+    _, indices = binary.read_buffers(path, primitive_topology = "TRIANGLE_STRIP")
+    assert indices.tolist() == [0xFFFD, 0xFFFE, 0xFFFF, 0xFFFC]
+    assert len(pipeline.load_mesh_data(path, primitive_topology = "TRIANGLE_STRIP")[0]["faces"]) == 2
+
+def test_32_bit_strip_keeps_vertex_65535(tmp_path):
+    path = write_draw(tmp_path, [0xFFFE, 0xFFFF, 0x10000, 0x10001], index_format = "uint32")
+    mesh_data = pipeline.load_mesh_data(path, primitive_topology = "TRIANGLE_STRIP")[0]
+    assert len(mesh_data["faces"]) == 2
+    assert sorted(mesh_data["positions"][:, 0].tolist()) == [0xFFFE, 0xFFFF, 0x10000, 0x10001]
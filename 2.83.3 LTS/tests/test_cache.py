@@ -0,0 +1,80 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Tests of the on-disk import cache in cache.py, run in plain Python ("python -m pytest tests").
+
+import os
+import numpy as np
+import generate_csv
+from import_pix_csv import cache, pipeline, profiling
+
+
+# ~~~~~~~~~~~~~~~~~~~~Helper Functions~~~~~~~~~~~~~~~~~~~~
+def timed_load(path, **options):
+    timer = profiling.PhaseTimer()
+    return pipeline.load_mesh_data(path, use_cache = True, timer = timer, **options), timer
+
+
+# ~~~~~~~~~~~~~~~~~~~~Cache Tests~~~~~~~~~~~~~~~~~~~~
+def test_second_import_is_a_hit(tmp_path):
+    path = str(tmp_path / "mesh.csv")
+    generate_csv.write_csv(path, 600)
+    built, timer = timed_load(path)
+    assert "parse" in timer.seconds
+
+    cached, timer = timed_load(path)
+    assert "parse" not in timer.seconds
+    assert isinstance(cached[0]["positions"], np.memmap)
+    assert sorted(cached[0]) == sorted(built[0])
+    for name in built[0]: assert np.array_equal(cached[0][name], built[0][name])
+
+def test_changed_options_or_file_miss(tmp_path):
+    path = str(tmp_path / "mesh.csv")
+    generate_csv.write_csv(path, 600)
+    timed_load(path)
+
+    _, timer = timed_load(path, mirror_x = True)
+    assert "parse" in timer.seconds
+
+    # Streaming doesn't change the result, so it shares the entry
+    _, timer = timed_load(path, use_streaming = True)
+    assert "parse" not in timer.seconds
+
+    generate_csv.write_csv(path, 900)
+    os.utime(path, ns = (os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10 ** 9))
+    sections, timer = timed_load(path)
+    assert "parse" in timer.seconds
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    arrays = {"values": np.zeros(1000, dtype = np.float64)}
+    size = 8000 + 128    # Data and .npy header
+    for age, key in enumerate(("old", "used", "new")):
+        cache.store(key, arrays, cache_dir, max_size = 10 * size)
+        os.utime(os.path.join(cache_dir, key), (1000 + age, 1000 + age))
+
+    # Loading "old" makes it the most recently used one, so "used" is the first to go
+    assert cache.load("old", cache_dir) is not None
+    cache.evict(cache_dir, 2 * size)
+    assert sorted(os.listdir(cache_dir)) == ["new", "old"]
+    assert cache.load("used", cache_dir) is None
+
+    cache.clear(cache_dir)
+    assert os.listdir(cache_dir) == []
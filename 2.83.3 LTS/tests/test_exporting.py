@@ -0,0 +1,156 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Tests of the PLY/OBJ/glTF writers in exporting.py, run in plain Python ("python -m pytest tests").
+
+import json
+import numpy as np
+import pytest
+import generate_csv
+from import_pix_csv import exporting, pipeline
+
+
+# ~~~~~~~~~~~~~~~~~~~~Helper Functions~~~~~~~~~~~~~~~~~~~~
+def convert(tmp_path, file_format, section_count = 1):
+
+    # Convert a generated capture and return the paths written plus the mesh data they were written from
+    path = str(tmp_path / "mesh.csv")
+    generate_csv.write_csv(path, 600, ("normal", "uv", "color"), section_count = section_count)
+    to_forward, to_up = exporting.FORMAT_AXES[file_format]
+    matrix = exporting.axis_conversion("Z", "Y", to_forward, to_up)
+    sections = pipeline.load_mesh_data(path, transform = matrix.tolist())
+    return exporting.convert_file(path, file_format = file_format), sections
+
+def read_ply(path):
+
+    # Header lines, vertex table and face table of a binary PLY file written by write_ply
+    with open(path, "rb") as f:
+        header = []
+        while not header or header[-1] != "end_header": header.append(f.readline().decode("ascii").rstrip("\n"))
+        body = f.read()
+
+    types = {"float": "<f4", "uchar": "u1"}
+    fields = [(line.split()[2], types[line.split()[1]]) for line in header if line.startswith("property ") and "list" not in line]
+    vertex_count = int(header[2].split()[-1])
+    vertices = np.frombuffer(body, dtype = fields, count = vertex_count)
+    faces = np.frombuffer(body, dtype = [("count", "u1"), ("vertices", "<i4", 3)], offset = vertices.nbytes)
+    return header, vertices, faces
+
+
+# ~~~~~~~~~~~~~~~~~~~~Axis Tests~~~~~~~~~~~~~~~~~~~~
+def test_axis_conversion_matches_blender():
+    assert np.array_equal(exporting.axis_conversion(), np.eye(3))
+
+    # Blender's Y forward, Z up to OBJ's -Z forward, Y up: what was up is Y, what was forward is -Z
+    matrix = exporting.axis_conversion("Y", "Z", "-Z", "Y")
+    assert np.allclose(matrix, [[1, 0, 0], [0, 0, 1], [0, -1, 0]])
+    assert np.isclose(np.linalg.det(matrix), 1.0)
+    assert np.allclose(exporting.axis_conversion("-Z", "Y", "Y", "Z") @ matrix, np.eye(3))
+
+    with pytest.raises(ValueError):
+        exporting.axis_conversion("Y", "-Y")
+
+
+# ~~~~~~~~~~~~~~~~~~~~Vertex Tests~~~~~~~~~~~~~~~~~~~~
+def test_corner_vertices_split_seams_only():
+    # Two triangles sharing the edge 1-2; vertex 2 has a UV seam there, vertex 1 doesn't
+    mesh_data = {
+                 "positions": np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 1, 0)], dtype = np.float32),
+                 "faces": np.array([(0, 1, 2), (2, 1, 3)]),
+                 "uvs": np.array([[(0, 0), (1, 0), (0, 1)], [(0.5, 1), (1, 0), (1, 1)]], dtype = np.float32),
+                 }
+    vertices, attributes, faces = exporting.corner_vertices(mesh_data, ["uvs"])
+
+    assert vertices.tolist() == [0, 1, 2, 2, 3]
+    assert faces.tolist() == [[0, 1, 2], [3, 1, 4]]
+    assert np.array_equal(attributes["uvs"][faces], mesh_data["uvs"])
+
+
+# ~~~~~~~~~~~~~~~~~~~~Writer Tests~~~~~~~~~~~~~~~~~~~~
+def test_ply_round_trip(tmp_path):
+    (path,), (mesh_data,) = convert(tmp_path, "PLY")
+    header, vertices, faces = read_ply(path)
+
+    assert header[:2] == ["ply", "format binary_little_endian 1.0"]
+    assert "property list uchar int vertex_indices" in header
+    assert [line.split()[-1] for line in header if line.startswith("property ") and "list" not in line] == \
+           ["x", "y", "z", "nx", "ny", "nz", "s", "t", "red", "green", "blue", "alpha"]
+    assert len(faces) == len(mesh_data["faces"]) and (faces["count"] == 3).all()
+
+    positions = np.stack((vertices["x"], vertices["y"], vertices["z"]), axis = 1)
+    assert np.allclose(positions[faces["vertices"]], mesh_data["positions"][mesh_data["faces"]])
+    uvs = np.stack((vertices["s"], vertices["t"]), axis = 1)
+    assert np.allclose(uvs[faces["vertices"]], mesh_data["uvs"])
+
+def test_obj_round_trip(tmp_path):
+    (path,), sections = convert(tmp_path, "OBJ", section_count = 2)
+    with open(path) as f: lines = f.read().splitlines()
+
+    assert [line for line in lines if line.startswith("o ")] == ["o mesh Section 0", "o mesh Section 1"]
+    positions = np.array([line.split()[1:] for line in lines if line.startswith("v ")], dtype = np.float64)
+    corners = np.array([[corner.split("/") for corner in line.split()[1:]] for line in lines if line.startswith("f ")], dtype = np.int64)
+    assert len(positions) == sum(len(mesh_data["positions"]) for mesh_data in sections)
+    assert corners.shape == (sum(len(mesh_data["faces"]) for mesh_data in sections), 3, 3)
+
+    # Indices are 1 based and run on across objects
+    faces = np.concatenate([mesh_data["faces"] + offset for mesh_data, offset in
+                            zip(sections, (0, len(sections[0]["positions"])))])
+    assert np.array_equal(corners[:, :, 0] - 1, faces)
+    assert np.allclose(positions[corners[:, :, 0] - 1], np.concatenate([mesh_data["positions"] for mesh_data in sections])[faces], atol = 1e-5)
+
+def gltf_accessor(gltf, data, index):
+
+    # The values of a glTF accessor, one row per element
+    accessor = gltf["accessors"][index]
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    dtype = np.dtype({exporting.GLTF_FLOAT: np.float32, exporting.GLTF_UNSIGNED_SHORT: np.uint16,
+                      exporting.GLTF_UNSIGNED_INT: np.uint32}[accessor["componentType"]])
+    values = np.frombuffer(data, dtype = dtype, count = view["byteLength"] // dtype.itemsize, offset = view["byteOffset"])
+    return values.reshape(accessor["count"], -1)
+
+def test_gltf_round_trip(tmp_path):
+    (path, bin_path), (mesh_data,) = convert(tmp_path, "GLTF")
+    with open(path) as f: gltf = json.load(f)
+    with open(bin_path, "rb") as f: data = f.read()
+
+    assert gltf["asset"]["version"] == "2.0" and gltf["buffers"][0]["byteLength"] == len(data)
+    primitive = gltf["meshes"][0]["primitives"][0]
+    assert sorted(primitive["attributes"]) == ["COLOR_0", "NORMAL", "POSITION", "TEXCOORD_0"]
+    assert gltf["accessors"][primitive["indices"]]["componentType"] == exporting.GLTF_UNSIGNED_SHORT
+
+    indices = gltf_accessor(gltf, data, primitive["indices"]).reshape(-1, 3)
+    positions = gltf_accessor(gltf, data, primitive["attributes"]["POSITION"])
+    assert np.allclose(positions[indices], mesh_data["positions"][mesh_data["faces"]])
+
+    # The UV origin flips to the top left
+    uvs = gltf_accessor(gltf, data, primitive["attributes"]["TEXCOORD_0"])
+    assert np.allclose(1.0 - uvs[indices][:, :, 1], mesh_data["uvs"][:, :, 1])
+
+def test_gltf_uses_32_bit_indices_past_65535_vertices(tmp_path):
+    count = 0x10000 + 2
+    mesh_data = {"positions": np.random.RandomState(0).rand(count, 3).astype(np.float32),
+                 "faces": np.arange(count - count % 3).reshape(-1, 3)}
+    exporting.write_gltf(str(tmp_path / "big.gltf"), [mesh_data], ["big"])
+    with open(str(tmp_path / "big.gltf")) as f: gltf = json.load(f)
+    with open(str(tmp_path / "big.bin"), "rb") as f: data = f.read()
+
+    primitive = gltf["meshes"][0]["primitives"][0]
+    assert gltf["accessors"][primitive["indices"]]["componentType"] == exporting.GLTF_UNSIGNED_INT
+    assert np.array_equal(gltf_accessor(gltf, data, primitive["indices"]).reshape(-1, 3), mesh_data["faces"])
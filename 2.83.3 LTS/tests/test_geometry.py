@@ -0,0 +1,207 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Tests of the array stages in geometry.py, run in plain Python ("python -m pytest tests").
+
+import numpy as np
+from import_pix_csv import geometry
+
+
+# ~~~~~~~~~~~~~~~~~~~~Welding Tests~~~~~~~~~~~~~~~~~~~~
+def weld(points):
+    points = np.array(points, dtype = np.float64) * geometry.MERGE_THRESHOLD
+    kept, _, _ = geometry.weld_vertices(points, np.zeros((0, 3), dtype = np.int64))
+    return list(kept)
+
+def test_weld_merges_close_pair_across_cell_boundaries():
+
+    # 0.028 thresholds apart, but on either side of a cell boundary in X and in Y
+    assert weld([(0.99, 0.49, 0.2), (1.01, 0.51, 0.2)]) == [0]
+
+def test_weld_keeps_far_pair_in_one_cell():
+
+    # 1.7 thresholds apart, inside the same threshold wide cell
+    assert weld([(0.01, 0.01, 0.01), (0.99, 0.99, 0.99)]) == [0, 1]
+
+def test_weld_does_not_follow_chains():
+
+    # 0.9 is merged into 0.0; 1.8 is only close to 0.9, which isn't kept, so it stays
+    assert weld([(5.0, 0.0, 0.0), (0.0, 0.0, 0.0), (0.9, 0.0, 0.0), (1.8, 0.0, 0.0), (5.0, 0.0, 0.0)]) == [0, 1, 3]
+
+def test_weld_matches_greedy_remove_doubles():
+
+    # Go through the points in order; a point not merged yet is kept and takes every later one within the threshold
+    rng = np.random.default_rng(3)
+    points = rng.random((300, 3)) * 6.0
+    close = np.linalg.norm(points[:, None] - points[None], axis = 2) <= 1.0
+    merged = np.zeros(len(points), dtype = bool)
+    kept = []
+    for index in range(len(points)):
+        if merged[index]: continue
+        kept.append(index)
+        merged |= close[index]
+    assert weld(points) == kept
+
+def test_weld_maps_to_first_kept_vertex_within_threshold():
+    positions = np.array([(0.0, 0, 0), (3.0, 0, 0), (1.6, 0, 0), (4.9, 0, 0), (7.0, 0, 0)]) * geometry.MERGE_THRESHOLD
+    faces = np.array([(2, 3, 4)])
+    kept, welded, _ = geometry.weld_vertices(positions, faces, 2.0 * geometry.MERGE_THRESHOLD)
+
+    # 1.6 is within reach of 0.0 and 3.0, and goes to the first of them; 4.9 goes to 3.0
+    assert list(kept) == [0, 1, 4]
+    assert welded.tolist() == [[0, 1, 2]]
+
+def test_weld_remaps_faces_and_drops_collapsed_ones():
+    positions = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 0, 0), (1, 1, 0), (0.00001, 0, 0)], dtype = np.float32)
+    faces = np.array([(0, 1, 2), (3, 4, 2), (0, 5, 1)])
+    kept, welded, kept_faces = geometry.weld_vertices(positions, faces)
+    assert list(kept) == [0, 1, 2, 4]
+    assert welded.tolist() == [[0, 1, 2], [1, 3, 2]]
+    assert kept_faces.tolist() == [True, True, False]
+
+
+# ~~~~~~~~~~~~~~~~~~~~Vertex Table Tests~~~~~~~~~~~~~~~~~~~~
+def test_vertex_table_scatters_rows_and_drops_holes():
+
+    # Rows out of VTX order, IDX 1 never referenced, a restart in the middle
+    vtx = [2, 0, 1, 3]
+    idx = [3, 0, 3, -1]
+    positions = np.array([(3, 3, 3), (0, 0, 0), (3, 3, 3), (9, 9, 9)], dtype = np.float32)
+    table, indices, used = geometry.vertex_table(vtx, idx, {"positions": positions})
+    assert used.tolist() == [True, False, False, True]
+    assert indices.tolist() == [0, 1, 1, -1]
+    assert table["positions"].tolist() == [[0, 0, 0], [3, 3, 3]]
+
+def test_vertex_table_builder_matches_vertex_table():
+    vtx = np.arange(6)
+    idx = np.array([0, 2, 1, 2, 5, 1])
+    attributes = {"uvs": np.stack((idx, -idx), axis = 1).astype(np.float32)}
+
+    builder = geometry.VertexTableBuilder()
+    builder.add(vtx[:4], idx[:4], {"uvs": attributes["uvs"][:4]})
+    builder.add(vtx[4:], idx[4:], {"uvs": attributes["uvs"][4:]})
+    streamed = builder.finish()
+    whole = geometry.vertex_table(vtx, idx, attributes)
+
+    assert streamed[1].tolist() == whole[1].tolist()
+    assert streamed[2].tolist() == whole[2].tolist()
+    assert streamed[0]["uvs"].tolist() == whole[0]["uvs"].tolist()
+
+
+# ~~~~~~~~~~~~~~~~~~~~Topology Tests~~~~~~~~~~~~~~~~~~~~
+def test_assemble_triangle_list_ignores_trailing_corners():
+    assert geometry.assemble_faces(np.arange(8)).tolist() == [[0, 1, 2], [3, 4, 5]]
+
+def test_assemble_strip_keeps_winding_and_restarts():
+    faces = geometry.assemble_faces([0, 1, 2, 3, -1, 4, 5, 6], "TRIANGLE_STRIP")
+    assert faces.tolist() == [[0, 1, 2], [2, 1, 3], [4, 5, 6]]
+
+def test_assemble_strip_drops_stitching_triangles():
+    faces = geometry.assemble_faces([0, 1, 2, 2, 3, 3, 4, 5, 6], "TRIANGLE_STRIP")
+    assert faces.tolist() == [[0, 1, 2], [4, 3, 5], [4, 5, 6]]
+
+def test_assemble_fan_and_reversed_winding():
+    faces = geometry.assemble_faces([0, 1, 2, 3, -1, 4, 5, 6], "TRIANGLE_FAN", vertex_order = True)
+    assert faces.tolist() == [[2, 1, 0], [3, 2, 0], [6, 5, 4]]
+
+def test_mark_restarts_only_for_strips_and_fans():
+    idx = np.array([0, 0xFFFF, 1])
+    assert geometry.mark_restarts(idx, "TRIANGLE_LIST").tolist() == [0, 0xFFFF, 1]
+    assert geometry.mark_restarts(idx, "TRIANGLE_STRIP").tolist() == [0, -1, 1]
+
+def test_mark_restarts_by_index_width():
+    # A strip over more than 65535 vertices has 32-bit indices, so 0xFFFF is one of its vertices
+    idx = np.arange(65530, 65541)
+    assert geometry.mark_restarts(idx, "TRIANGLE_STRIP").tolist() == idx.tolist()
+    assert len(geometry.assemble_faces(geometry.mark_restarts(idx, "TRIANGLE_STRIP"), "TRIANGLE_STRIP")) == 9
+
+    idx = np.array([0, 1, 2, 0xFFFF, 3, 0xFFFFFFFF, 4, 5, 6])
+    assert geometry.mark_restarts(idx, "TRIANGLE_FAN").tolist() == [0, 1, 2, 0xFFFF, 3, -1, 4, 5, 6]
+
+
+# ~~~~~~~~~~~~~~~~~~~~Transform Tests~~~~~~~~~~~~~~~~~~~~
+def test_transform_matrix_mirrors_before_matrix():
+    matrix = geometry.transform_matrix([[0, -1, 0], [1, 0, 0], [0, 0, 1]], mirror_x = True)
+    assert np.allclose(geometry.transform_points([[1, 2, 3]], matrix), [[-2, -1, 3]])
+    assert geometry.is_identity(geometry.transform_matrix())
+
+def test_flips_winding_only_for_mirrors():
+    assert geometry.flips_winding(geometry.transform_matrix(mirror_x = True))
+    assert geometry.flips_winding(geometry.transform_matrix(np.diag([1.0, 1.0, -2.0])))
+    assert not geometry.flips_winding(geometry.transform_matrix([[0, -1, 0], [1, 0, 0], [0, 0, 1]]))
+    assert not geometry.flips_winding(geometry.transform_matrix(np.diag([-1.0, -1.0, 1.0])))
+
+def test_transform_normals_stay_perpendicular_under_non_uniform_scale():
+    # A slanted face and its normal; stretching X by 4 tilts the face, the normal must follow the inverse transpose
+    corners = np.array([(0, 0, 0), (1, 1, 0), (0, 0, 1)], dtype = np.float32)
+    normal = np.cross(corners[1] - corners[0], corners[2] - corners[0])
+    normal = np.append(normal / np.linalg.norm(normal), 1.0)[np.newaxis].astype(np.float32)
+    matrix = geometry.transform_matrix(np.diag([4.0, 1.0, 1.0]))
+
+    moved = geometry.transform_points(corners, matrix)
+    result = geometry.transform_normals(normal, matrix)
+    expected = np.cross(moved[1] - moved[0], moved[2] - moved[0])
+    assert np.allclose(result[0, :3], expected / np.linalg.norm(expected), atol = 1e-6)
+    assert result[0, 3] == 1.0
+
+    # A plain linear transform would have left it off the surface
+    linear = geometry.transform_directions(normal, matrix)[0, :3]
+    assert abs(np.dot(linear, expected)) / np.linalg.norm(linear) / np.linalg.norm(expected) < 0.99
+
+def test_transform_directions_flip_tangent_handedness_under_mirror():
+    tangents = np.array([(1, 0, 0, 1), (0, 1, 0, -1)], dtype = np.float32)
+    mirrored = geometry.transform_directions(tangents, geometry.transform_matrix(mirror_x = True))
+    assert mirrored.tolist() == [[-1, 0, 0, -1], [0, 1, 0, 1]]
+
+    rotated = geometry.transform_directions(tangents, geometry.transform_matrix([[0, -1, 0], [1, 0, 0], [0, 0, 1]]))
+    assert np.allclose(rotated, [[0, 1, 0, 1], [-1, 0, 0, -1]])
+
+    # Three components have no handedness to flip
+    assert geometry.transform_directions(tangents[:, :3], geometry.transform_matrix(mirror_x = True)).shape == (2, 3)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Mesh Buffer Tests~~~~~~~~~~~~~~~~~~~~
+def test_mesh_buffers_flat_layouts():
+    positions = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 1, 0)], dtype = np.float64)
+    faces = np.array([(0, 1, 2), (2, 1, 3)], dtype = np.uint16)
+    uvs = np.arange(12, dtype = np.float16).reshape(2, 3, 2)
+    normals = np.full((2, 3, 3), 32767, dtype = np.int16)
+    buffers = geometry.mesh_buffers(positions, faces, uvs, normals)
+
+    assert (buffers["vertex_count"], buffers["face_count"], buffers["loop_count"]) == (4, 2, 6)
+    assert buffers["co"].dtype == np.float32 and buffers["co"].shape == (12,)
+    assert buffers["vertex_index"].tolist() == [0, 1, 2, 2, 1, 3]
+    assert buffers["loop_start"].tolist() == [0, 3]
+    assert buffers["loop_total"].tolist() == [3, 3]
+    assert buffers["uv"].tolist() == list(range(12))
+    assert buffers["normals"].shape == (6, 3) and np.allclose(buffers["normals"], 1.0)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Face Cleanup Tests~~~~~~~~~~~~~~~~~~~~
+def test_clean_faces_drops_slivers_duplicates_and_back_to_back_pairs():
+    positions = np.array([(0, 0, 0), (1, 0, 0), (0, 1, 0), (2, 0, 0), (1, 1, 0)], dtype = np.float32)
+    faces = np.array([
+                      (0, 1, 2),    # kept
+                      (1, 2, 0),    # same triangle, rotated
+                      (2, 1, 0),    # back to back with the first one
+                      (0, 1, 3),    # corners on one line
+                      (1, 4, 2),    # kept
+                      ])
+    assert geometry.clean_faces(positions, faces).tolist() == [True, False, False, False, True]
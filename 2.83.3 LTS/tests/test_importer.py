@@ -0,0 +1,275 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Tests of the Blender side in importer.py. Outside Blender they run on the stand-ins in benchmarks/stubs, which only
+# record what the importer hands to bpy.
+
+import os
+import types
+import bpy
+import mathutils
+import numpy as np
+import pytest
+import generate_csv
+from import_pix_csv import importer, pipeline, profiling
+
+
+# ~~~~~~~~~~~~~~~~~~~~Helper Functions~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture(autouse = True)
+def empty_scene():
+    if hasattr(bpy, "reset"): bpy.reset()
+    yield
+    if hasattr(bpy, "reset"): bpy.reset()
+
+def load(tmp_path, seed = 0, attributes = ("normal", "uv")):
+    path = str(tmp_path / "mesh.csv")
+    generate_csv.write_csv(path, 600, attributes, seed = seed)
+    return path, pipeline.load_mesh_data(path)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Mesh Tests~~~~~~~~~~~~~~~~~~~~
+def test_make_mesh_fills_mesh(tmp_path):
+    _, sections = load(tmp_path)
+    mesh_data = sections[0]
+    mesh = importer.make_mesh(mesh_data, mathutils.Matrix()).data
+
+    assert len(mesh.vertices) == len(mesh_data["positions"])
+    assert len(mesh.polygons) == len(mesh_data["faces"])
+    assert mesh.uv_layers.get("UVMap") is not None
+    assert mesh.use_auto_smooth
+
+def test_identical_meshes_share_one_datablock(tmp_path):
+    _, sections = load(tmp_path)
+    registry = {}
+    first = importer.make_mesh(sections[0], mathutils.Matrix(), "First", registry = registry)
+    second = importer.make_mesh(sections[0], mathutils.Matrix(), "Second", registry = registry)
+    assert first is not second and first.data is second.data
+    assert len(bpy.data.meshes) == 1
+
+def test_edited_mesh_is_not_shared_again(tmp_path):
+    _, sections = load(tmp_path)
+    first = importer.make_mesh(sections[0], mathutils.Matrix(), "First", registry = importer.mesh_registry())
+
+    # Moving a vertex after the import keeps the hash property; the next import must not link the edited mesh
+    co = np.empty(len(first.data.vertices) * 3, dtype = np.float32)
+    first.data.vertices.foreach_get("co", co)
+    co[0] += 1.0
+    first.data.vertices.foreach_set("co", co)
+
+    registry = importer.mesh_registry()
+    second = importer.make_mesh(sections[0], mathutils.Matrix(), "Second", registry = registry)
+    assert second.data is not first.data
+    assert importer.MESH_HASH_PROPERTY not in first.data
+    assert list(registry.values()) == [second.data]
+
+def bone_weights(obj):
+
+    # {(vertex, group name): weight} of an object, read through its vertex groups
+    names = {group.index: group.name for group in obj.vertex_groups}
+    return {(vertex, names[index]): weight for (vertex, index), weight in obj.data.deform_weights.items()}
+
+def test_shared_mesh_keeps_its_vertex_weights(tmp_path):
+    _, sections = load(tmp_path, attributes = ("normal", "uv", "skin"))
+    registry = {}
+    first = importer.make_mesh(sections[0], mathutils.Matrix(), "First", registry = registry)
+    weights = bone_weights(first)
+    second = importer.make_mesh(sections[0], mathutils.Matrix(), "Second", registry = registry)
+
+    # The second object gets the same groups, at the same indices, and the weights aren't added a second time
+    assert [group.name for group in second.vertex_groups] == [group.name for group in first.vertex_groups]
+    assert bone_weights(second) == weights
+
+
+# ~~~~~~~~~~~~~~~~~~~~Reload Tests~~~~~~~~~~~~~~~~~~~~
+def test_reload_updates_mesh_in_place(tmp_path):
+    path, sections = load(tmp_path)
+    importer.make_section_meshes(sections, mathutils.Matrix(), filepath = path)
+    obj = bpy.data.objects[0]
+    mesh = obj.data
+
+    # Same topology, new positions
+    mesh_data = dict(sections[0], positions = sections[0]["positions"] + 1.0)
+    importer.reload_object(obj, mesh_data)
+    assert obj.data is mesh
+    assert np.allclose(mesh.vertices.arrays["co"], mesh_data["positions"].ravel())
+
+def test_reload_objects_skips_unchanged_files(tmp_path):
+    path, sections = load(tmp_path)
+    importer.make_section_meshes(sections, mathutils.Matrix(), filepath = path)
+    assert importer.reload_objects(bpy.data.objects) == (0, [])
+
+    # A different mesh in the same file gets a new datablock
+    generate_csv.write_csv(path, 900, seed = 1)
+    reloaded, failures = importer.reload_objects(bpy.data.objects)
+    assert (reloaded, failures) == (1, [])
+    assert len(bpy.data.objects[0].data.polygons) > len(sections[0]["faces"])
+
+def test_watch_registers_timer_that_reloads_changed_files(tmp_path):
+    path, sections = load(tmp_path)
+    importer.make_section_meshes(sections, mathutils.Matrix(), filepath = path)
+    operator = importer.PIX_CSV_Watch_Operator()
+    operator.execute(bpy.context)
+    assert bpy.app.timers.is_registered(importer.watch_sources)
+
+    # Fire the timer by hand once the file changed
+    generate_csv.write_csv(path, 900, seed = 1)
+    assert importer.watch_sources() == importer.WATCH_INTERVAL
+    assert len(bpy.data.objects[0].data.polygons) > len(sections[0]["faces"])
+
+    operator.execute(bpy.context)
+    assert not bpy.app.timers.is_registered(importer.watch_sources)
+
+def test_shape_keys_on_top_of_basis(tmp_path):
+    _, sections = load(tmp_path)
+    mesh_data = dict(sections[0], **{"shape.Clip Space": sections[0]["positions"] * 2.0})
+    obj = importer.make_mesh(mesh_data, mathutils.Matrix())
+    key_blocks = obj.data.shape_keys.key_blocks
+    assert [block.name for block in key_blocks] == ["Basis", "Clip Space"]
+    assert np.allclose(key_blocks[1].data.arrays["co"], mesh_data["shape.Clip Space"].ravel())
+
+def test_reload_in_place_keeps_vertex_weights(tmp_path):
+    _, sections = load(tmp_path, attributes = ("normal", "uv", "skin"))
+    obj = importer.make_mesh(sections[0], mathutils.Matrix())
+    weights = bone_weights(obj)
+    importer.reload_object(obj, dict(sections[0], positions = sections[0]["positions"] + 1.0))
+    assert bone_weights(obj) == weights
+
+
+# ~~~~~~~~~~~~~~~~~~~~Batch Tests~~~~~~~~~~~~~~~~~~~~
+def fail_on(monkeypatch, bad_name):
+
+    # Make building the meshes of one file raise, as a bpy error would
+    make_section_meshes = importer.make_section_meshes
+    def failing(sections, global_matrix, name = "PIX_CSV", *args, **kwargs):
+        if name == bad_name: raise RuntimeError("cannot build " + name)
+        return make_section_meshes(sections, global_matrix, name, *args, **kwargs)
+    monkeypatch.setattr(importer, "make_section_meshes", failing)
+
+def test_failed_mesh_build_does_not_stop_the_batch(tmp_path, monkeypatch):
+    paths = [str(tmp_path / (name + ".csv")) for name in ("bad", "good")]
+    for seed, path in enumerate(paths): generate_csv.write_csv(path, 600, seed = seed)
+    fail_on(monkeypatch, "bad")
+
+    failures, timers = importer.importCSVFiles(paths, worker_count = 1)
+    assert [(path, str(error)) for path, error in failures] == [(paths[0], "cannot build bad")]
+    assert [path for path, _ in timers] == [paths[1]]
+    assert len(bpy.data.objects) == 1
+
+class WindowManager:
+
+    def __init__(self):
+        self.timers = []
+        self.progress = False
+
+    def event_timer_remove(self, timer):
+        self.timers.remove(timer)
+
+    def progress_update(self, value):
+        pass
+
+    def progress_end(self):
+        self.progress = False
+
+class Worker:
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.cancelled = False
+
+    def progress(self):
+        return 0.0
+
+    def next_result(self, timeout = None):
+        result = self.results.pop(0)
+        if isinstance(result, Exception): raise result
+        return result
+
+    def cancel(self):
+        self.cancelled = True
+
+def background_operator(results):
+    operator = importer.PIX_CSV_Operator()
+    window_manager = WindowManager()
+    operator._timer = object()
+    window_manager.timers.append(operator._timer)
+    window_manager.progress = True
+    operator._worker = Worker(results)
+    operator._filepaths = [result[0] for result in results if isinstance(result, tuple)]
+    operator._global_matrix = mathutils.Matrix()
+    operator._write_log = False
+    operator._registry = None
+    operator._options = {}
+    operator._failures = []
+    operator._timers = []
+    return operator, types.SimpleNamespace(window_manager = window_manager)
+
+def test_modal_import_reports_build_errors_and_finishes(tmp_path, monkeypatch):
+    results = []
+    for seed, name in enumerate(("bad", "good")):
+        path = str(tmp_path / (name + ".csv"))
+        generate_csv.write_csv(path, 600, seed = seed)
+        results.append((path, pipeline.load_mesh_data(path), profiling.PhaseTimer(), None))
+    fail_on(monkeypatch, "bad")
+    operator, context = background_operator(results + [None])
+    tick = types.SimpleNamespace(type = "TIMER")
+
+    assert operator.modal(context, tick) == {"RUNNING_MODAL"}
+    assert operator.modal(context, tick) == {"RUNNING_MODAL"}
+    assert operator.modal(context, tick) == {"FINISHED"}
+    assert [path for path, _ in operator._failures] == [results[0][0]]
+    assert context.window_manager.timers == [] and not context.window_manager.progress
+
+def test_modal_import_cleans_up_after_unexpected_errors():
+    operator, context = background_operator([RuntimeError("worker thread died")])
+    with pytest.raises(RuntimeError):
+        operator.modal(context, types.SimpleNamespace(type = "TIMER"))
+    assert operator._worker.cancelled
+    assert context.window_manager.timers == [] and not context.window_manager.progress
+
+
+# ~~~~~~~~~~~~~~~~~~~~Reload Error Tests~~~~~~~~~~~~~~~~~~~~
+def test_deleted_source_is_reported_once(tmp_path):
+    path, sections = load(tmp_path)
+    importer.make_section_meshes(sections, mathutils.Matrix(), filepath = path)
+    os.remove(path)
+
+    reloaded, failures = importer.reload_objects(bpy.data.objects)
+    assert reloaded == 0 and len(failures) == 1 and isinstance(failures[0][1], OSError)
+    assert importer.reload_objects(bpy.data.objects) == (0, [])
+
+    # Once the file is back it is reloaded again
+    generate_csv.write_csv(path, 900, seed = 1)
+    assert importer.reload_objects(bpy.data.objects) == (1, [])
+
+def test_failing_object_does_not_stop_the_others(tmp_path, monkeypatch):
+    path, sections = load(tmp_path)
+    importer.make_section_meshes(sections, mathutils.Matrix(), "First", filepath = path)
+    importer.make_section_meshes(sections, mathutils.Matrix(), "Second", filepath = path)
+
+    reload_object = importer.reload_object
+    def failing(obj, mesh_data, timer = None):
+        if obj.name == "First": raise RuntimeError("cannot reload")
+        return reload_object(obj, mesh_data, timer)
+    monkeypatch.setattr(importer, "reload_object", failing)
+
+    generate_csv.write_csv(path, 900, seed = 1)
+    reloaded, failures = importer.reload_objects(bpy.data.objects)
+    assert reloaded == 1 and [(name, str(error)) for name, error in failures] == [("First", "cannot reload")]
+    assert importer.watch_sources() == importer.WATCH_INTERVAL
@@ -0,0 +1,101 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Tests of the byte range parsing in parallel.py, run in plain Python ("python -m pytest tests"). The size limits are
+# lowered so small files take the process pool path.
+
+import numpy as np
+import pytest
+import generate_csv
+from import_pix_csv import parallel, parsing
+
+
+# ~~~~~~~~~~~~~~~~~~~~Helper Functions~~~~~~~~~~~~~~~~~~~~
+@pytest.fixture
+def small_ranges(monkeypatch):
+
+    # Parse anything in parallel, and record the ranges join_ranges got so a test knows the pool was used
+    monkeypatch.setattr(parallel, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr(parallel, "MIN_RANGE_SIZE", 1024)
+    joined = []
+    join_ranges = parallel.join_ranges
+    def recording(filepath, ranges, *args, **kwargs):
+        joined.append(ranges)
+        return join_ranges(filepath, ranges, *args, **kwargs)
+    monkeypatch.setattr(parallel, "join_ranges", recording)
+    return joined
+
+def write_mixed_csv(tmp_path):
+
+    # Draws with repeated headers, followed by draws with another header (other attributes, other column count)
+    first, second = str(tmp_path / "first.csv"), str(tmp_path / "second.csv")
+    generate_csv.write_csv(first, 1500, ("normal", "uv"), section_count = 3, repeat_headers = True)
+    generate_csv.write_csv(second, 1500, ("uv", "color", "tangent"), section_count = 2, repeat_headers = True, seed = 1)
+    path = tmp_path / "mixed.csv"
+    with open(first, "rb") as a, open(second, "rb") as b: path.write_bytes(a.read() + b.read())
+    return str(path)
+
+def assert_same_sections(result, expected):
+    assert len(result) == len(expected)
+    for section, other in zip(result, expected):
+        assert list(section) == list(other)
+        for name in section: assert np.array_equal(section[name], other[name]), name
+
+
+# ~~~~~~~~~~~~~~~~~~~~Range Tests~~~~~~~~~~~~~~~~~~~~
+def test_byte_ranges_cover_the_body_on_row_boundaries(tmp_path):
+    path = write_mixed_csv(tmp_path)
+    with open(path, "rb") as f:
+        body_start = len(f.readline())
+        f.seek(0)
+        data = f.read()
+
+    ranges = parallel.byte_ranges(path, body_start, 7)
+    assert len(ranges) == 7
+    assert ranges[0][0] == body_start and ranges[-1][1] == len(data)
+    for (_, stop), (start, _) in zip(ranges[:-1], ranges[1:]):
+        assert stop == start and data[start - 1:start] == b"\n"
+
+@pytest.mark.parametrize("split_sections", (True, False))
+def test_parallel_parse_matches_single_process(tmp_path, small_ranges, split_sections):
+    path = write_mixed_csv(tmp_path)
+    expected = parsing.parse_csv_sections(path, split_sections = split_sections, primitive_topology = "TRIANGLE_STRIP")
+    result = parallel.parse_csv_sections(path, split_sections = split_sections, worker_count = 4, primitive_topology = "TRIANGLE_STRIP")
+
+    assert len(small_ranges) == 1 and len(small_ranges[0]) == 4
+    assert len(expected) == (5 if split_sections else 1)
+    assert_same_sections(result, expected)
+
+def test_parse_range_splits_at_header_rows(tmp_path):
+    path = write_mixed_csv(tmp_path)
+    with open(path, "rb") as f: data = f.read()
+    csv_header = parsing.read_header(data[:data.index(b"\n")])
+
+    # A range starting a few rows into the draws of the second header: its first segment is parsed with the file's
+    # header (join_ranges parses it again), every header row in it starts a segment of its own
+    start = data.index(b"\n", data.index(b"in_COLOR0")) + 1
+    for _ in range(2): start = data.index(b"\n", start) + 1
+    headers = [line for line in data[start:].splitlines() if line.startswith(b"VTX")]
+    segments, first_size = parallel.parse_range(path, start, len(data), csv_header, False, str(tmp_path / "scratch"))
+
+    assert len(headers) > 0 and len(segments) == len(headers) + 1
+    assert segments[0][0] is None
+    assert [parsing.read_header(header) for header, _ in segments[1:]] == [parsing.read_header(header) for header in headers]
+    assert first_size == data.index(b"VTX", start) - start
@@ -0,0 +1,164 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Tests of the CSV parsing and joining in parsing.py, run in plain Python ("python -m pytest tests").
+
+import io
+import numpy as np
+import pytest
+from import_pix_csv import parsing
+
+
+# ~~~~~~~~~~~~~~~~~~~~Helper Functions~~~~~~~~~~~~~~~~~~~~
+def blocks(section_rows, key = "uvs"):
+
+    # [(section, {"VTX": ..., key: ...}), ...] from [(section, [VTX, ...]), ...]; the values are the VTX numbers
+    result = []
+    for section, vtx in section_rows:
+        vtx = np.array(vtx, dtype = np.int64)
+        result.append((section, {"VTX": vtx, key: np.stack((vtx, vtx), axis = 1).astype(np.float32)}))
+    return result
+
+
+# ~~~~~~~~~~~~~~~~~~~~Header Tests~~~~~~~~~~~~~~~~~~~~
+@pytest.mark.parametrize("name, expected", [
+    ("in_POSITION0", ("position", 0)),
+    ("a_TexCoord1", ("texcoord", 1)),
+    ("TEXCOORD12", ("texcoord", 12)),
+    ("in_COLOR0", ("color", 0)),
+    ("a_Colour", ("color", 0)),
+    ("TANGENT", ("tangent", 0)),
+    ("in_BITANGENT0", ("binormal", 0)),
+    ("BLENDINDICES", ("blend_indices", 0)),
+    ("a_BoneIds", ("blend_indices", 0)),
+    ("in_BLENDWEIGHT0", ("blend_weights", 0)),
+    ("SV_Position", ("position", 0)),
+    ("in_INSTANCE_ID0", (None, 0)),
+    ])
+def test_classify_attribute(name, expected):
+    assert parsing.classify_attribute(name) == expected
+
+def test_compile_plan_maps_header_onto_attributes():
+    header = parsing.read_header(b"\xef\xbb\xbfVTX, IDX, in_POSITION0.x, in_POSITION0.y, in_POSITION0.z, in_POSITION0.w, "
+                                 b"in_NORMAL0.x, in_NORMAL0.y, in_NORMAL0.z, in_TEXCOORD0.x, in_TEXCOORD0.y, "
+                                 b"in_TEXCOORD1.y, in_TEXCOORD1.x, in_COLOR0.r, in_COLOR0.g, in_COLOR0.b, in_COLOR0.a, "
+                                 b"in_TANGENT0.x, in_TANGENT0.y, in_TANGENT0.z, in_TANGENT0.w, "
+                                 b"in_BLENDINDICES0.x, in_BLENDINDICES0.y, in_BLENDWEIGHT0.x, in_BLENDWEIGHT0.y, in_FOG0.x\n")
+    plan = parsing.compile_plan(header)
+
+    # The first position is trimmed to xyz, a second UV set keeps its own name, and components come in xyzw order
+    # whatever order the header has them in; unknown attributes are left out
+    assert [(key, columns.tolist()) for key, columns in plan.attributes] == [
+        ("positions", [2, 3, 4]),
+        ("normals", [6, 7, 8]),
+        ("uvs", [9, 10]),
+        ("texcoord.in_TEXCOORD1", [12, 11]),
+        ("color.in_COLOR0", [13, 14, 15, 16]),
+        ("tangent.in_TANGENT0", [17, 18, 19, 20]),
+        ("blend_indices.in_BLENDINDICES0", [21, 22]),
+        ("blend_weights.in_BLENDWEIGHT0", [23, 24]),
+        ]
+
+def test_compile_plan_directx_layout_uses_fixed_columns():
+    header = ["VTX", "IDX", "SV_Position.x", "SV_Position.y", "SV_Position.z", "SV_Position.w", "Normal.x", "Normal.y", "Normal.z",
+              "Texcoord.x", "Texcoord.y"]
+    plan = parsing.compile_plan(header, assume_DirectX_PIX_layout = True)
+    assert [(key, columns.tolist()) for key, columns in plan.attributes] == [("positions", [2, 3, 4]), ("normals", [6, 7, 8]), ("uvs", [9, 10])]
+
+    data = plan.parse(b"0, 3, 1, 2, 3, 1, 0, 0, 1, 0.5, 0.25\n", len(header))
+    assert data["IDX"].tolist() == [3] and data["uvs"].tolist() == [[0.5, 0.25]]
+
+def test_compile_plan_needs_a_position():
+    with pytest.raises(ValueError):
+        parsing.compile_plan(["VTX", "IDX", "in_NORMAL0.x", "in_NORMAL0.y", "in_NORMAL0.z"])
+    with pytest.raises(ValueError):
+        parsing.compile_plan(["VTX", "IDX", "in_POSITION0.x", "in_POSITION0.y"])
+
+
+# ~~~~~~~~~~~~~~~~~~~~Parsing Tests~~~~~~~~~~~~~~~~~~~~
+def test_parse_csv_sections_splits_draws(tmp_path):
+    path = tmp_path / "draws.csv"
+    path.write_text("VTX, IDX, in_POSITION0.x, in_POSITION0.y, in_POSITION0.z, in_TEXCOORD0.x, in_TEXCOORD0.y\n"
+                    "0, 0, 1, 2, 3, 0.5, 0.25\n"
+                    "1, 1, 4, 5, 6, 0.5, 0.25\n"
+                    "VTX, IDX, in_POSITION0.x, in_POSITION0.y, in_POSITION0.z\n"
+                    "0, 0, 7, 8, 9\n")
+    sections = parsing.parse_csv_sections(str(path))
+    assert len(sections) == 2
+    assert sections[0]["positions"].tolist() == [[1, 2, 3], [4, 5, 6]]
+    assert sections[0]["uvs"].dtype == np.float32
+    assert sorted(sections[1]) == ["IDX", "VTX", "positions"]
+
+
+def test_parse_table_rejects_ragged_rows():
+
+    # 4 + 6 numbers are two rows' worth of 5 columns, but neither row is one
+    with pytest.raises(ValueError):
+        parsing.parse_table(b"0, 0, 1, 2\n1, 1, 4, 5, 6, 7\n", 5)
+
+def test_parse_table_slow_path_skips_blank_lines():
+    table = parsing.parse_table(b"0, 0, 1\n\n1, 1, \"2\"\r\n", 3)
+    assert table.tolist() == [[0, 0, 1], [1, 1, 2]]
+
+def test_large_vtx_and_idx_stay_exact(tmp_path):
+
+    # Above 2^24 float32 can't hold every integer, so these rows are parsed as float64
+    path = tmp_path / "large.csv"
+    path.write_text("VTX, IDX, in_POSITION0.x, in_POSITION0.y, in_POSITION0.z\n"
+                    "20000001, 20000003, 0.1, 0.2, 0.3\n")
+    data = parsing.parse_csv_sections(str(path))[0]
+    assert data["VTX"].tolist() == [20000001] and data["IDX"].tolist() == [20000003]
+    assert data["positions"].dtype == np.float32
+    assert data["positions"].tolist() == np.array([[0.1, 0.2, 0.3]], dtype = np.float32).tolist()
+
+def test_read_blocks_end_on_newlines():
+    body = b"".join(b"%d, %d\n" % (row, row) for row in range(100))
+    pieces = list(parsing.read_blocks(io.BytesIO(body), 64))
+    assert b"".join(pieces) == body
+    assert len(pieces) > 1 and all(piece.endswith(b"\n") for piece in pieces)
+
+def test_parse_csv_sections_stops_at_checkpoint(tmp_path):
+    path = tmp_path / "mesh.csv"
+    path.write_text("VTX, IDX, in_POSITION0.x, in_POSITION0.y, in_POSITION0.z\n0, 0, 1, 2, 3\n")
+
+    def checkpoint():
+        raise KeyboardInterrupt()
+
+    with pytest.raises(KeyboardInterrupt):
+        parsing.parse_csv_sections(str(path), checkpoint = checkpoint)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Join Tests~~~~~~~~~~~~~~~~~~~~
+def test_join_blocks_matches_rows_across_block_boundaries():
+
+    # The output CSV is cut into blocks at other places than the input, and misses VTX 2 and section 1's VTX 0
+    inputs = blocks([(0, [0, 1, 2]), (0, [3, 4]), (1, [0, 1])], "positions")
+    outputs = blocks([(0, [0]), (0, [1, 3, 4]), (1, [1])])
+    joined = list(parsing.join_blocks(inputs, outputs, {"uvs": 2}))
+
+    assert [section for section, _ in joined] == [0, 0, 1]
+    assert joined[0][1]["uvs"][:, 0].tolist() == [0, 1, 0]
+    assert joined[1][1]["uvs"][:, 0].tolist() == [3, 4]
+    assert joined[2][1]["uvs"][:, 0].tolist() == [0, 1]
+    assert joined[0][1]["positions"][:, 0].tolist() == [0, 1, 2]
+
+def test_join_blocks_with_exhausted_output():
+    joined = list(parsing.join_blocks(blocks([(0, [0, 1]), (1, [0])], "positions"), [], {"uvs": 2}))
+    assert [data["uvs"].tolist() for _, data in joined] == [[[0, 0], [0, 0]], [[0, 0]]]
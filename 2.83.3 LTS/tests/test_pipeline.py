@@ -0,0 +1,97 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Tests of the file to mesh arrays pipeline in pipeline.py, run in plain Python ("python -m pytest tests").
+
+import numpy as np
+import generate_csv
+from import_pix_csv import geometry, pipeline
+
+
+# ~~~~~~~~~~~~~~~~~~~~Precision Tests~~~~~~~~~~~~~~~~~~~~
+def test_compact_precision_from_the_vertex_table_on(tmp_path):
+    path = str(tmp_path / "mesh.csv")
+    generate_csv.write_csv(path, 600, ("normal", "uv", "tangent"))
+
+    # The tables are compacted while they are read, before any corner data is gathered from them
+    table, _, _ = pipeline.read_vertex_tables(path, precision = "QUANTIZED")[0]
+    assert table["normals"].dtype == np.int16 and table["uvs"].dtype == np.float16
+    assert table["positions"].dtype == np.float32
+
+    full = pipeline.load_mesh_data(path)[0]
+    for use_streaming in (False, True):
+        quantized = pipeline.load_mesh_data(path, precision = "QUANTIZED", use_streaming = use_streaming, mirror_x = True)[0]
+        mirrored = pipeline.load_mesh_data(path, mirror_x = True)[0]
+        assert quantized["normals"].dtype == np.int16 and quantized["normals"].shape == full["normals"].shape
+        assert np.allclose(geometry.decode_attribute(quantized["normals"]), mirrored["normals"], atol = 1e-4)
+        assert np.allclose(geometry.decode_attribute(quantized["uvs"]), mirrored["uvs"], atol = 1e-3)
+
+
+# ~~~~~~~~~~~~~~~~~~~~Section Tests~~~~~~~~~~~~~~~~~~~~
+def test_unsplit_draws_keep_their_own_vertices(tmp_path):
+    path = tmp_path / "draws.csv"
+    path.write_text("VTX, IDX, in_POSITION0.x, in_POSITION0.y, in_POSITION0.z\n" +
+                    "".join(str(vtx) + ", " + str(vtx) + ", " + str(x) + ", " + str(vtx) + ", " + str(vtx % 2) + "\n" for x in (0, 5) for vtx in range(3)))
+
+    for use_streaming in (False, True):
+        mesh_data = pipeline.load_mesh_data(str(path), split_sections = False, use_streaming = use_streaming)
+        assert len(mesh_data) == 1
+        assert sorted(mesh_data[0]["positions"][:, 0].tolist()) == [0, 0, 0, 5, 5, 5]
+        assert len(mesh_data[0]["faces"]) == 2
+
+def test_unsplit_strips_keep_their_restarts(tmp_path):
+    path = tmp_path / "strips.csv"
+    rows = [(0, 0), (1, 1), (2, 2), (3, 0xFFFF), (4, 3), (5, 4), (6, 5)]
+    path.write_text("VTX, IDX, in_POSITION0.x, in_POSITION0.y, in_POSITION0.z\n" +
+                    "".join("%d, %d, %d, %d, %d\n" % (vtx, idx, draw, idx % 7, idx % 5) for draw in (0, 1) for vtx, idx in rows))
+
+    mesh_data = pipeline.load_mesh_data(str(path), split_sections = False, primitive_topology = "TRIANGLE_STRIP")[0]
+    assert len(mesh_data["positions"]) == 12 and len(mesh_data["faces"]) == 4
+
+
+# ~~~~~~~~~~~~~~~~~~~~Decimation Tests~~~~~~~~~~~~~~~~~~~~
+def test_decimation_lands_near_target_faces(tmp_path):
+    path = str(tmp_path / "mesh.csv")
+    generate_csv.write_csv(path, 30000, ("normal", "uv", "skin"))
+    assert len(pipeline.load_mesh_data(path)[0]["faces"]) > 5000
+
+    for target_faces in (300, 2000):
+        mesh_data = pipeline.load_mesh_data(path, target_faces = target_faces)[0]
+        assert abs(len(mesh_data["faces"]) - target_faces) <= 0.1 * target_faces
+        assert len(mesh_data["blend_weights.in_BLENDWEIGHT0"]) == len(mesh_data["positions"])
+        assert len(mesh_data["normals"]) == len(mesh_data["faces"])
+
+def test_decimation_keeps_corner_attributes_with_their_faces(tmp_path):
+    path = str(tmp_path / "mesh.csv")
+    generate_csv.write_csv(path, 6000, ("normal", "uv"))
+    mesh_data = pipeline.load_mesh_data(path)[0]
+    faces = np.asarray(mesh_data["faces"], dtype = np.int64)
+
+    # Tag every corner with (face, corner) in its UV, then see where the tags end up
+    tags = np.stack(np.meshgrid(np.arange(len(faces)), np.arange(3), indexing = "ij"), axis = 2).astype(np.float32)
+    cell_size = 0.1 * np.ptp(mesh_data["positions"], axis = 0).max()
+    decimated = pipeline.decimate_mesh_data(dict(mesh_data, uvs = tags), cell_size = cell_size)
+    assert 0 < len(decimated["faces"]) < len(faces)
+
+    # Every corner of a kept face sits on the cell of the vertex its tag came from
+    first, clusters = geometry.cluster_vertices(mesh_data["positions"], cell_size)
+    cluster_positions = geometry.cluster_means(mesh_data["positions"], clusters, len(first))
+    source = faces[decimated["uvs"][..., 0].astype(np.int64), decimated["uvs"][..., 1].astype(np.int64)]
+    assert np.allclose(decimated["positions"][decimated["faces"]], cluster_positions[clusters[source]])
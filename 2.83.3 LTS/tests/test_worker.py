@@ -0,0 +1,109 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+# <pep8 compliant>
+
+# Tests of the background import thread in worker.py, run in plain Python ("python -m pytest tests").
+
+import time
+import tracemalloc
+import pytest
+import generate_csv
+from import_pix_csv import batch, profiling, worker
+
+
+# ~~~~~~~~~~~~~~~~~~~~Helper Functions~~~~~~~~~~~~~~~~~~~~
+def collect(import_worker):
+
+    # Every result the worker queued, up to the None it ends with
+    results = []
+    while True:
+        result = import_worker.next_result(timeout = 60)
+        if result is None: return results
+        results.append(result)
+
+def write_files(tmp_path, count, rows = 600):
+    paths = []
+    for index in range(count):
+        path = str(tmp_path / ("mesh" + str(index) + ".csv"))
+        generate_csv.write_csv(path, rows, seed = index)
+        paths.append(path)
+    return paths
+
+
+# ~~~~~~~~~~~~~~~~~~~~Worker Tests~~~~~~~~~~~~~~~~~~~~
+def test_worker_reads_files_in_order(tmp_path):
+    paths = write_files(tmp_path, 2) + [str(tmp_path / "missing.csv")]
+    import_worker = worker.ImportWorker(paths, worker_count = 1, use_cache = False)
+    import_worker.start()
+    results = collect(import_worker)
+    import_worker.join()
+
+    assert [filepath for filepath, _, _, _ in results] == paths
+    for _, sections, timer, error in results[:2]:
+        assert error is None and len(sections) == 1 and len(sections[0]["faces"]) > 0
+        assert "parse" in timer.seconds and "weld" in timer.seconds
+    assert isinstance(results[2][3], OSError)
+    assert import_worker.progress() == 1.0
+
+def test_cancelled_worker_stops_without_results(tmp_path):
+    import_worker = worker.ImportWorker(write_files(tmp_path, 1), worker_count = 1, use_cache = False)
+    import_worker.cancel()
+    import_worker.start()
+    assert collect(import_worker) == []
+    import_worker.join()
+
+def test_cancelled_batch_stops_running_workers():
+
+    # Two files that would take a minute each; the checkpoint cancels the batch while both are running
+    start = time.perf_counter()
+
+    def checkpoint():
+        if time.perf_counter() - start > 0.5: raise worker.Cancelled()
+
+    with pytest.raises(worker.Cancelled):
+        for _ in batch.iter_results(time.sleep, [60, 60], worker_count = 2, checkpoint = checkpoint): pass
+    assert time.perf_counter() - start < 30
+
+
+# ~~~~~~~~~~~~~~~~~~~~Memory Tracing Tests~~~~~~~~~~~~~~~~~~~~
+def test_memory_tracing_stops_after_the_file(tmp_path):
+    path = write_files(tmp_path, 1)[0]
+    assert not tracemalloc.is_tracing()
+    _, timer = batch.load_timed(path, trace_memory = True)
+    assert timer.peak_memory["parse"] > 0
+    assert not tracemalloc.is_tracing()
+
+def test_memory_tracing_that_was_on_stays_on():
+    tracemalloc.start()
+    try:
+        timer = profiling.PhaseTimer(trace_memory = True)
+        with timer.phase("parse"): pass
+        timer.stop_tracing()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+def test_memory_tracing_stops_with_the_last_timer():
+    first, second = profiling.PhaseTimer(trace_memory = True), profiling.PhaseTimer(trace_memory = True)
+    with first.phase("parse"): pass
+    with second.phase("parse"): pass
+    first.stop_tracing()
+    assert tracemalloc.is_tracing()
+    second.stop_tracing()
+    assert not tracemalloc.is_tracing()